@@ -0,0 +1,31 @@
+"""
+Gunicorn settings, loaded automatically from the working directory.
+
+SERVER_MODE picks the worker model:
+  wsgi  threaded sync workers serving server.wsgi (default)
+  asgi  uvicorn workers serving server.asgi, so the async catalog views run
+        on an event loop; sync views share one thread per worker there
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "3"))
+
+if os.getenv("SERVER_MODE", "wsgi").lower() == "asgi":
+    wsgi_app = "server.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "server.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+
+def on_starting(server):
+    # Worker metrics snapshots (see server/metrics) are per run: a restart
+    # starts the counters from zero, as a single process would
+    directory = os.getenv("METRICS_DIR")
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith((".json", ".tmp")):
+                os.remove(os.path.join(directory, name))
@@ -0,0 +1,9 @@
+from .local import LocalTTLCache
+from .tiered import TieredCache
+from .catalog import catalog_cache
+
+__all__ = [
+    "LocalTTLCache",
+    "TieredCache",
+    "catalog_cache",
+]
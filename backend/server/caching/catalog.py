@@ -0,0 +1,29 @@
+"""
+The shared cache for catalog-wide results: product filters, categories and
+recommendations. Any change to a product or category marks them stale,
+except stock-only saves: stock moves with every order, so none of these
+hold it; the recommendations read it fresh for each request.
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models import Category, Product
+from .tiered import TieredCache
+
+FILTERS_KEY = "filters"
+CATEGORIES_KEY = "categories"
+RECOMMENDED_KEY = "recommended"
+
+catalog_cache = TieredCache("catalog", settings.CATALOG_CACHE_TTL)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {"stock"}:
+        return
+    catalog_cache.invalidate(FILTERS_KEY, CATEGORIES_KEY, RECOMMENDED_KEY)
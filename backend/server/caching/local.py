@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalTTLCache:
+    """
+    Thread-safe in-process LRU whose entries also expire after ttl seconds.
+    With maxbytes it also keeps the total weight of its values, as measured
+    by weigh(value), within that many bytes; a value heavier than the whole
+    budget is not kept at all.
+    """
+
+    def __init__(self, maxsize, ttl, maxbytes=None, weigh=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.weigh = weigh
+        self.bytes = 0
+        # key -> (expires, value, weight)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value, _ = entry
+            if expires < time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        weight = self.weigh(value) if self.maxbytes is not None else 0
+        with self._lock:
+            self._pop(key)
+            if self.maxbytes is not None and weight > self.maxbytes:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value, weight)
+            self.bytes += weight
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.bytes > self.maxbytes
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
@@ -0,0 +1,198 @@
+"""
+Two-tier cache for expensive, read-mostly results.
+
+Each process keeps a small LRU (L1) with a short TTL in front of the shared
+Django cache (L2). Entries in L2 carry a soft expiry: past it they are still
+served while a single worker rebuilds them, and a little before it a reader
+may volunteer to rebuild early, with a probability that rises as expiry
+nears and with how long the value took to compute (probabilistic early
+expiration, "XFetch"). The rebuild is guarded by a lock taken with an atomic
+``add`` in L2, so when a popular key runs out during a sale one worker
+recomputes it and the others keep serving the old value, or wait briefly
+for the new one if there is no old value to serve.
+
+Counters of hits, misses and rebuilds are kept per process; see stats().
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..timing import record_cache
+from .local import LocalTTLCache
+
+CACHE_PREFIX = "tiered:"
+
+
+class TieredCache:
+    # Every cache created, for the metrics endpoint
+    instances = []
+
+    def __init__(self, name, ttl, shared=cache, local_bytes=None):
+        """
+        With local_bytes, the L1 also holds at most that many bytes of
+        values, for caches of bytes whose sizes vary widely
+        """
+        self.name = name
+        self.ttl = ttl
+        self.shared = shared
+        self.local = LocalTTLCache(
+            settings.TIERED_CACHE_LOCAL_SIZE,
+            settings.TIERED_CACHE_LOCAL_TTL,
+            maxbytes=local_bytes,
+            weigh=lambda entry: len(entry["value"]),
+        )
+        self._counts = Counter()
+        self._counts_lock = threading.Lock()
+        TieredCache.instances.append(self)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() to rebuild it"""
+        entry = self._local_entry(key)
+        if entry is not None:
+            return entry["value"]
+
+        entry = self.shared.get(self._key(key))
+        if entry is not None and not self._should_rebuild(entry):
+            self._count("l2_hits")
+            self.local.set(key, entry)
+            return entry["value"]
+
+        if self.shared.add(self._lock_key(key), 1, settings.TIERED_CACHE_LOCK_TIMEOUT):
+            try:
+                return self._rebuild(key, compute, entry)
+            finally:
+                self.shared.delete(self._lock_key(key))
+
+        if entry is not None:
+            self._count("stale_served")
+            return entry["value"]
+
+        # Nothing to fall back on: give the rebuilding worker a moment
+        self._count("waits")
+        deadline = time.monotonic() + settings.TIERED_CACHE_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.shared.get(self._key(key))
+            if entry is not None:
+                self.local.set(key, entry)
+                return entry["value"]
+        self._count("wait_timeouts")
+        return self._rebuild(key, compute, None)
+
+    async def aget_or_compute(self, key, compute):
+        """get_or_compute() for async views; compute is a coroutine function"""
+        entry = self._local_entry(key)
+        if entry is not None:
+            return entry["value"]
+
+        entry = await self.shared.aget(self._key(key))
+        if entry is not None and not self._should_rebuild(entry):
+            self._count("l2_hits")
+            self.local.set(key, entry)
+            return entry["value"]
+
+        if await self.shared.aadd(
+            self._lock_key(key), 1, settings.TIERED_CACHE_LOCK_TIMEOUT
+        ):
+            try:
+                return await self._arebuild(key, compute, entry)
+            finally:
+                await self.shared.adelete(self._lock_key(key))
+
+        if entry is not None:
+            self._count("stale_served")
+            return entry["value"]
+
+        self._count("waits")
+        deadline = time.monotonic() + settings.TIERED_CACHE_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self.shared.aget(self._key(key))
+            if entry is not None:
+                self.local.set(key, entry)
+                return entry["value"]
+        self._count("wait_timeouts")
+        return await self._arebuild(key, compute, None)
+
+    def invalidate(self, *keys):
+        """
+        Mark keys stale rather than deleting them, so the next reader
+        rebuilds while everyone else keeps the old value. Other processes
+        may serve their L1 copy for up to TIERED_CACHE_LOCAL_TTL seconds.
+        """
+        for key in keys:
+            self.local.delete(key)
+            entry = self.shared.get(self._key(key))
+            if entry is not None:
+                self.shared.set(
+                    self._key(key),
+                    {**entry, "expires": 0},
+                    settings.TIERED_CACHE_STALE_TTL,
+                )
+
+    def stats(self):
+        with self._counts_lock:
+            return dict(self._counts)
+
+    def _local_entry(self, key):
+        entry = self.local.get(key)
+        if entry is not None and entry["expires"] > time.time():
+            self._count("l1_hits")
+            return entry
+        return None
+
+    def _should_rebuild(self, entry):
+        # XFetch: rebuild early when now - delta * beta * ln(rand) >= expiry
+        now = time.time()
+        if entry["expires"] <= now:
+            return True
+        jitter = -entry["delta"] * settings.TIERED_CACHE_EARLY_BETA
+        if now + jitter * math.log(1 - random.random()) >= entry["expires"]:
+            self._count("early_rebuilds")
+            return True
+        return False
+
+    def _rebuild(self, key, compute, stale):
+        started = time.monotonic()
+        value = compute()
+        entry = self._entry(value, time.monotonic() - started, stale)
+        self.shared.set(self._key(key), entry, self._timeout())
+        self.local.set(key, entry)
+        return value
+
+    async def _arebuild(self, key, compute, stale):
+        started = time.monotonic()
+        value = await compute()
+        entry = self._entry(value, time.monotonic() - started, stale)
+        await self.shared.aset(self._key(key), entry, self._timeout())
+        self.local.set(key, entry)
+        return value
+
+    def _entry(self, value, delta, stale):
+        self._count("misses" if stale is None else "rebuilds")
+        return {"value": value, "delta": delta, "expires": time.time() + self.ttl}
+
+    def _timeout(self):
+        # Kept past its soft expiry so it can be served while being rebuilt
+        return self.ttl + settings.TIERED_CACHE_STALE_TTL
+
+    def _count(self, event):
+        with self._counts_lock:
+            self._counts[event] += 1
+        if event in ("l1_hits", "l2_hits", "stale_served"):
+            record_cache(hit=True)
+        elif event in ("misses", "rebuilds"):
+            record_cache(hit=False)
+
+    def _key(self, key):
+        return f"{CACHE_PREFIX}{self.name}:{key}"
+
+    def _lock_key(self, key):
+        return f"{CACHE_PREFIX}{self.name}:{key}:lock"
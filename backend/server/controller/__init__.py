@@ -14,7 +14,9 @@ from .admin_controller import (
     get_admin_stats,
     manage_products,
     manage_orders,
+    bulk_update_order_status,
 )
+from .analytics_controller import get_stats_timeseries
 from .customer_order_controller import (
     get_user_by_id,
     get_user_orders,
@@ -41,11 +43,13 @@ __all__ = [
     "forgot_password",
     "reset_password",
     "get_admin_stats",
+    "get_stats_timeseries",
     "get_user_by_id",
     "get_user_orders",
     "get_order_details",
     "manage_products",
     "manage_orders",
+    "bulk_update_order_status",
     "get_cart",
     "add_to_cart",
     "update_cart_item",
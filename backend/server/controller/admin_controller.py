@@ -1,16 +1,27 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Sum
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from ..models import Product, Order, Category, User, AdminStaff
-from ..serializers import ProductSerializer, CategorySerializer
+from ..models import (
+    AdminStaff,
+    ArchivedOrder,
+    DailySalesRollup,
+    Order,
+    Product,
+    User,
+)
+from ..serializers import ProductSerializer
+from ..middleware import invalidate_user_tokens
+from ..db_router import replica_reads
 
 
 @api_view(["GET"])
+@replica_reads
 def get_admin_stats(request):
     if not request.user.is_authenticated:
         return Response(
@@ -23,15 +34,22 @@ def get_admin_stats(request):
         )
 
     days = int(request.GET.get("days", 30))
-    start_date = timezone.now() - timedelta(days=days)
+    # The last `days` days including today, as the time series counts them
+    start_day = timezone.localdate() - timedelta(days=days - 1)
+
+    # Served from the daily rollup: one row per (day, status) in the window
+    window = DailySalesRollup.objects.filter(day__gte=start_day).aggregate(
+        total_sales=Sum("revenue", filter=Q(status="delivered")),
+        total_orders=Sum("order_count"),
+    )
+    pending = DailySalesRollup.objects.filter(
+        status="pending", order_count__gt=0
+    ).aggregate(total=Sum("order_count"))
 
     stats = {
-        "total_sales": Order.objects.filter(
-            created_at__gte=start_date, status="delivered"
-        ).aggregate(total=Sum("total_amount"))["total"]
-        or 0,
-        "total_orders": Order.objects.filter(created_at__gte=start_date).count(),
-        "pending_orders": Order.objects.filter(status="pending").count(),
+        "total_sales": window["total_sales"] or 0,
+        "total_orders": window["total_orders"] or 0,
+        "pending_orders": pending["total"] or 0,
         "low_stock_products": Product.objects.filter(stock__lt=10).count(),
     }
 
@@ -111,7 +129,7 @@ def manage_orders(request, order_id=None):
     if request.method == "GET":
         if order_id:
             try:
-                order = Order.objects.get(id=order_id)
+                order = Order.objects.select_related("user").get(id=order_id)
                 return Response(
                     {
                         "id": order.id,
@@ -126,17 +144,46 @@ def manage_orders(request, order_id=None):
                                 "quantity": item.quantity,
                                 "price": str(item.price),
                             }
-                            for item in order.items.all()
+                            for item in order.items.select_related("product")
                         ],
                         "user": order.user.username,
                     }
                 )
             except Order.DoesNotExist:
+                pass
+            # Archived orders can be read here but no longer changed
+            archived = (
+                ArchivedOrder.objects.select_related("user")
+                .prefetch_related("items")
+                .filter(id=order_id)
+                .first()
+            )
+            if archived is None:
                 return Response(
                     {"error": "Order not found"}, status=status.HTTP_404_NOT_FOUND
                 )
+            return Response(
+                {
+                    "id": archived.id,
+                    "order_number": archived.order_number,
+                    "status": archived.status,
+                    "total_amount": str(archived.total_amount),
+                    "shipping_address": archived.shipping_address,
+                    "created_at": archived.created_at,
+                    "items": [
+                        {
+                            "product": item.product_name,
+                            "quantity": item.quantity,
+                            "price": str(item.price),
+                        }
+                        for item in archived.items.all()
+                    ],
+                    "user": archived.user.username,
+                    "archived": True,
+                }
+            )
         else:
-            orders = Order.objects.all().order_by("-created_at")
+            orders = Order.objects.select_related("user").order_by("-created_at")
             return Response(
                 [
                     {
@@ -153,19 +200,24 @@ def manage_orders(request, order_id=None):
 
     elif request.method == "PUT":
         try:
-            order = Order.objects.get(id=order_id)
-            # Only allow updating order status
-            new_status = request.data.get("status")
-            if new_status in [s[0] for s in Order.STATUS_CHOICES]:
-                order.status = new_status
-                order.save()
-                return Response(
-                    {
-                        "id": order.id,
-                        "order_number": order.order_number,
-                        "status": order.status,
-                    }
-                )
+            with transaction.atomic():
+                # Lock the order so concurrent updates move it between
+                # rollup buckets exactly once
+                order = Order.objects.select_for_update().get(id=order_id)
+                # Only allow updating order status
+                new_status = request.data.get("status")
+                if new_status in [s[0] for s in Order.STATUS_CHOICES]:
+                    old_status = order.status
+                    order.status = new_status
+                    order.save()
+                    DailySalesRollup.objects.move_order(order, old_status)
+                    return Response(
+                        {
+                            "id": order.id,
+                            "order_number": order.order_number,
+                            "status": order.status,
+                        }
+                    )
             return Response(
                 {"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST
             )
@@ -175,11 +227,101 @@ def manage_orders(request, order_id=None):
             )
 
 
-@api_view(["GET"])
-def get_categories(request):
-    categories = Category.objects.all()
-    serializer = CategorySerializer(categories, many=True)
-    return Response(serializer.data)
+MAX_BULK_ORDERS = 1000
+
+
+@api_view(["POST"])
+def bulk_update_order_status(request):
+    """
+    Move a batch of orders to a new status with a single UPDATE.
+    Each order must currently be in a status allowed by Order.STATUS_TRANSITIONS.
+    """
+    if not request.user.is_authenticated:
+        return Response(
+            {"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    if not (request.user.is_staff or request.user.is_superuser):
+        return Response(
+            {"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    new_status = request.data.get("status")
+    if new_status not in [s[0] for s in Order.STATUS_CHOICES]:
+        return Response({"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
+
+    order_ids = request.data.get("order_ids")
+    if not isinstance(order_ids, list) or not order_ids:
+        return Response(
+            {"error": "order_ids must be a non-empty list"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(order_ids) > MAX_BULK_ORDERS:
+        return Response(
+            {"error": f"At most {MAX_BULK_ORDERS} orders can be updated at once"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        order_ids = list(dict.fromkeys(int(order_id) for order_id in order_ids))
+    except (TypeError, ValueError):
+        return Response(
+            {"error": "order_ids must be integers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    allowed_from = Order.allowed_from(new_status)
+
+    with transaction.atomic():
+        # Lock the candidates so the UPDATE below moves exactly these rows
+        orders = {
+            order.id: order
+            for order in Order.objects.select_for_update()
+            .filter(id__in=order_ids)
+            .only("id", "status", "total_amount", "created_at")
+        }
+        movable = [order for order in orders.values() if order.status in allowed_from]
+        if movable:
+            Order.objects.filter(
+                id__in=[order.id for order in movable], status__in=allowed_from
+            ).update(status=new_status, updated_at=timezone.now())
+            DailySalesRollup.objects.move_orders(movable, new_status)
+
+    results = []
+    for order_id in order_ids:
+        order = orders.get(order_id)
+        if order is None:
+            results.append(
+                {"id": order_id, "success": False, "error": "Order not found"}
+            )
+        elif order.status not in allowed_from:
+            results.append(
+                {
+                    "id": order_id,
+                    "success": False,
+                    "status": order.status,
+                    "error": f"Cannot change status from {order.status} to {new_status}",
+                }
+            )
+        else:
+            results.append(
+                {
+                    "id": order_id,
+                    "success": True,
+                    "previous_status": order.status,
+                    "status": new_status,
+                }
+            )
+
+    return Response(
+        {
+            "status": "success",
+            "data": {
+                "updated": len(movable),
+                "failed": len(results) - len(movable),
+                "results": results,
+            },
+        }
+    )
 
 
 @api_view(["GET"])
@@ -278,8 +420,13 @@ def manage_staff(request, staff_id):
             staff.username = data["username"]
 
         if "email" in data and data["email"] != staff.email:
-            # Check if email is already taken
-            if User.objects.filter(email=data["email"]).exclude(id=staff_id).exists():
+            # Check if email is already taken, ignoring case as the unique
+            # constraint does
+            if (
+                User.objects.filter_by_email(data["email"])
+                .exclude(id=staff_id)
+                .exists()
+            ):
                 return Response(
                     {"status": "error", "message": "Email already exists"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -304,7 +451,17 @@ def manage_staff(request, staff_id):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        staff.save()
+        # The constraints still decide if another update got there first
+        try:
+            with transaction.atomic():
+                staff.save()
+        except IntegrityError as e:
+            field = "Email" if "user_email_lower_unique" in str(e) else "Username"
+            return Response(
+                {"status": "error", "message": f"{field} already exists"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        invalidate_user_tokens(staff)
 
         return Response(
             {"status": "success", "message": "Staff member updated successfully"},
@@ -320,7 +477,8 @@ def manage_staff(request, staff_id):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Delete the staff member
+        # Delete the staff member; their tokens go with them
+        invalidate_user_tokens(staff)
         staff.delete()
 
         return Response(
@@ -0,0 +1,170 @@
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from ..db_router import replica_reads
+from ..models import DailyProductSalesRollup, DailySalesRollup, Order
+
+INTERVALS = ("day", "week", "month")
+MAX_DAYS = 366 * 3
+
+
+def bucket_start(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def build_buckets(start_day, end_day, interval):
+    """
+    Map every day of the window onto its bucket.
+    Returns the bucket labels and, for each day offset, the bucket index.
+    """
+    labels = []
+    index = array("l")
+    day = start_day
+    while day <= end_day:
+        start = bucket_start(day, interval)
+        if not labels or labels[-1] != start:
+            labels.append(start)
+        index.append(len(labels) - 1)
+        day += timedelta(days=1)
+    return labels, index
+
+
+def dense_series(rows, field, start_day, index, size, typecode="l"):
+    """Scatter sparse (day, value) rollup rows into a gap-filled bucket series"""
+    series = array(typecode, bytes(array(typecode).itemsize * size))
+    cast = float if typecode == "d" else int
+    for row in rows:
+        series[index[(row["day"] - start_day).days]] += cast(row[field])
+    return series
+
+
+def ranked(rows, key, name_key, top):
+    return [
+        {
+            "id": row[key],
+            "name": row[name_key] or "",
+            "units": row["units"] or 0,
+            "revenue": float(row["revenue"] or 0),
+        }
+        for row in rows.order_by("-revenue")[:top]
+    ]
+
+
+def build_timeseries(start_day, end_day, interval, top):
+    labels, index = build_buckets(start_day, end_day, interval)
+    size = len(labels)
+
+    status_rows = list(
+        DailySalesRollup.objects.filter(day__gte=start_day, day__lte=end_day).values(
+            "day", "status", "order_count", "revenue", "units"
+        )
+    )
+    sales_rows = [row for row in status_rows if row["status"] != "cancelled"]
+
+    orders_by_status = {
+        code: list(
+            dense_series(
+                [row for row in status_rows if row["status"] == code],
+                "order_count",
+                start_day,
+                index,
+                size,
+            )
+        )
+        for code, _ in Order.STATUS_CHOICES
+    }
+
+    product_rows = DailyProductSalesRollup.objects.filter(
+        day__gte=start_day, day__lte=end_day
+    )
+    top_products = ranked(
+        product_rows.values("product_id", "product__name").annotate(
+            units=Sum("units"), revenue=Sum("revenue")
+        ),
+        "product_id",
+        "product__name",
+        top,
+    )
+    top_categories = ranked(
+        product_rows.values("category_id", "category__name").annotate(
+            units=Sum("units"), revenue=Sum("revenue")
+        ),
+        "category_id",
+        "category__name",
+        top,
+    )
+
+    return {
+        "interval": interval,
+        "start": start_day,
+        "end": end_day,
+        "buckets": labels,
+        "revenue": list(
+            dense_series(sales_rows, "revenue", start_day, index, size, "d")
+        ),
+        "orders": list(
+            dense_series(status_rows, "order_count", start_day, index, size)
+        ),
+        "units": list(dense_series(sales_rows, "units", start_day, index, size)),
+        "orders_by_status": orders_by_status,
+        "top_products": top_products,
+        "top_categories": top_categories,
+    }
+
+
+@api_view(["GET"])
+@replica_reads
+def get_stats_timeseries(request):
+    """
+    Revenue, orders and units over time plus top products and categories,
+    served from the daily rollup tables
+    """
+    if not request.user.is_authenticated:
+        return Response(
+            {"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    if not (request.user.is_staff or request.user.is_superuser):
+        return Response(
+            {"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        days = int(request.GET.get("days", 30))
+        top = int(request.GET.get("top", 10))
+    except ValueError:
+        return Response(
+            {"error": "days and top must be integers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    interval = request.GET.get("interval", "day")
+    if interval not in INTERVALS:
+        return Response(
+            {"error": f"interval must be one of {', '.join(INTERVALS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    days = max(1, min(days, MAX_DAYS))
+    top = max(1, min(top, 100))
+
+    end_day = timezone.localdate()
+    start_day = end_day - timedelta(days=days - 1)
+
+    cache_key = f"stats-timeseries:{interval}:{start_day}:{end_day}:{top}"
+    data = cache.get(cache_key)
+    if data is None:
+        data = build_timeseries(start_day, end_day, interval, top)
+        cache.set(cache_key, data, settings.STATS_TIMESERIES_CACHE_TTL)
+
+    return Response({"status": "success", "data": data})
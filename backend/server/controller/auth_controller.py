@@ -1,22 +1,54 @@
-from django.contrib.auth import password_validation
-from django.core.exceptions import ValidationError
-from django.core.mail import EmailMessage
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
-from datetime import timedelta
-import uuid
+import logging
 import re
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
-from ..models.auth_model import Token
+from ..emails import password_reset_email, queue_email
+from ..middleware import (
+    LoginAccountRateThrottle,
+    LoginRateThrottle,
+    LoginUsernameRateThrottle,
+    PasswordResetRateThrottle,
+    RegisterRateThrottle,
+    invalidate_user_tokens,
+)
+from ..models.auth_model import PasswordResetToken, Token
 from ..models.user_model import User
+from ..passwords import (
+    HashingBusy,
+    make_password,
+    password_problems,
+    verify_password,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def request_device(request):
+    """Label for the signing-in device: client supplied, else its user agent"""
+    device = request.data.get("device") or request.META.get("HTTP_USER_AGENT", "")
+    return str(device)[:255]
+
+
+def hashing_busy_response():
+    return Response(
+        {
+            "status": "error",
+            "message": "Too many sign-in attempts right now, please retry shortly",
+        },
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
 
 
 @api_view(["POST"])
+@throttle_classes([RegisterRateThrottle])
 def register(request):
     data = request.data
 
@@ -41,28 +73,8 @@ def register(request):
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    if User.objects.filter(username=data["username"]).exists():
-        return Response(
-            {"status": "error", "message": "Username already exists"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    if User.objects.filter(email=data["email"]).exists():
-        return Response(
-            {"status": "error", "message": "Email already exists"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
     # Password validation
-    password = data["password"]
-    password_errors = []
-
-    if not any(char.isupper() for char in password):
-        password_errors.append("Password must contain at least one uppercase letter.")
-
-    if not any(char.isdigit() for char in password):
-        password_errors.append("Password must contain at least one number.")
-
+    password_errors = password_problems(data["password"])
     if password_errors:
         return Response(
             {"status": "error", "message": password_errors},
@@ -70,32 +82,37 @@ def register(request):
         )
 
     try:
-        password_validation.validate_password(data["password"])
-    except ValidationError as e:
-        return Response(
-            {"status": "error", "message": e.messages},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+        password_hash = make_password(data["password"])
+    except HashingBusy:
+        return hashing_busy_response()
 
     try:
-        user_data = {
-            "username": data["username"],
-            "email": data["email"],
-            "password": data["password"],
-            "first_name": data.get("first_name", ""),
-            "last_name": data.get("last_name", ""),
-        }
+        # Same normalisation as create_user, with the hash computed above
+        user = User(
+            username=User.normalize_username(data["username"]),
+            email=User.objects.normalize_email(data["email"]),
+            password=password_hash,
+            first_name=data.get("first_name", ""),
+            last_name=data.get("last_name", ""),
+        )
 
         if user_type == "admin":
-            user = User.objects.create_user(**user_data)
             user.is_staff = True
             if user_is_superuser:
                 user.is_superuser = True
-            user.save()
-        else:
-            user = User.objects.create_user(**user_data)
 
-        token = Token.objects.create(user=user)
+        # The unique constraints decide duplicates, so two concurrent signups
+        # cannot both take a username or email
+        try:
+            with transaction.atomic():
+                user.save()
+                token = Token.objects.create(user=user, device=request_device(request))
+        except IntegrityError as e:
+            field = "Email" if "user_email_lower_unique" in str(e) else "Username"
+            return Response(
+                {"status": "error", "message": f"{field} already exists"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         return Response(
             {
@@ -121,9 +138,11 @@ def register(request):
 
 
 @api_view(["POST"])
+@throttle_classes(
+    [LoginRateThrottle, LoginUsernameRateThrottle, LoginAccountRateThrottle]
+)
 def login(request):
     data = request.data
-    print("LOGIN REQUEST DATA:", data)
 
     if not all(k in data for k in ["username", "password"]):
         return Response(
@@ -137,33 +156,42 @@ def login(request):
     username_or_email = data.get("username", "")
     password = data.get("password", "")
 
-    print(f"Attempting to authenticate: {username_or_email}")
-
-    try:
-        user = User.objects.get(username=username_or_email)
-        if not user.check_password(password):
-            user = None
-            print("Password check failed")
-        else:
-            print("Authentication successful by username")
-    except User.DoesNotExist:
-        if "@" in username_or_email:
-            try:
-                user = User.objects.get(email=username_or_email)
-                if not user.check_password(password):
-                    user = None
-                    print("Password check failed for email user")
-                else:
-                    print("Authentication successful by email")
-            except User.DoesNotExist:
-                user = None
-                print("No user found with this email")
+    user = User.objects.get_by_login(username_or_email)
+    if user is None:
+        logger.info("Login failed", extra={"reason": "unknown_user"})
+    else:
+        found_by = (
+            "username"
+            if user.username.lower() == username_or_email.lower()
+            else "email"
+        )
+        try:
+            authenticated = verify_password(user, password)
+        except HashingBusy:
+            return hashing_busy_response()
+        if authenticated:
+            logger.debug(
+                "Login succeeded", extra={"user_id": user.pk, "found_by": found_by}
+            )
         else:
+            logger.info(
+                "Login failed",
+                extra={
+                    "reason": "wrong_password",
+                    "user_id": user.pk,
+                    "found_by": found_by,
+                },
+            )
             user = None
-            print("No user found with this username")
 
     if user:
-        token, _ = Token.objects.get_or_create(user=user)
+        # One token per device: reuse this device's live token, else issue one
+        device = request_device(request)
+        token = Token.objects.filter(
+            user=user, device=device, expires_at__gt=timezone.now()
+        ).first()
+        if token is None:
+            token = Token.objects.create(user=user, device=device)
 
         return Response(
             {
@@ -181,6 +209,8 @@ def login(request):
             }
         )
     else:
+        for throttle in (LoginUsernameRateThrottle(), LoginAccountRateThrottle()):
+            throttle.record_failure(request)
         return Response(
             {"status": "error", "message": "Invalid credentials"},
             status=status.HTTP_401_UNAUTHORIZED,
@@ -190,7 +220,16 @@ def login(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def logout(request):
-    Token.objects.filter(user=request.user).delete()
+    """
+    Sign out the current device, or every device with {"all": true}
+    """
+    tokens = Token.objects.filter(user=request.user)
+    if not request.data.get("all"):
+        tokens = tokens.filter(key=request.auth)
+    invalidate_user_tokens(
+        request.user, keys=list(tokens.values_list("key", flat=True))
+    )
+    tokens.delete()
     return Response({"status": "success"})
 
 
@@ -225,20 +264,7 @@ def validate_password(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    password = data["password"]
-    password_errors = []
-
-    if not any(char.isupper() for char in password):
-        password_errors.append("Password must contain at least one uppercase letter.")
-
-    if not any(char.isdigit() for char in password):
-        password_errors.append("Password must contain at least one number.")
-
-    try:
-        password_validation.validate_password(password)
-    except ValidationError as e:
-        password_errors.extend(e.messages)
-
+    password_errors = password_problems(data["password"])
     if password_errors:
         return Response(
             {"status": "error", "message": password_errors},
@@ -292,7 +318,18 @@ def update_address(request):
         if len(address_parts) >= 5:
             user.country = address_parts[4]
 
-        user.save()
+        # request.user may come from the token cache; only write what changed
+        user.save(
+            update_fields=[
+                "address",
+                "city",
+                "state",
+                "postal_code",
+                "country",
+                "updated_at",
+            ]
+        )
+        invalidate_user_tokens(user)
 
         return Response(
             {
@@ -341,7 +378,9 @@ def update_profile(request):
         if "last_name" in data:
             user.last_name = data["last_name"]
 
-        user.save()
+        # request.user may come from the token cache; only write what changed
+        user.save(update_fields=["username", "first_name", "last_name", "updated_at"])
+        invalidate_user_tokens(user)
 
         return Response(
             {
@@ -362,6 +401,7 @@ def update_profile(request):
 
 
 @api_view(["POST"])
+@throttle_classes([PasswordResetRateThrottle])
 def forgot_password(request):
     """
     Process forgot password request and send reset email
@@ -379,9 +419,8 @@ def forgot_password(request):
             {"status": "error", "message": "Invalid email format"},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
+    user = User.objects.filter_by_email(email).first()
+    if user is None:
         return Response(
             {
                 "status": "success",
@@ -390,88 +429,11 @@ def forgot_password(request):
             status=status.HTTP_200_OK,
         )
 
-    # Generate reset token
-    reset_token = uuid.uuid4().hex
-
-    # Set reset token and expiration
-    user.reset_token = reset_token
-    user.reset_token_expiry = timezone.now() + timedelta(hours=24)
-    user.save()
-    reset_url = f"{settings.FRONTEND_URL}/reset_password?token={reset_token}"
-    email_body_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Password Reset</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="text-align: center; margin-bottom: 20px;">
-                <h2 style="color: #4a6ee0;">Resonance Sound Shop</h2>
-                <div style="height: 3px; background-color: #f97316; width: 100px; margin: 0 auto;"></div>
-            </div>
-            
-            <p>Hello {user.first_name or user.username},</p>
-            
-            <p>We received a request to reset the password for your Resonance Sound Shop account.</p>
-            
-            <div style="margin: 30px 0; text-align: center;">
-                <a href="{reset_url}" style="background-color: #f97316; color: white; padding: 12px 20px; text-decoration: none; border-radius: 4px; font-weight: bold; display: inline-block;">Reset Your Password</a>
-            </div>
-            
-            <p>If you didn't request this password reset, you can safely ignore this email - your account is secure.</p>
-            
-            <p>This link will expire in 24 hours.</p>
-            
-            <p>Best regards,<br>
-            The Resonance Sound Shop Team</p>
-            
-            <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; font-size: 12px; color: #777;">
-                <p>This is an automated message, please do not reply to this email.</p>
-                <p>&copy; 2025 Resonance Sound Shop. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
-    """
-    email_body = f"""
-        Hello {user.first_name or user.username},
-
-        You recently requested to reset your password for your Resonance Sound Shop account.
-
-        Your password reset link is below:
-        {reset_url}
-
-        This link will expire in 24 hours.
-
-        If you did not request this password reset, no action is needed.
-
-        Regards,
-        Resonance Sound Shop
-    """
-
-    # Send email
-    try:
-        email_message = EmailMessage(
-            subject="Reset Your Resonance Sound Shop Password",
-            body=email_body,
-            from_email=f"Resonance Sound Shop <{settings.DEFAULT_FROM_EMAIL}>",
-            to=[email],
-        )
-        email_message.content_subtype = "html"
-        email_message.body = email_body_html
-        email_message.extra_headers = {
-            "X-Priority": "1",
-            "X-MSMail-Priority": "High",
-            "Importance": "High",
-            "X-Auto-Response-Suppress": "OOF, DR, AutoReply",
-        }
-        email_message.send(fail_silently=False)
-
-    except Exception as e:
-        return Response(
-            {"status": "error", "message": f"Failed to send email: {str(e)}"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
+    # The email goes out through the outbox worker, committed with the token
+    with transaction.atomic():
+        reset_token = PasswordResetToken.objects.issue(user)
+        reset_url = f"{settings.FRONTEND_URL}/reset_password?token={reset_token}"
+        queue_email(**password_reset_email(user, reset_url))
 
     return Response(
         {
@@ -495,38 +457,48 @@ def reset_password(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    token = data["token"]
     new_password = data["password"]
 
-    try:
-        user = User.objects.get(reset_token=token)
-    except User.DoesNotExist:
+    reset_token = PasswordResetToken.objects.lookup(data["token"])
+    if reset_token is None:
         return Response(
             {"status": "error", "message": "Invalid or expired token"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
     # Check if token is expired
-    if not user.reset_token_expiry or user.reset_token_expiry < timezone.now():
+    if reset_token.is_expired:
         return Response(
             {"status": "error", "message": "Reset token has expired"},
             status=status.HTTP_400_BAD_REQUEST,
         )
+    user = reset_token.user
 
     # Validate new password
-    try:
-        password_validation.validate_password(new_password, user)
-    except ValidationError as e:
+    password_errors = password_problems(new_password, user)
+    if password_errors:
         return Response(
-            {"status": "error", "message": e.messages},
+            {"status": "error", "message": password_errors},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    user.set_password(new_password)
-
-    user.reset_token = None
-    user.reset_token_expiry = None
-    user.save()
+    try:
+        user.password = make_password(new_password)
+    except HashingBusy:
+        return hashing_busy_response()
+
+    with transaction.atomic():
+        # Single use: only the request that marks the token used may reset
+        consumed = PasswordResetToken.objects.filter(
+            pk=reset_token.pk, used_at__isnull=True
+        ).update(used_at=timezone.now())
+        if not consumed:
+            return Response(
+                {"status": "error", "message": "Invalid or expired token"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        user.save(update_fields=["password", "updated_at"])
+    invalidate_user_tokens(user)
 
     return Response(
         {
@@ -549,25 +521,23 @@ def validate_reset_token(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    token = data["token"]
-    try:
-        user = User.objects.get(reset_token=token)
-
-        if not user.reset_token_expiry or user.reset_token_expiry < timezone.now():
-            return Response(
-                {"status": "error", "message": "Reset token has expired"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+    reset_token = PasswordResetToken.objects.lookup(data["token"])
+    if reset_token is None:
         return Response(
-            {
-                "status": "success",
-                "message": "Token is valid",
-                "username": user.username,
-            },
-            status=status.HTTP_200_OK,
+            {"status": "error", "message": "Invalid token"},
+            status=status.HTTP_400_BAD_REQUEST,
         )
-    except User.DoesNotExist:
+
+    if reset_token.is_expired:
         return Response(
-            {"status": "error", "message": "Invalid token"},
+            {"status": "error", "message": "Reset token has expired"},
             status=status.HTTP_400_BAD_REQUEST,
         )
+    return Response(
+        {
+            "status": "success",
+            "message": "Token is valid",
+            "username": reset_token.user.username,
+        },
+        status=status.HTTP_200_OK,
+    )
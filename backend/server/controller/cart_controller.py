@@ -1,4 +1,7 @@
+import logging
+
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -6,6 +9,8 @@ from rest_framework import status
 
 from ..models import Cart, CartItem, Product
 
+logger = logging.getLogger(__name__)
+
 
 def get_cart_data(user):
     """Helper function to fetch cart data for a user."""
@@ -14,7 +19,7 @@ def get_cart_data(user):
 
     # Get cart items with product details
     items = []
-    for item in cart.items.all():
+    for item in cart.items.select_related("product__category"):
         items.append(
             {
                 "id": item.product.id,
@@ -51,7 +56,6 @@ def add_to_cart(request):
     """
     user = request.user
     data = request.data
-    print(f"Raw data: {request.user.id} - {data}")
 
     if not data.get("product_id"):
         return Response(
@@ -71,7 +75,6 @@ def add_to_cart(request):
     try:
         # Get the product
         product = get_object_or_404(Product, id=product_id)
-        print(f"Product found: {product.id}, Stock: {product.stock}")
 
         # Check stock
         if product.stock < quantity:
@@ -85,33 +88,34 @@ def add_to_cart(request):
 
         # Get or create cart
         cart, created = Cart.objects.get_or_create(user=user)
-        print(f"Cart {'created' if created else 'retrieved'}: {cart.id}")
 
         # Check if item already exists in cart
         try:
             cart_item = CartItem.objects.get(cart=cart, product=product)
-            print(
-                f"CartItem found: {cart_item.id}, Current quantity: {cart_item.quantity}"
-            )
             # Update quantity
             cart_item.quantity += quantity
             cart_item.save()
-            print(f"Updated CartItem quantity: {cart_item.quantity}")
         except CartItem.DoesNotExist:
             # Create new cart item
             cart_item = CartItem.objects.create(
                 cart=cart, product=product, quantity=quantity
             )
-            print(f"Created new CartItem: {cart_item.id}")
+        logger.debug(
+            "Added to cart",
+            extra={
+                "cart_id": cart.id,
+                "product_id": product.id,
+                "added": quantity,
+                "quantity": cart_item.quantity,
+                "stock": product.stock,
+            },
+        )
 
         # Return updated cart
         return Response(get_cart_data(user))
 
     except Exception as e:
-        import traceback
-
-        print(f"Error in add_to_cart: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("add_to_cart failed")
         return Response(
             {"status": "error", "message": f"Server error: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -239,58 +243,74 @@ def clear_cart(request):
 # @permission_classes([IsAuthenticated])
 def sync_cart(request):
     """Sync the local cart with the server"""
-    print(f"User authenticated: {request.user.is_authenticated}")
-    print(f"User: {request.user}")
-
     data = request.data
-    print(f"Raw data: {data}")
-
     items_data = data.get("items", [])
-    print(f"Items data: {items_data}")
+    logger.debug(
+        "Syncing cart",
+        extra={
+            "user_id": request.user.pk,
+            "items": len(items_data),
+            "replace_all": bool(data.get("replace_all", False)),
+        },
+    )
 
     try:
         cart, created = Cart.objects.get_or_create(user=request.user)
+        replace_all = data.get("replace_all", False)
 
-        if data.get("replace_all", False):
+        if replace_all:
             cart.items.all().delete()
 
+        wanted = []
         for item in items_data:
             try:
-                print(f"Item: {item}")
-                product_id = int(item.get("id"))
-                quantity = int(item.get("quantity", 1))
+                wanted.append((int(item.get("id")), int(item.get("quantity", 1))))
             except (TypeError, ValueError):
-                print(f"Error converting values for item: {item}")
-                continue
+                logger.debug("Skipped malformed cart item", extra={"item": item})
 
-            try:
-                # Get the product and create/update cart item
-                product = Product.objects.get(id=product_id)
+        # One query for the products and one for the lines already in the
+        # cart, then one write each for new and changed lines
+        products = Product.objects.in_bulk({product_id for product_id, _ in wanted})
+        lines = (
+            {} if replace_all else {line.product_id: line for line in cart.items.all()}
+        )
+        changed = {}
+        now = timezone.now()
+        for product_id, quantity in wanted:
+            product = products.get(product_id)
+            if product is None:
+                logger.debug(
+                    "Skipped unknown product", extra={"product_id": product_id}
+                )
+                continue
 
-                # Update quantity based on available stock
-                quantity = min(quantity, product.stock)
-                if quantity <= 0:
-                    continue
+            # Update quantity based on available stock
+            quantity = min(quantity, product.stock)
+            if quantity <= 0:
+                continue
 
-                # Create or update the cart item
-                cart_item, created = CartItem.objects.get_or_create(
-                    cart=cart, product=product, defaults={"quantity": quantity}
+            # Create or update the cart item
+            cart_item = lines.get(product_id)
+            if cart_item is None:
+                lines[product_id] = CartItem(
+                    cart=cart, product=product, quantity=quantity
                 )
-
-                if not created and not data.get("replace_all", False):
-                    cart_item.quantity += quantity
-                    cart_item.save()
-            except Product.DoesNotExist:
-                print(f"Product with id {product_id} not found")
+            elif not replace_all:
+                cart_item.quantity += quantity
+                if cart_item.pk is not None:
+                    cart_item.updated_at = now
+                    changed[product_id] = cart_item
+
+        CartItem.objects.bulk_create(
+            [line for line in lines.values() if line.pk is None]
+        )
+        CartItem.objects.bulk_update(changed.values(), ["quantity", "updated_at"])
 
         # Return the updated cart
         return Response(get_cart_data(request.user))
 
     except Exception as e:
-        import traceback
-
-        print(f"Exception occurred: {e}")
-        print(traceback.format_exc())
+        logger.exception("sync_cart failed")
         return Response(
             {"status": "error", "message": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
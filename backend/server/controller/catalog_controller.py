@@ -0,0 +1,96 @@
+"""
+Read-only catalog endpoints as native async views.
+
+Under the ASGI profile (see gunicorn.conf.py) these run on the event loop
+with Django's async ORM and cache, so a slow client or query no longer holds
+a worker thread. They render with the renderer the DRF views use, so their
+output is the same as the DRF views they replaced. Under WSGI Django runs
+them in a per-request event loop. Apart from the stock check, their reads
+may be served by a replica. The product listings carry stock, so unlike
+the categories their compressed form is not cached.
+"""
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from ..caching.catalog import CATEGORIES_KEY, catalog_cache
+from ..db_router import replica_reads
+from ..middleware.compression import cache_compressed
+from ..models import Category, Product
+from ..renderers import ORJSONRenderer
+from ..serializers import CategorySerializer, ProductSerializer
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        ORJSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+def not_found(model):
+    # Matches DRF's rendering of get_object_or_404
+    return json_response(
+        {"detail": f"No {model._meta.object_name} matches the given query."},
+        status=404,
+    )
+
+
+@require_GET
+@replica_reads
+async def get_all_products(request):
+    products = [product async for product in Product.objects.all()]
+    return json_response(ProductSerializer(products, many=True).data)
+
+
+@require_GET
+@replica_reads
+async def get_product_by_category(request, category):
+    try:
+        category_obj = await Category.objects.aget(slug=category)
+    except Category.DoesNotExist:
+        return json_response({"error": "Category not found"}, status=404)
+    products = [
+        product async for product in Product.objects.filter(category=category_obj)
+    ]
+    return json_response(ProductSerializer(products, many=True).data)
+
+
+@require_GET
+@replica_reads
+async def get_product_detailed(request, category, id):
+    return await get_product_detailed_single_route(request, id)
+
+
+@require_GET
+@replica_reads
+async def get_product_detailed_single_route(request, id):
+    try:
+        product = await Product.objects.aget(pk=id)
+    except Product.DoesNotExist:
+        return not_found(Product)
+    return json_response(ProductSerializer(product).data)
+
+
+@require_GET
+async def check_product_stock(request, id):
+    # Always read from the database: checkout relies on this being current
+    product = await Product.objects.filter(id=id).values("id", "stock").afirst()
+    if product is None:
+        return json_response(
+            {"status": "error", "message": "Product not found"}, status=404
+        )
+    return json_response({"status": "success", "data": product})
+
+
+@require_GET
+@replica_reads
+@cache_compressed
+async def get_categories(request):
+    return json_response(
+        await catalog_cache.aget_or_compute(CATEGORIES_KEY, load_categories)
+    )
+
+
+async def load_categories():
+    categories = [category async for category in Category.objects.all()]
+    return list(CategorySerializer(categories, many=True).data)
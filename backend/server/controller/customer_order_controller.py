@@ -1,16 +1,30 @@
 from django.db import transaction
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+import logging
 import uuid
 from decimal import Decimal
-from ..models import Order, OrderItem, Product, User
+from ..models import (
+    ArchivedOrder,
+    Order,
+    OrderItem,
+    Product,
+    User,
+    DailySalesRollup,
+    DailyProductSalesRollup,
+)
 from django.shortcuts import get_object_or_404
+from ..middleware import CheckoutRateThrottle, invalidate_user_tokens
+from ..payments import enqueue_payment
+
+logger = logging.getLogger(__name__)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@throttle_classes([CheckoutRateThrottle])
 def create_order(request):
     user = request.user
     data = request.data
@@ -48,10 +62,21 @@ def create_order(request):
             if len(address_parts) >= 5:
                 user.country = address_parts[4].strip()
 
-            user.save()
-        except Exception as e:
+            # request.user may come from the token cache; only write the address
+            user.save(
+                update_fields=[
+                    "address",
+                    "city",
+                    "state",
+                    "postal_code",
+                    "country",
+                    "updated_at",
+                ]
+            )
+            invalidate_user_tokens(user)
+        except Exception:
             # Log the error but continue with order creation
-            print(f"Error saving address: {str(e)}")
+            logger.warning("Could not save the shipping address", exc_info=True)
 
     items_data = data.get("items")
     if not items_data:
@@ -64,6 +89,8 @@ def create_order(request):
         with transaction.atomic():
             order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
             total_amount = Decimal("0.00")
+            total_units = 0
+            lines = []
 
             # Create order
             order = Order.objects.create(
@@ -74,32 +101,48 @@ def create_order(request):
                 payment_status=False,
             )
 
-            # Create order items
+            # Create order items; the products are read in one query and
+            # their stock and the lines written in one more each
+            products = Product.objects.in_bulk(
+                {
+                    int(item_data["product_id"])
+                    for item_data in items_data
+                    if str(item_data.get("product_id")).isdigit()
+                }
+            )
+            order_items = []
             for item_data in items_data:
                 product_id = item_data.get("product_id")
                 quantity = item_data.get("quantity", 1)
                 price = Decimal(str(item_data.get("price")))
-                try:
-                    product = Product.objects.get(id=product_id)
-                    if product.stock < quantity:
-                        raise ValueError(
-                            f"Not enough stock for {product.name}. Available: {product.stock}"
-                        )
-
-                    product.stock -= quantity
-                    product.save()
-
-                except Product.DoesNotExist:
+                product = (
+                    products.get(int(product_id)) if str(product_id).isdigit() else None
+                )
+                if product is None:
                     raise ValueError(f"Product with ID {product_id} not found")
-
-                OrderItem.objects.create(
-                    order=order, product=product, quantity=quantity, price=price
+                if product.stock < quantity:
+                    raise ValueError(
+                        f"Not enough stock for {product.name}. Available: {product.stock}"
+                    )
+
+                product.stock -= quantity
+                order_items.append(
+                    OrderItem(
+                        order=order, product=product, quantity=quantity, price=price
+                    )
                 )
 
                 total_amount += price * quantity
+                total_units += quantity
+                lines.append((product.id, product.category_id, quantity, price))
+
+            Product.objects.bulk_update(products.values(), ["stock"])
+            OrderItem.objects.bulk_create(order_items)
 
             order.total_amount = total_amount
             order.save()
+            DailySalesRollup.objects.record_order(order, units=total_units)
+            DailyProductSalesRollup.objects.record_order(order, lines)
 
             return Response(
                 {
@@ -127,43 +170,79 @@ def create_order(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@throttle_classes([CheckoutRateThrottle])
 def process_payment(request, order_id):
-    """Process payment for a specific order"""
+    """
+    Start payment for a specific order. Cash on delivery is accepted right
+    away; other methods are queued for the payment worker and the client
+    polls the returned intent.
+    """
     user = request.user
     data = request.data
+    payment_method = data.get("payment_method", "credit_card")
 
     try:
-        # Get the order and verify it belongs to the authenticated user
-        order = get_object_or_404(Order, id=order_id, user=user)
-
-        # Update order payment details
-        order.payment_status = data.get("payment_status", True)
-
-        # Update payment method
-        order.payment_method = data.get("payment_method", "credit_card")
-
-        # Set payment date to current time
-        from django.utils import timezone
+        if payment_method == "cod":
+            with transaction.atomic():
+                # Get the order and verify it belongs to the authenticated user
+                order = get_object_or_404(
+                    Order.objects.select_for_update(), id=order_id, user=user
+                )
 
-        order.payment_date = timezone.now()
+                # Only a pending order can be confirmed; anything further
+                # along, paid or cancelled must not be reset to processing
+                if order.status not in Order.allowed_from("processing"):
+                    return Response(
+                        {
+                            "status": "error",
+                            "message": f"Cannot confirm an order that is {order.status}",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+                # Paid on delivery, so only the method is recorded now
+                old_status = order.status
+                order.payment_status = False
+                order.payment_method = payment_method
+                order.status = "processing"
+
+                # Save the order and move it to its new rollup bucket
+                order.save()
+                DailySalesRollup.objects.move_order(order, old_status)
 
-        # Update order status to processing after payment
-        order.status = "processing"
+            return Response(
+                {
+                    "status": "success",
+                    "message": "Order confirmed for cash on delivery",
+                    "data": {
+                        "order_id": order.id,
+                        "order_number": order.order_number,
+                        "payment_status": order.payment_status,
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        # Save the order
-        order.save()
+        order = get_object_or_404(Order, id=order_id, user=user)
+        if order.payment_status:
+            return Response(
+                {"status": "error", "message": "Order is already paid"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        intent = enqueue_payment(order, payment_method)
 
         return Response(
             {
                 "status": "success",
-                "message": "Payment processed successfully",
+                "message": "Payment is being processed",
                 "data": {
                     "order_id": order.id,
                     "order_number": order.order_number,
                     "payment_status": order.payment_status,
+                    "payment_intent": {"id": intent.id, "status": intent.status},
                 },
             },
-            status=status.HTTP_200_OK,
+            status=status.HTTP_202_ACCEPTED,
         )
     except Exception as e:
         return Response(
@@ -181,12 +260,39 @@ def get_user_by_id(request, user_id):
         return Response({"error": "User not found"}, status=404)
 
 
+def archived_order_data(order):
+    """An archived order in the shape the order endpoints return"""
+    return {
+        "id": order.id,
+        "order_number": order.order_number,
+        "status": order.status,
+        "total_amount": str(order.total_amount),
+        "shipping_address": order.shipping_address,
+        "payment_status": order.payment_status,
+        "created_at": order.created_at,
+        "archived": True,
+        "items": [
+            {
+                "product": item.product_name,
+                "quantity": item.quantity,
+                "price": str(item.price),
+                "subtotal": str(item.price * item.quantity),
+            }
+            for item in order.items.all()
+        ],
+    }
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_user_orders(request):
     """Get all orders for the authenticated user"""
     user = request.user
-    orders = Order.objects.filter(user=user).order_by("-created_at")
+    orders = (
+        Order.objects.filter(user=user)
+        .order_by("-created_at")
+        .prefetch_related("items__product")
+    )
 
     orders_data = []
     for order in orders:
@@ -214,6 +320,14 @@ def get_user_orders(request):
             }
         )
 
+    # Delivered orders older than the archival window live in the archive
+    # tables and are only read when explicitly requested
+    if request.GET.get("include_archived") in ("1", "true"):
+        archived = ArchivedOrder.objects.filter(user=user).order_by("-created_at")
+        orders_data.extend(
+            archived_order_data(order) for order in archived.prefetch_related("items")
+        )
+
     return Response(
         {"status": "success", "data": orders_data},
         status=status.HTTP_200_OK,
@@ -231,7 +345,7 @@ def get_order_details(request, order_id):
         order = Order.objects.get(id=order_id, user=user)
 
         order_items = []
-        for item in order.items.all():
+        for item in order.items.select_related("product"):
             order_items.append(
                 {
                     "product": item.product.name,
@@ -257,6 +371,16 @@ def get_order_details(request, order_id):
             status=status.HTTP_200_OK,
         )
     except Order.DoesNotExist:
+        archived = (
+            ArchivedOrder.objects.filter(id=order_id, user=user)
+            .prefetch_related("items")
+            .first()
+        )
+        if archived is not None:
+            return Response(
+                {"status": "success", "data": archived_order_data(archived)},
+                status=status.HTTP_200_OK,
+            )
         return Response(
             {"status": "error", "message": "Order not found"},
             status=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,91 @@
+import json
+
+from rest_framework import status
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import PaymentIntent
+from ..payments import complete_intent, get_gateway
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_payment_status(request, intent_id):
+    """Poll the state of a queued payment"""
+    try:
+        intent = PaymentIntent.objects.select_related("order").get(
+            id=intent_id, order__user=request.user
+        )
+    except PaymentIntent.DoesNotExist:
+        return Response(
+            {"status": "error", "message": "Payment not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(
+        {
+            "status": "success",
+            "data": {
+                "id": intent.id,
+                "order_id": intent.order_id,
+                "status": intent.status,
+                "amount": str(intent.amount),
+                "payment_method": intent.payment_method,
+                "error": intent.last_error if intent.status == "failed" else "",
+                "payment_status": intent.order.payment_status,
+            },
+        }
+    )
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def payment_webhook(request):
+    """
+    Completion callback from the payment gateway. The raw body must be
+    signed with PAYMENT_WEBHOOK_SECRET in the X-Payment-Signature header.
+    """
+    body = request.body
+    if not get_gateway().verify_webhook(
+        body, request.META.get("HTTP_X_PAYMENT_SIGNATURE", "")
+    ):
+        return Response(
+            {"status": "error", "message": "Invalid signature"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        payload = json.loads(body)
+        intent_id = int(payload["intent_id"])
+        outcome = payload["status"]
+    except (ValueError, KeyError, TypeError):
+        return Response(
+            {"status": "error", "message": "Malformed payload"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if outcome not in ("succeeded", "failed"):
+        return Response(
+            {"status": "error", "message": "Invalid status"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        intent = complete_intent(
+            intent_id,
+            succeeded=outcome == "succeeded",
+            reference=payload.get("reference", ""),
+            error=payload.get("error", ""),
+        )
+    except PaymentIntent.DoesNotExist:
+        return Response(
+            {"status": "error", "message": "Payment not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response({"status": "success", "data": {"status": intent.status}})
@@ -1,12 +1,15 @@
-from django.db.models import Count
+from django.db.models import Count, Max, Min, Q
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import permission_classes
 from rest_framework import status
-from server.models import Product, Category
+from server.models import Product
 from server.serializers import ProductSerializer
+from server.db_router import replica_reads
+from server.middleware.compression import cache_compressed
+from server.caching.catalog import FILTERS_KEY, RECOMMENDED_KEY, catalog_cache
 from django.conf import settings
 import requests
 
@@ -17,43 +20,17 @@ class initializeController_Product:
 
 
 @api_view(["GET"])
-def get_all_products(request):
-    products = Product.objects.all()
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
-
-
-@api_view(["GET"])
-def get_product_by_category(request, category):
-    try:
-        category_obj = Category.objects.get(slug=category)
-        products = Product.objects.filter(category=category_obj)
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
-    except Category.DoesNotExist:
-        return Response({"error": "Category not found"}, status=404)
-
-
-@api_view(["GET"])
-def get_product_detailed(request, category, id):
-    product = get_object_or_404(Product, pk=id)
-    serializer = ProductSerializer(product)
-    return Response(serializer.data)
-
-
-@api_view(["GET"])
-def get_product_detailed_single_route(request, id):
-    product = get_object_or_404(Product, pk=id)
-    serializer = ProductSerializer(product)
-    return Response(serializer.data)
-
-
-@api_view(["GET"])
+@replica_reads
+@cache_compressed
 def get_product_filters(request):
     """
     Get unique filter options for the product filters
     Returns all unique brands, connection types, etc. from the products database
     """
+    return Response(catalog_cache.get_or_compute(FILTERS_KEY, load_product_filters))
+
+
+def load_product_filters():
     # Get unique brands and count of products for each
     brands = (
         Product.objects.values("brand").annotate(count=Count("brand")).order_by("brand")
@@ -66,21 +43,20 @@ def get_product_filters(request):
         .order_by("connections")
     )
 
-    # Get price ranges (calculated on the fly)
-    price_min = (
-        Product.objects.order_by("price").first().price
-        if Product.objects.exists()
-        else 0
-    )
-    price_max = (
-        Product.objects.order_by("-price").first().price
-        if Product.objects.exists()
-        else 1000
+    # Price bounds and the count in each range, in one query
+    prices = Product.objects.aggregate(
+        price_min=Min("price"),
+        price_max=Max("price"),
+        under_100=Count("id", filter=Q(price__lt=100)),
+        from_100=Count("id", filter=Q(price__gte=100, price__lt=300)),
+        from_300=Count("id", filter=Q(price__gte=300, price__lt=500)),
+        over_500=Count("id", filter=Q(price__gte=500)),
     )
+    price_min, price_max = prices["price_min"], prices["price_max"]
 
     # Create price ranges based on actual data
     price_ranges = []
-    if Product.objects.exists():
+    if price_min is not None:
         # Define price ranges
         if price_min < 100:
             price_ranges.append(
@@ -88,7 +64,7 @@ def get_product_filters(request):
                     "name": "Under $100",
                     "min": 0,
                     "max": 99.99,
-                    "count": Product.objects.filter(price__lt=100).count(),
+                    "count": prices["under_100"],
                 }
             )
 
@@ -98,9 +74,7 @@ def get_product_filters(request):
                     "name": "$100 - $300",
                     "min": 100,
                     "max": 299.99,
-                    "count": Product.objects.filter(
-                        price__gte=100, price__lt=300
-                    ).count(),
+                    "count": prices["from_100"],
                 }
             )
 
@@ -110,9 +84,7 @@ def get_product_filters(request):
                     "name": "$300 - $500",
                     "min": 300,
                     "max": 499.99,
-                    "count": Product.objects.filter(
-                        price__gte=300, price__lt=500
-                    ).count(),
+                    "count": prices["from_300"],
                 }
             )
 
@@ -122,7 +94,7 @@ def get_product_filters(request):
                     "name": "Over $500",
                     "min": 500,
                     "max": None,
-                    "count": Product.objects.filter(price__gte=500).count(),
+                    "count": prices["over_500"],
                 }
             )
     else:
@@ -133,14 +105,12 @@ def get_product_filters(request):
             {"name": "Over $500", "min": 500, "max": None, "count": 0},
         ]
 
-    return Response(
-        {
-            "brands": list(brands),
-            "connections": list(connections),
-            "types": [],
-            "price_ranges": price_ranges,
-        }
-    )
+    return {
+        "brands": list(brands),
+        "connections": list(connections),
+        "types": [],
+        "price_ranges": price_ranges,
+    }
 
 
 @api_view(["POST"])
@@ -211,25 +181,32 @@ def delete_product_image(request, product_id):
 
 
 @api_view(["GET"])
-def check_product_stock(request, id):
-    try:
-        product = Product.objects.get(id=id)
-        return Response(
-            {"status": "success", "data": {"id": product.id, "stock": product.stock}}
-        )
-    except Product.DoesNotExist:
-        return Response(
-            {"status": "error", "message": "Product not found"},
-            status=status.HTTP_404_NOT_FOUND,
-        )
-
-
-@api_view(["GET"])
+@replica_reads
 def get_recommended_products(request):
     """
     Get recommended products based on popularity or featured status.
+    The list is cached, but stock moves with every order without touching
+    the catalog cache, so it is read fresh for each request.
     """
-    recommended_products = Product.objects.filter(is_featured=True)[:10]
-    serializer = ProductSerializer(recommended_products, many=True)
+    products = catalog_cache.get_or_compute(RECOMMENDED_KEY, load_recommended_products)
+    stock = dict(
+        Product.objects.filter(
+            id__in=[product["id"] for product in products]
+        ).values_list("id", "stock")
+    )
+    return Response(
+        [
+            {**product, "stock": stock[product["id"]]}
+            for product in products
+            if product["id"] in stock
+        ]
+    )
 
-    return Response(serializer.data)
+
+def load_recommended_products():
+    recommended_products = Product.objects.filter(is_featured=True)[:10]
+    products = list(ProductSerializer(recommended_products, many=True).data)
+    for product in products:
+        # Filled in per request; None keeps the field in its place
+        product["stock"] = None
+    return products
@@ -0,0 +1,71 @@
+"""
+Read-replica routing.
+
+Replicas are the DATABASES aliases named ``replica*`` (see settings). Reads
+only go to one when the view opted in with ``@replica_reads`` - the catalog
+and stats views, which tolerate a little lag - and the client has not
+written recently. ReplicaRoutingMiddleware pins a client to the primary for
+DB_REPLICA_STICKY_SECONDS after any successful write, so nobody reads a
+replica that has not caught up with their own cart or order yet.
+"""
+
+import random
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+
+# Set by @replica_reads for the duration of the view
+replica_requested = ContextVar("replica_requested", default=False)
+# Set by ReplicaRoutingMiddleware for clients that wrote recently
+primary_pinned = ContextVar("primary_pinned", default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith("replica")]
+
+
+def replica_reads(view):
+    """Let the view's reads be served by a replica"""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            token = replica_requested.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                replica_requested.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = replica_requested.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            replica_requested.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if replica_requested.get() and not primary_pinned.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        return db == "default"
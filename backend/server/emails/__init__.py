@@ -0,0 +1,10 @@
+from .messages import password_reset_email
+from .outbox import queue_email, claim_emails, deliver_email, retry_email
+
+__all__ = [
+    "password_reset_email",
+    "queue_email",
+    "claim_emails",
+    "deliver_email",
+    "retry_email",
+]
@@ -0,0 +1,109 @@
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import OutboxEmail
+
+# The server rejected the message itself; retrying will not help
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def queue_email(subject, body, to, html_body="", from_email=None, headers=None):
+    """
+    Add an email to the outbox. Call inside the transaction that makes the
+    change the email announces, so neither is kept without the other.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        headers=headers or {},
+    )
+
+
+def claim_emails(batch_size):
+    """
+    Lease up to batch_size due emails to this worker. Emails whose lease ran
+    out (a crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="pending", available_at__lte=now)
+                | Q(status="sending", locked_until__lt=now)
+            )
+            .order_by("available_at")[:batch_size]
+        )
+        if emails:
+            OutboxEmail.objects.filter(pk__in=[e.pk for e in emails]).update(
+                status="sending",
+                locked_until=now + lease,
+                attempts=F("attempts") + 1,
+            )
+    for email in emails:
+        email.status = "sending"
+        email.attempts += 1
+    return emails
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def deliver_email(email, connection):
+    """
+    Send one claimed email over an open connection and record the outcome:
+    "sent", "retry" or "failed"
+    """
+    try:
+        connection.send_messages([build_message(email, connection)])
+    except PERMANENT_ERRORS as e:
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            status="failed", last_error=str(e), locked_until=None
+        )
+        return "failed"
+    except (smtplib.SMTPException, OSError) as e:
+        return retry_email(email, str(e))
+
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        status="sent", sent_at=timezone.now(), last_error="", locked_until=None
+    )
+    return "sent"
+
+
+def retry_email(email, error):
+    """Put an email back on the queue with exponential backoff"""
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            status="failed", last_error=error, locked_until=None
+        )
+        return "failed"
+
+    delay = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+    OutboxEmail.objects.filter(pk=email.pk, status="sending").update(
+        status="pending",
+        last_error=error,
+        available_at=timezone.now() + timedelta(seconds=delay),
+        locked_until=None,
+    )
+    return "retry"
@@ -0,0 +1,52 @@
+from .client import (
+    LoadResult,
+    encode_request,
+    run_load,
+    run_requests,
+    start_server,
+    stop_server,
+    wait_for_port,
+)
+from .dataset import BenchmarkData, seed
+from .queries import (
+    Query,
+    QueryLog,
+    budget_settings,
+    clear_local_caches,
+    growth,
+    measure_routes,
+)
+from .scenarios import (
+    LAST,
+    SKIPPED,
+    build_scenarios,
+    plan_scenarios,
+    route_names,
+    unknown_routes,
+)
+from .synthetic import DatasetGenerator
+
+__all__ = [
+    "LoadResult",
+    "encode_request",
+    "run_load",
+    "run_requests",
+    "start_server",
+    "stop_server",
+    "wait_for_port",
+    "BenchmarkData",
+    "seed",
+    "Query",
+    "QueryLog",
+    "budget_settings",
+    "clear_local_caches",
+    "growth",
+    "measure_routes",
+    "LAST",
+    "SKIPPED",
+    "build_scenarios",
+    "plan_scenarios",
+    "route_names",
+    "unknown_routes",
+    "DatasetGenerator",
+]
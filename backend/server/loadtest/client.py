@@ -0,0 +1,202 @@
+"""
+A small closed-loop HTTP load generator for benchmarking the API, plus
+helpers that start gunicorn locally for the benchmark commands.
+
+Each simulated connection keeps one HTTP/1.1 keep-alive socket open and
+sends its next request as soon as the previous response has arrived, so the
+number of connections is the concurrency the server sees. Stdlib only, so it
+runs anywhere the backend does; one process tops out at a few thousand
+requests per second, so compare servers below that ceiling.
+"""
+
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+
+@dataclass
+class LoadResult:
+    elapsed: float = 0.0
+    errors: int = 0
+    statuses: dict = field(default_factory=dict)
+    latencies: list = field(default_factory=list)
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def rps(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, fraction):
+        """Latency in seconds at the given fraction, e.g. 0.99 for p99"""
+        return percentile(sorted(self.latencies), fraction)
+
+    def summary(self):
+        """Throughput and latencies in milliseconds, for results files"""
+        ordered = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "seconds": round(self.elapsed, 3),
+            "rps": round(self.rps, 1),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0,
+            **{
+                f"p{round(fraction * 100)}_ms": round(
+                    percentile(ordered, fraction) * 1000, 3
+                )
+                for fraction in (0.5, 0.9, 0.95, 0.99)
+            },
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0,
+            "errors": self.errors,
+            "statuses": {
+                str(code): count for code, count in sorted(self.statuses.items())
+            },
+        }
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def encode_request(host, method, path, headers=None, body=b""):
+    """An HTTP/1.1 keep-alive request as bytes"""
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    if body or method in ("POST", "PUT", "PATCH"):
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    return status, headers
+
+
+async def connection_loop(host, port, next_request, deadline, result):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(next_request())
+            started = time.perf_counter()
+            status, headers = await read_response(reader)
+            result.latencies.append(time.perf_counter() - started)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+            result.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(base_url, paths, connections, duration, headers=None):
+    """
+    Hit base_url with GET requests cycling through paths from `connections`
+    concurrent keep-alive connections for `duration` seconds
+    """
+    netloc = urlsplit(base_url).netloc
+    requests = [encode_request(netloc, "GET", path, headers) for path in paths]
+    return await run_requests(
+        base_url, lambda index: requests[index % len(requests)], connections, duration
+    )
+
+
+async def run_requests(base_url, make_request, connections, duration):
+    """
+    Like run_load, for any mix of requests: make_request(index) returns the
+    encoded bytes (see encode_request) of the index-th request sent, counted
+    across all connections, so bodies can differ from request to request
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    counter = itertools.count()
+
+    def next_request():
+        return make_request(next(counter))
+
+    result = LoadResult()
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            connection_loop(host, port, next_request, deadline, result)
+            for _ in range(connections)
+        )
+    )
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def wait_for_port(host, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server(port, workers, env=None, timeout=30):
+    """
+    Start gunicorn from the backend directory on a local port, with extra
+    environment variables (e.g. SERVER_MODE) on top of this process's.
+    Returns the process, or None if it did not start listening in time.
+    """
+    server = subprocess.Popen(
+        ["gunicorn", "--log-level", "warning"],
+        cwd=settings.BASE_DIR,
+        env={
+            **os.environ,
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "GUNICORN_WORKERS": str(workers),
+            **(env or {}),
+        },
+    )
+    if not wait_for_port("127.0.0.1", port, timeout):
+        server.terminate()
+        server.wait()
+        return None
+    return server
+
+
+def stop_server(server):
+    server.terminate()
+    server.wait(timeout=30)
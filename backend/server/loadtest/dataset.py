@@ -0,0 +1,236 @@
+"""
+The deterministic dataset the endpoint benchmarks run against.
+
+Everything is derived from the seed: names, prices, stock, carts, orders,
+their dates and even the auth tokens, so two runs with the same seed and
+sizes see the same data and their results can be compared. All rows are
+recognisable by the "bench-" prefix and are replaced on every seeding,
+leaving the rest of the database alone.
+"""
+
+import hashlib
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import (
+    Cart,
+    CartItem,
+    Category,
+    Order,
+    OrderItem,
+    PasswordResetToken,
+    PaymentIntent,
+    Product,
+    Token,
+    User,
+)
+from ..models.auth_model import hash_reset_token
+
+PREFIX = "bench-"
+PASSWORD = "Bench-Passw0rd!"
+CATEGORIES = ("headphones", "speakers", "earbuds", "microphones", "amplifiers")
+BRANDS = ("Sony", "Bose", "Apple", "Sennheiser", "JBL", "Shure", "Marshall")
+CONNECTIONS = ("Bluetooth 5.0", "Bluetooth 5.3, 3.5mm", "USB-C", "XLR", "3.5mm")
+ORDER_STATUSES = ("pending", "processing", "shipped", "delivered", "cancelled")
+ORDER_DAYS = 90
+ADDRESS = "Bench Customer {index}\n1 Benchmark Street\nApt {index}\nSpringfield, IL 62701\nUSA"
+
+
+@dataclass
+class BenchmarkUser:
+    id: int
+    username: str
+    email: str
+    token: str
+    orders: list = field(default_factory=list)
+    # Product ids, which is what the cart routes take
+    cart_items: list = field(default_factory=list)
+    payment_intents: list = field(default_factory=list)
+    reset_token: str = ""
+
+
+@dataclass
+class BenchmarkData:
+    """What the route scenarios need to know about the seeded rows"""
+
+    seed: int
+    staff: BenchmarkUser
+    customers: list
+    products: list
+    categories: list
+    # Spare sessions and reset tokens for routes that use them up
+    logout_tokens: list
+    reset_tokens: list
+    counts: dict
+
+
+def derived_token(seed, name):
+    return hashlib.sha256(f"{seed}:{name}".encode()).hexdigest()
+
+
+def clear():
+    """Remove the rows of any earlier seeding"""
+    User.objects.filter(username__startswith=PREFIX).delete()
+    Product.objects.filter(slug__startswith=PREFIX).delete()
+    Category.objects.filter(slug__startswith=PREFIX).delete()
+
+
+@transaction.atomic
+def seed(seed=1, products=200, customers=50, orders_per_customer=5, cart_items=3):
+    clear()
+    rng = random.Random(seed)
+    now = timezone.now()
+    # One hash for every account: hashing is slow by design
+    password = make_password(PASSWORD)
+
+    categories = Category.objects.bulk_create(
+        Category(name=name.title(), slug=f"{PREFIX}{name}", description=name)
+        for name in CATEGORIES
+    )
+    catalog = Product.objects.bulk_create(
+        Product(
+            name=f"Bench {rng.choice(BRANDS)} {index}",
+            slug=f"{PREFIX}product-{index}",
+            description=f"Benchmark product {index}",
+            category=rng.choice(categories),
+            brand=rng.choice(BRANDS),
+            connections=rng.choice(CONNECTIONS),
+            price=Decimal(rng.randrange(999, 99999)) / 100,
+            # Plenty, so orders never run a product out mid-benchmark
+            stock=1_000_000,
+            is_featured=rng.random() < 0.1,
+            image_url=f"https://example.com/{PREFIX}{index}.jpg",
+        )
+        for index in range(products)
+    )
+
+    def account(username, **extra):
+        return User(
+            username=username,
+            email=f"{username}@example.com",
+            password=password,
+            first_name="Bench",
+            last_name=username.rsplit("-", 1)[-1],
+            **extra,
+        )
+
+    # bulk_create sets primary keys on PostgreSQL and SQLite, the databases
+    # the benchmarks run on
+    staff = account(f"{PREFIX}staff", is_staff=True, is_superuser=True)
+    people = [
+        account(f"{PREFIX}customer-{index}", address=ADDRESS.format(index=index))
+        for index in range(customers)
+    ]
+    # Accounts whose sessions and reset tokens the benchmark uses up
+    spares = [account(f"{PREFIX}spare-{index}") for index in range(customers)]
+    User.objects.bulk_create([staff, *people, *spares])
+
+    entries = {
+        user.id: BenchmarkUser(
+            user.id, user.username, user.email, derived_token(seed, user.username)
+        )
+        for user in [staff, *people]
+    }
+    Token.objects.bulk_create(
+        Token(user_id=user_id, key=entry.token, device="benchmark")
+        for user_id, entry in entries.items()
+    )
+    logout_tokens = [derived_token(seed, f"logout:{user.username}") for user in spares]
+    Token.objects.bulk_create(
+        Token(user=user, key=key, device="benchmark")
+        for user, key in zip(spares, logout_tokens)
+    )
+
+    # Validating a reset token leaves it usable, resetting a password does not
+    reset_tokens = [derived_token(seed, f"reset:{user.username}") for user in spares]
+    for user in people:
+        entries[user.id].reset_token = derived_token(seed, f"validate:{user.username}")
+    PasswordResetToken.objects.bulk_create(
+        PasswordResetToken(
+            user_id=user_id,
+            token_hash=hash_reset_token(raw),
+            expires_at=now + timedelta(days=1),
+        )
+        for user_id, raw in [
+            *((user.id, entries[user.id].reset_token) for user in people),
+            *((user.id, raw) for user, raw in zip(spares, reset_tokens)),
+        ]
+    )
+
+    carts = Cart.objects.bulk_create(Cart(user=user) for user in people)
+    items = CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=product, quantity=rng.randint(1, 3))
+        for cart in carts
+        for product in rng.sample(catalog, min(cart_items, len(catalog)))
+    )
+    for item in items:
+        entries[item.cart.user_id].cart_items.append(item.product_id)
+
+    orders, chosen = [], []
+    for user in people:
+        for number in range(orders_per_customer):
+            products_ordered = rng.sample(catalog, min(rng.randint(1, 4), len(catalog)))
+            chosen.append(products_ordered)
+            orders.append(
+                Order(
+                    user=user,
+                    order_number=f"BENCH-{user.id}-{number}",
+                    # Cycled rather than drawn, so every customer's first
+                    # order is pending and unpaid whatever the sizes
+                    status=ORDER_STATUSES[number % len(ORDER_STATUSES)],
+                    shipping_address=user.address,
+                    total_amount=sum(product.price * 2 for product in products_ordered),
+                    payment_status=number % 2 == 1,
+                    payment_method="credit_card",
+                )
+            )
+    Order.objects.bulk_create(orders)
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, product=product, quantity=2, price=product.price)
+        for order, products_ordered in zip(orders, chosen)
+        for product in products_ordered
+    )
+    intents = PaymentIntent.objects.bulk_create(
+        PaymentIntent(
+            order=order,
+            amount=order.total_amount,
+            payment_method="credit_card",
+            status="processing",
+        )
+        for order in orders
+        if not order.payment_status
+    )
+    for order in orders:
+        entries[order.user_id].orders.append(order.id)
+    for intent in intents:
+        entries[intent.order.user_id].payment_intents.append(intent.id)
+
+    # created_at is set on insert; spread the orders over the last ORDER_DAYS
+    by_day = {}
+    for order in orders:
+        by_day.setdefault(rng.randrange(ORDER_DAYS), []).append(order.id)
+    for day, ids in by_day.items():
+        Order.objects.filter(id__in=ids).update(created_at=now - timedelta(days=day))
+
+    return BenchmarkData(
+        seed=seed,
+        staff=entries[staff.id],
+        customers=[entries[user.id] for user in people],
+        products=[product.id for product in catalog],
+        categories=[category.slug for category in categories],
+        logout_tokens=logout_tokens,
+        reset_tokens=reset_tokens,
+        counts={
+            "products": len(catalog),
+            "customers": len(people),
+            "cart_items": len(items),
+            "orders": len(orders),
+            "payment_intents": len(intents),
+        },
+    )
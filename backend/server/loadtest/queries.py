@@ -0,0 +1,195 @@
+"""
+Query budgets, checked by server/tests/test_query_budgets.py and
+manage.py check_query_budgets.
+
+A route's budget is the number of queries it runs against the smallest
+fixture; against larger fixtures it has to stay the same. QueryLog records
+every query on every connection together with the server code that issued
+it, and growth() groups two logs by statement shape, with placeholder lists
+collapsed, to find the statements that ran once per row: the N+1s.
+"""
+
+import re
+import traceback
+from collections import Counter
+from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from server.caching import TieredCache
+from server.middleware.token_cache import local_cache as token_cache
+
+from .dataset import seed
+from .scenarios import build_scenarios, plan_scenarios
+
+SERVER_DIR = str(Path(__file__).resolve().parent.parent)
+# Frames that say nothing about where a query came from: the harness, and
+# the middleware and query timer every request passes through
+NOISE = tuple(
+    str(Path(SERVER_DIR, *parts))
+    for parts in (("loadtest",), ("management",), ("middleware",), ("timing.py",))
+)
+PLACEHOLDER_LIST = re.compile(r"%s(?:, %s)+")
+VALUES_LIST = re.compile(r"(\(%s(?:\.\.\.)?\))(?:, \(%s(?:\.\.\.)?\))+")
+# Django names savepoints after the thread and a counter
+SAVEPOINT_ID = re.compile(r'"s\d+_x\d+"')
+# Accounts the scenarios tell apart; the data per account is what grows
+CUSTOMERS = 4
+
+
+@dataclass
+class Query:
+    alias: str
+    sql: str
+    params: tuple
+    # Frames in server code, innermost last
+    stack: list
+
+    @property
+    def shape(self):
+        return shape(self.sql)
+
+    def format(self, frames=8):
+        """The statement, its parameters and the innermost frames"""
+        lines = [f"[{self.alias}] {self.sql}", f"    params: {self.params!r}"]
+        lines += [
+            line.rstrip()
+            for frame in traceback.format_list(self.stack[-frames:])
+            for line in frame.splitlines()
+        ]
+        return "\n".join(lines)
+
+
+def shape(sql):
+    """The statement with IN lists and multi-row VALUES collapsed"""
+    sql = SAVEPOINT_ID.sub('"s..."', sql)
+    return VALUES_LIST.sub(r"\1", PLACEHOLDER_LIST.sub("%s...", sql))
+
+
+def server_frames(stack):
+    return [
+        frame
+        for frame in stack
+        if frame.filename.startswith(SERVER_DIR)
+        and not frame.filename.startswith(NOISE)
+    ]
+
+
+class QueryLog:
+    """Context manager recording the queries run on every connection"""
+
+    def __init__(self):
+        self.queries = []
+        self._recorders = []
+
+    def __enter__(self):
+        for alias in connections:
+            recorder = self._recorder(alias)
+            connections[alias].execute_wrappers.append(recorder)
+            self._recorders.append((alias, recorder))
+        return self
+
+    def __exit__(self, *exc_info):
+        # Removed by identity rather than popped as execute_wrapper() does:
+        # a request may install the Server-Timing query timer on top of us
+        for alias, recorder in self._recorders:
+            connections[alias].execute_wrappers.remove(recorder)
+        self._recorders = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    def _recorder(self, alias):
+        def record(execute, sql, params, many, context):
+            stack = server_frames(traceback.extract_stack()[:-1])
+            self.queries.append(Query(alias, sql, tuple(params or ()), stack))
+            return execute(sql, params, many, context)
+
+        return record
+
+    def shapes(self):
+        return Counter(query.shape for query in self.queries)
+
+
+def growth(baseline, log):
+    """
+    [(shape, runs in baseline, runs in log, first extra Query)] for the
+    statements log ran more often than baseline, most frequent first
+    """
+    before, after = baseline.shapes(), log.shapes()
+    grown = []
+    for key, count in after.most_common():
+        if count <= before.get(key, 0):
+            continue
+        runs = [query for query in log.queries if query.shape == key]
+        grown.append((key, before.get(key, 0), count, runs[before.get(key, 0)]))
+    return grown
+
+
+def clear_local_caches():
+    """Per-process caches would hide the queries of every request but the first"""
+    for cache in TieredCache.instances:
+        cache.local.clear()
+    token_cache.clear()
+
+
+def budget_settings():
+    """
+    Settings under which every request takes the path a cold cache would:
+    nothing is served from a shared cache, and throttling is off
+    """
+    return override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                scope: None
+                for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+            },
+        },
+        PAYMENT_WEBHOOK_SECRET=settings.PAYMENT_WEBHOOK_SECRET or "budget",
+    )
+
+
+def measure_routes(size, routes=None, seed_value=1):
+    """
+    ({route name: (status, QueryLog)}, {skipped route: reason}) for one
+    request to each route against a fixture of `size` products, and orders
+    and cart items per customer. Runs in a transaction that is rolled back;
+    call it under budget_settings().
+    """
+    results = {}
+    with transaction.atomic():
+        data = seed(
+            seed=seed_value,
+            # Two at least, so the warm-up and the measured request touch
+            # different products
+            products=max(size, 2),
+            customers=CUSTOMERS,
+            orders_per_customer=size,
+            cart_items=size,
+        )
+        call_command("rebuild_sales_rollup", stdout=StringIO())
+        scenarios, skipped = plan_scenarios(
+            build_scenarios(data, settings.PAYMENT_WEBHOOK_SECRET), routes
+        )
+        client = Client(SERVER_NAME="localhost", raise_request_exception=False)
+        for name, scenario in scenarios.items():
+            # The first request pays for lazy imports and per-process setup;
+            # the second is the one measured
+            for index in range(2):
+                method, path, headers, body = scenario(index)
+                headers = dict(headers)
+                content_type = headers.pop("Content-Type", "")
+                clear_local_caches()
+                with QueryLog() as log:
+                    response = client.generic(
+                        method, path, body, content_type=content_type, headers=headers
+                    )
+            results[name] = (response.status_code, log)
+        transaction.set_rollback(True)
+    return results, skipped
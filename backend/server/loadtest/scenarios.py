@@ -0,0 +1,352 @@
+"""
+One request scenario per route in server/urls.py, keyed by route name.
+
+A scenario turns the seeded BenchmarkData and a running request index into
+(method, path, headers, body), cycling through customers, products and
+orders so concurrent connections do not all hit the same rows. Routes that
+change data are driven with requests the dataset can absorb; the few that
+use something up (a session on logout, a reset token) run once per spare
+account and then answer with errors, which the results record per status.
+"""
+
+import hashlib
+import hmac
+
+from urllib.parse import urlsplit
+
+import orjson
+from django.urls import Resolver404, get_resolver, resolve, reverse
+
+from .dataset import PASSWORD
+
+# Routes that are not driven, with the reason recorded in the results
+SKIPPED = {
+    "upload-product-image": "uploads to ImgBB, an external service",
+}
+
+# Routes that use up their data run after the others
+LAST = (
+    # Issuing a reset token revokes the one validate_reset_token uses
+    "forgot_password",
+    "remove-from-cart",
+    "clear-cart",
+    "delete-product-image",
+    "logout",
+    "reset_password",
+)
+
+
+def auth(user):
+    return {"Authorization": f"Token {user.token}"}
+
+
+def json_request(method, path, user=None, data=None, headers=None):
+    body = orjson.dumps(data) if data is not None else b""
+    headers = {**(auth(user) if user else {}), **(headers or {})}
+    if data is not None:
+        headers["Content-Type"] = "application/json"
+    return method, path, headers, body
+
+
+def pick(items, index):
+    return items[index % len(items)]
+
+
+def customer(data, index):
+    return pick(data.customers, index)
+
+
+def build_scenarios(data, webhook_secret):
+    """
+    {route name: make(index) -> (method, path, headers, body)}; indexes
+    must not repeat within a seeding, as they name registered accounts
+    """
+    staff = data.staff
+    paying = [user for user in data.customers if user.payment_intents]
+
+    def order_of(index):
+        user = customer(data, index)
+        return user, pick(user.orders, index // len(data.customers))
+
+    def cart_item_of(index):
+        user = customer(data, index)
+        return user, pick(user.cart_items, index // len(data.customers))
+
+    def intent_of(index):
+        user = pick(paying, index)
+        return user, pick(user.payment_intents, index // len(paying))
+
+    def webhook(index):
+        body = orjson.dumps({"intent_id": intent_of(index)[1], "status": "succeeded"})
+        signature = hmac.new(webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+        return (
+            "POST",
+            reverse("payment-webhook"),
+            {"Content-Type": "application/json", "X-Payment-Signature": signature},
+            body,
+        )
+
+    return {
+        "home": lambda index: json_request("GET", reverse("home")),
+        "keepalive": lambda index: json_request("GET", reverse("keepalive")),
+        "metrics": lambda index: json_request("GET", reverse("metrics")),
+        # Catalog
+        "all-products": lambda index: json_request("GET", reverse("all-products")),
+        "recommended-products": lambda index: json_request(
+            "GET", reverse("recommended-products")
+        ),
+        "check-product-stock": lambda index: json_request(
+            "GET",
+            reverse("check-product-stock", kwargs={"id": pick(data.products, index)}),
+        ),
+        "product-filters": lambda index: json_request(
+            "GET", reverse("product-filters")
+        ),
+        "category": lambda index: json_request(
+            "GET",
+            reverse("category", kwargs={"category": pick(data.categories, index)}),
+        ),
+        "product": lambda index: json_request(
+            "GET", reverse("product", kwargs={"id": pick(data.products, index)})
+        ),
+        "product-detail": lambda index: json_request(
+            "GET",
+            reverse(
+                "product-detail",
+                kwargs={
+                    "category": pick(data.categories, index),
+                    "id": pick(data.products, index),
+                },
+            ),
+        ),
+        "categories": lambda index: json_request("GET", reverse("categories")),
+        # Accounts
+        "register": lambda index: json_request(
+            "POST",
+            reverse("register"),
+            data={
+                "username": f"bench-new-{index}",
+                "email": f"bench-new-{index}@example.com",
+                "password": PASSWORD,
+            },
+        ),
+        "login": lambda index: json_request(
+            "POST",
+            reverse("login"),
+            data={"username": customer(data, index).username, "password": PASSWORD},
+        ),
+        "logout": lambda index: json_request(
+            "POST",
+            reverse("logout"),
+            headers={"Authorization": f"Token {pick(data.logout_tokens, index)}"},
+            data={},
+        ),
+        "user": lambda index: json_request(
+            "GET", reverse("user"), customer(data, index)
+        ),
+        "forgot_password": lambda index: json_request(
+            "POST",
+            reverse("forgot_password"),
+            data={"email": customer(data, index).email},
+        ),
+        "reset_password": lambda index: json_request(
+            "POST",
+            reverse("reset_password"),
+            data={"token": pick(data.reset_tokens, index), "password": PASSWORD},
+        ),
+        "validate_password": lambda index: json_request(
+            "POST", reverse("validate_password"), data={"password": PASSWORD}
+        ),
+        "validate_reset_token": lambda index: json_request(
+            "POST",
+            reverse("validate_reset_token"),
+            data={"token": customer(data, index).reset_token},
+        ),
+        "update_profile": lambda index: json_request(
+            "PUT",
+            reverse("update_profile"),
+            customer(data, index),
+            data={
+                "username": customer(data, index).username,
+                "email": customer(data, index).email,
+                "first_name": "Bench",
+            },
+        ),
+        "update_address": lambda index: json_request(
+            "PUT",
+            reverse("update_address"),
+            customer(data, index),
+            data={
+                "address": f"Bench Customer\n{index} Benchmark Street\n\n"
+                "Springfield, IL 62701\nUSA"
+            },
+        ),
+        "get-user-by-id": lambda index: json_request(
+            "GET",
+            reverse("get-user-by-id", kwargs={"user_id": customer(data, index).id}),
+            customer(data, index),
+        ),
+        # Staff
+        "staff-list": lambda index: json_request("GET", reverse("staff-list"), staff),
+        "staff-detail": lambda index: json_request(
+            "GET", reverse("staff-detail", kwargs={"staff_id": staff.id}), staff
+        ),
+        "staff-stats": lambda index: json_request("GET", reverse("staff-stats"), staff),
+        "staff-stats-timeseries": lambda index: json_request(
+            "GET", f"{reverse('staff-stats-timeseries')}?days=90", staff
+        ),
+        "staff-products": lambda index: json_request(
+            "GET", reverse("staff-products"), staff
+        ),
+        "staff-product-detail": lambda index: json_request(
+            "PUT",
+            reverse(
+                "staff-product-detail",
+                kwargs={"product_id": pick(data.products, index)},
+            ),
+            staff,
+            data={"is_featured": index % 2 == 0},
+        ),
+        "staff-orders": lambda index: json_request(
+            "GET", reverse("staff-orders"), staff
+        ),
+        "staff-orders-bulk-status": lambda index: json_request(
+            "POST",
+            reverse("staff-orders-bulk-status"),
+            staff,
+            data={
+                "status": "processing",
+                "order_ids": [order_of(index + offset)[1] for offset in range(10)],
+            },
+        ),
+        "staff-order-detail": lambda index: json_request(
+            "GET",
+            reverse("staff-order-detail", kwargs={"order_id": order_of(index)[1]}),
+            staff,
+        ),
+        "delete-product-image": lambda index: json_request(
+            "DELETE",
+            reverse(
+                "delete-product-image",
+                kwargs={"product_id": pick(data.products, index)},
+            ),
+            staff,
+        ),
+        # Orders and payments
+        "create-order": lambda index: json_request(
+            "POST",
+            reverse("create-order"),
+            customer(data, index),
+            data={
+                "shipping_address": f"Bench Customer\n{index} Benchmark Street",
+                # Checks out what is in the cart
+                "items": [
+                    {"product_id": product, "quantity": 1, "price": "10.00"}
+                    for product in customer(data, index).cart_items
+                ],
+            },
+        ),
+        "user-orders": lambda index: json_request(
+            "GET", reverse("user-orders"), customer(data, index)
+        ),
+        "order-details": lambda index: json_request(
+            "GET",
+            reverse("order-details", kwargs={"order_id": order_of(index)[1]}),
+            order_of(index)[0],
+        ),
+        "process-payment": lambda index: json_request(
+            "POST",
+            reverse("process-payment", kwargs={"order_id": order_of(index)[1]}),
+            order_of(index)[0],
+            data={"payment_method": "cod"},
+        ),
+        "payment-status": lambda index: json_request(
+            "GET",
+            reverse("payment-status", kwargs={"intent_id": intent_of(index)[1]}),
+            intent_of(index)[0],
+        ),
+        "payment-webhook": webhook,
+        # Cart
+        "get-cart": lambda index: json_request(
+            "GET", reverse("get-cart"), customer(data, index)
+        ),
+        "add-to-cart": lambda index: json_request(
+            "POST",
+            reverse("add-to-cart"),
+            customer(data, index),
+            data={"product_id": pick(data.products, index), "quantity": 1},
+        ),
+        "update-cart-item": lambda index: json_request(
+            "PUT",
+            reverse("update-cart-item", kwargs={"item_id": cart_item_of(index)[1]}),
+            cart_item_of(index)[0],
+            data={"quantity": index % 3 + 1},
+        ),
+        "remove-from-cart": lambda index: json_request(
+            "DELETE",
+            reverse("remove-from-cart", kwargs={"item_id": cart_item_of(index)[1]}),
+            cart_item_of(index)[0],
+        ),
+        "clear-cart": lambda index: json_request(
+            "DELETE", reverse("clear-cart"), customer(data, index)
+        ),
+        "sync-cart": lambda index: json_request(
+            "POST",
+            reverse("sync-cart"),
+            customer(data, index),
+            data={
+                # A local cart as large as the one on the server
+                "items": [
+                    {"id": pick(data.products, index + offset), "quantity": 1}
+                    for offset in range(len(customer(data, index).cart_items))
+                ],
+                "replace_all": True,
+            },
+        ),
+    }
+
+
+def route_names():
+    """The named routes in server/urls.py, in URL order"""
+    return [
+        pattern.name
+        for pattern in get_resolver().url_patterns
+        if getattr(pattern, "name", None)
+    ]
+
+
+def unknown_routes(routes):
+    """The names in routes that no route in server/urls.py has, sorted"""
+    return sorted(set(routes) - set(route_names()))
+
+
+def plan_scenarios(scenarios, routes=None):
+    """
+    The scenarios to run, in URL order with LAST at the end, and the
+    routes left out and why; `routes` narrows the run to those names
+    """
+    names = route_names()
+    skipped = {}
+    planned = {}
+    ordered = [name for name in names if name not in LAST]
+    ordered += [name for name in LAST if name in names]
+    for name in ordered:
+        if routes is not None and name not in routes:
+            continue
+        if name in SKIPPED:
+            skipped[name] = SKIPPED[name]
+            continue
+        if name not in scenarios:
+            skipped[name] = "no scenario in server/loadtest/scenarios.py"
+            continue
+        # A route listed after a broader pattern can never be reached
+        path = urlsplit(scenarios[name](0)[1]).path
+        try:
+            resolved = resolve(path).url_name
+        except Resolver404:
+            resolved = None
+        if resolved != name:
+            skipped[name] = f"{path} is served by {resolved or 'no route'}"
+            continue
+        planned[name] = scenarios[name]
+    return planned, skipped
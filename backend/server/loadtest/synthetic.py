@@ -0,0 +1,449 @@
+"""
+Synthetic data at capacity-testing scale, for manage.py generate_dataset.
+
+Rows are generated in chunks straight into tuples and written with COPY on
+PostgreSQL (psycopg 3), or chunked INSERTs elsewhere. Primary keys are
+assigned here rather than by the database, so order lines can point at
+their orders without reading anything back; sequences are reset at the
+end.
+
+The distributions aim at what production traffic looks like rather than at
+uniform noise:
+
+- product popularity and customer activity are Zipfian, so a few products
+  appear in a large share of order lines and a few customers order a lot;
+- order times follow a seasonal curve: growth over the period, busier
+  weekends, a November and December peak with spikes on Black Friday and
+  Cyber Monday, and an evening peak within each day;
+- order status follows order age: recent orders are still pending or
+  processing, older ones mostly delivered.
+
+Everything comes from one seeded random.Random, so the same arguments
+produce the same rows.
+"""
+
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import DateField, DateTimeField, DecimalField, JSONField, Max
+
+from ..models import Cart, CartItem, Category, Order, OrderItem, Product, User
+
+PREFIX = "gen-"
+PASSWORD = "Generated-Passw0rd!"
+CATEGORY_NAMES = (
+    "Headphones", "Earbuds", "Speakers", "Soundbars", "Microphones",
+    "Amplifiers", "Turntables", "DACs", "Receivers", "Subwoofers",
+    "Cables", "Stands", "Cases", "Studio Monitors", "Interfaces",
+)  # fmt: skip
+BRANDS = (
+    "Sony", "Bose", "Apple", "Sennheiser", "JBL", "Shure", "Marshall",
+    "Audio-Technica", "Beyerdynamic", "Yamaha", "Klipsch", "AKG",
+)  # fmt: skip
+CONNECTIONS = ("Bluetooth 5.0", "Bluetooth 5.3, 3.5mm", "USB-C", "XLR", "3.5mm")
+PAYMENT_METHODS = ("credit_card", "paypal", "cod")
+PAYMENT_WEIGHTS = (70, 22, 8)
+# Lines per order and units per line
+LINE_COUNTS, LINE_WEIGHTS = (1, 2, 3, 4, 5, 6), (46, 26, 13, 8, 4, 3)
+QUANTITIES, QUANTITY_WEIGHTS = (1, 2, 3, 4), (82, 12, 4, 2)
+# Monday first; shoppers buy more at the weekend
+WEEKDAY_FACTORS = (0.95, 0.9, 0.9, 0.95, 1.05, 1.2, 1.15)
+MONTH_FACTORS = (0.8, 0.75, 0.85, 0.9, 0.95, 0.9, 0.95, 1.0, 0.95, 1.0, 1.35, 1.6)
+# Share of the day's orders per hour (UTC), peaking in the evening
+HOUR_WEIGHTS = (
+    2, 1.2, 0.8, 0.6, 0.6, 0.8, 1.5, 2.5, 3.5, 4.2, 4.6, 5, 5.4,
+    5.2, 5, 5, 5.2, 5.6, 6.4, 7.2, 7.6, 7, 5.4, 3.4,
+)  # fmt: skip
+
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative weights of ranks 1..count under Zipf's law, for choices()"""
+    return list(
+        itertools.accumulate(1 / rank**exponent for rank in range(1, count + 1))
+    )
+
+
+def black_friday(year):
+    # The day after the fourth Thursday of November
+    first = datetime(year, 11, 1, tzinfo=dt_timezone.utc)
+    thursday = first + timedelta(days=(3 - first.weekday()) % 7 + 21)
+    return (thursday + timedelta(days=1)).date()
+
+
+def day_weight(day, position, growth):
+    weight = WEEKDAY_FACTORS[day.weekday()] * MONTH_FACTORS[day.month - 1]
+    weight *= 1 + growth * position
+    friday = black_friday(day.year)
+    if day == friday:
+        weight *= 4
+    elif day == friday + timedelta(days=3):
+        weight *= 2.5
+    elif friday < day < friday + timedelta(days=3):
+        weight *= 1.8
+    return weight
+
+
+def column_default(field, now):
+    if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+        return now
+    return field.get_default()
+
+
+class TableWriter:
+    """
+    Writes rows for `fields` of a model; every other column gets its
+    default, computed once. COPY when the connection supports it.
+    """
+
+    NEEDS_PREP = (DateTimeField, DateField, DecimalField, JSONField)
+
+    def __init__(self, model, fields, now, use_copy):
+        opts = model._meta
+        given = [opts.get_field(name) for name in fields]
+        rest = [field for field in opts.concrete_fields if field not in given]
+        self.model = model
+        self.use_copy = use_copy
+        self.rows = 0
+        self.seconds = 0.0
+        columns = ", ".join(
+            connection.ops.quote_name(field.column) for field in given + rest
+        )
+        table = connection.ops.quote_name(opts.db_table)
+        if use_copy:
+            self.sql = f"COPY {table} ({columns}) FROM STDIN"
+            self.rest = tuple(column_default(field, now) for field in rest)
+        else:
+            placeholders = ", ".join(["%s"] * (len(given) + len(rest)))
+            self.sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+            self.rest = tuple(
+                field.get_db_prep_save(column_default(field, now), connection)
+                for field in rest
+            )
+            # Plain values go to the driver as they are
+            self.prep = [
+                (index, field)
+                for index, field in enumerate(given)
+                if isinstance(field, self.NEEDS_PREP)
+            ]
+
+    def write(self, rows):
+        started = time.perf_counter()
+        rest = self.rest
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                with cursor.cursor.copy(self.sql) as copy:
+                    for row in rows:
+                        copy.write_row(row + rest)
+            else:
+                if self.prep:
+                    rows = [self.prepare(row) for row in rows]
+                cursor.executemany(self.sql, [row + rest for row in rows])
+        self.rows += len(rows)
+        self.seconds += time.perf_counter() - started
+
+    def prepare(self, row):
+        row = list(row)
+        for index, field in self.prep:
+            row[index] = field.get_db_prep_save(row[index], connection)
+        return tuple(row)
+
+
+def supports_copy():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        # psycopg 3; psycopg2 cursors have no copy()
+        return hasattr(cursor.cursor, "copy")
+
+
+def next_id(model):
+    return (model.objects.aggregate(highest=Max("pk"))["highest"] or 0) + 1
+
+
+class DatasetGenerator:
+    def __init__(
+        self,
+        seed=1,
+        products=100_000,
+        users=200_000,
+        orders=1_000_000,
+        cart_share=0.2,
+        days=365,
+        product_skew=1.1,
+        user_skew=0.8,
+        growth=0.5,
+        chunk_size=10_000,
+        use_copy=None,
+    ):
+        self.rng = random.Random(seed)
+        self.counts = {"products": products, "users": users, "orders": orders}
+        self.cart_share = cart_share
+        self.days = days
+        self.product_skew = product_skew
+        self.user_skew = user_skew
+        self.growth = growth
+        self.chunk_size = chunk_size
+        self.use_copy = supports_copy() if use_copy is None else use_copy
+        self.now = datetime.now(dt_timezone.utc).replace(microsecond=0)
+        self.start = (self.now - timedelta(days=days)).replace(
+            hour=0, minute=0, second=0
+        )
+        self.writers = {}
+
+    def writer(self, model, fields):
+        if model not in self.writers:
+            self.writers[model] = TableWriter(model, fields, self.now, self.use_copy)
+        return self.writers[model]
+
+    def chunks(self, count):
+        for start in range(0, count, self.chunk_size):
+            yield start, min(self.chunk_size, count - start)
+
+    def run(self):
+        """Generate everything; call inside a transaction"""
+        self.categories()
+        self.products()
+        self.users()
+        self.orders()
+        self.carts()
+        # Keys were assigned here, so the sequences have to catch up
+        with connection.cursor() as cursor:
+            models = list(self.writers)
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        return self.writers
+
+    def categories(self):
+        first = next_id(Category)
+        self.category_ids = list(range(first, first + len(CATEGORY_NAMES)))
+        self.writer(Category, ("id", "name", "slug", "description")).write(
+            [
+                (pk, name, f"{PREFIX}{name.lower().replace(' ', '-')}", name)
+                for pk, name in zip(self.category_ids, CATEGORY_NAMES)
+            ]
+        )
+
+    def products(self):
+        rng, count = self.rng, self.counts["products"]
+        first = next_id(Product)
+        writer = self.writer(
+            Product,
+            (
+                "id", "name", "slug", "description", "category_id", "brand",
+                "connections", "price", "sale_price", "stock", "is_featured",
+                "is_new", "image_url", "created_at",
+            ),
+        )  # fmt: skip
+        self.prices = []
+        for offset, size in self.chunks(count):
+            rows = []
+            for pk in range(first + offset, first + offset + size):
+                # Log-normal around $80, ending in .99
+                price = Decimal(max(4, int(rng.lognormvariate(4.4, 0.7)))) + Decimal(
+                    "0.99"
+                )
+                on_sale = rng.random() < 0.15
+                brand = rng.choice(BRANDS)
+                created = self.start - timedelta(days=rng.random() * 365)
+                self.prices.append(price)
+                rows.append(
+                    (
+                        pk,
+                        f"{brand} {rng.choice(CATEGORY_NAMES)} {pk}",
+                        f"{PREFIX}product-{pk}",
+                        f"Generated product {pk}",
+                        rng.choice(self.category_ids),
+                        brand,
+                        rng.choice(CONNECTIONS),
+                        price,
+                        (price * Decimal("0.8")).quantize(Decimal("0.01"))
+                        if on_sale
+                        else None,
+                        0 if rng.random() < 0.05 else rng.randint(1, 500),
+                        rng.random() < 0.02,
+                        created > self.now - timedelta(days=60),
+                        f"https://example.com/{PREFIX}{pk}.jpg",
+                        created,
+                    )
+                )
+            writer.write(rows)
+        # Popularity is by rank, and ranks are shuffled over the catalog
+        self.product_ids = list(range(first, first + count))
+        self.popular_products = self.product_ids[:]
+        rng.shuffle(self.popular_products)
+        self.product_weights = zipf_cum_weights(count, self.product_skew)
+        self.product_price = dict(zip(self.product_ids, self.prices))
+
+    def users(self):
+        rng, count = self.rng, self.counts["users"]
+        first = next_id(User)
+        # One hash for every account: hashing is slow by design
+        password = make_password(PASSWORD)
+        writer = self.writer(
+            User,
+            (
+                "id", "password", "username", "first_name", "last_name", "email",
+                "date_joined", "address", "city", "state", "postal_code",
+                "country", "created_at",
+            ),
+        )  # fmt: skip
+        for offset, size in self.chunks(count):
+            rows = []
+            for pk in range(first + offset, first + offset + size):
+                # Everyone signed up before the period the orders cover
+                joined = self.start - timedelta(days=rng.random() * 365)
+                rows.append(
+                    (
+                        pk,
+                        password,
+                        f"{PREFIX}user-{pk}",
+                        "Generated",
+                        f"User {pk}",
+                        f"{PREFIX}user-{pk}@example.com",
+                        joined,
+                        f"Generated User {pk}\n{pk} Synthetic Road\n\n"
+                        "Springfield, IL 62701\nUSA",
+                        "Springfield",
+                        "IL",
+                        "62701",
+                        "USA",
+                        joined,
+                    )
+                )
+            writer.write(rows)
+        self.user_ids = list(range(first, first + count))
+        self.active_users = self.user_ids[:]
+        rng.shuffle(self.active_users)
+        self.user_weights = zipf_cum_weights(count, self.user_skew)
+
+    def order_times(self, count):
+        rng = self.rng
+        days = [self.start + timedelta(days=index) for index in range(self.days)]
+        day_weights = list(
+            itertools.accumulate(
+                day_weight(day.date(), index / self.days, self.growth)
+                for index, day in enumerate(days)
+            )
+        )
+        picked_days = rng.choices(days, cum_weights=day_weights, k=count)
+        hours = rng.choices(range(24), weights=HOUR_WEIGHTS, k=count)
+        return sorted(
+            day + timedelta(seconds=hour * 3600 + rng.random() * 3600)
+            for day, hour in zip(picked_days, hours)
+        )
+
+    def order_status(self, created):
+        rng = self.rng
+        if rng.random() < 0.04:
+            return "cancelled", False
+        age = (self.now - created).total_seconds() / 86400
+        if age < 1:
+            status = "pending" if rng.random() < 0.6 else "processing"
+        elif age < 4:
+            status = rng.choice(("processing", "shipped"))
+        elif age < 10:
+            status = "shipped" if rng.random() < 0.4 else "delivered"
+        else:
+            status = "delivered"
+        return status, status != "pending"
+
+    def orders(self):
+        rng, count = self.rng, self.counts["orders"]
+        first, first_line = next_id(Order), next_id(OrderItem)
+        orders = self.writer(
+            Order,
+            (
+                "id", "user_id", "order_number", "status", "total_amount",
+                "shipping_address", "payment_status", "payment_method",
+                "payment_date", "created_at", "updated_at",
+            ),
+        )  # fmt: skip
+        lines = self.writer(
+            OrderItem,
+            ("id", "order_id", "product_id", "quantity", "price", "created_at"),
+        )
+        # Chronological, so order ids rise with created_at as in production
+        times = self.order_times(count)
+        line_id = first_line
+        for offset, size in self.chunks(count):
+            users = rng.choices(
+                self.active_users, cum_weights=self.user_weights, k=size
+            )
+            line_counts = rng.choices(LINE_COUNTS, weights=LINE_WEIGHTS, k=size)
+            products = rng.choices(
+                self.popular_products,
+                cum_weights=self.product_weights,
+                k=sum(line_counts),
+            )
+            quantities = rng.choices(
+                QUANTITIES, weights=QUANTITY_WEIGHTS, k=len(products)
+            )
+            methods = rng.choices(PAYMENT_METHODS, weights=PAYMENT_WEIGHTS, k=size)
+            order_rows, line_rows, position = [], [], 0
+            for index in range(size):
+                pk = first + offset + index
+                created = times[offset + index]
+                status, paid = self.order_status(created)
+                total = Decimal("0.00")
+                seen = set()
+                for _ in range(line_counts[index]):
+                    product, quantity = products[position], quantities[position]
+                    position += 1
+                    if product in seen:
+                        continue
+                    seen.add(product)
+                    price = self.product_price[product]
+                    total += price * quantity
+                    line_rows.append((line_id, pk, product, quantity, price, created))
+                    line_id += 1
+                order_rows.append(
+                    (
+                        pk,
+                        users[index],
+                        f"GEN-{pk:010d}",
+                        status,
+                        total,
+                        f"Generated User {users[index]}\n{users[index]} Synthetic Road",
+                        paid and methods[index] != "cod",
+                        methods[index],
+                        created + timedelta(minutes=rng.randint(1, 30))
+                        if paid
+                        else None,
+                        created,
+                        created,
+                    )
+                )
+            orders.write(order_rows)
+            lines.write(line_rows)
+
+    def carts(self):
+        rng = self.rng
+        owners = rng.sample(self.user_ids, int(len(self.user_ids) * self.cart_share))
+        owners.sort()
+        first, first_item = next_id(Cart), next_id(CartItem)
+        carts = self.writer(Cart, ("id", "user_id", "created_at", "updated_at"))
+        items = self.writer(CartItem, ("id", "cart_id", "product_id", "quantity"))
+        item_id = first_item
+        for offset, size in self.chunks(len(owners)):
+            cart_rows, item_rows = [], []
+            counts = rng.choices((1, 2, 3, 4), weights=(50, 28, 14, 8), k=size)
+            products = rng.choices(
+                self.popular_products, cum_weights=self.product_weights, k=sum(counts)
+            )
+            position = 0
+            for index in range(size):
+                pk = first + offset + index
+                updated = self.now - timedelta(days=rng.random() * 30)
+                cart_rows.append((pk, owners[offset + index], updated, updated))
+                for product in set(products[position : position + counts[index]]):
+                    item_rows.append((item_id, pk, product, rng.choice(QUANTITIES)))
+                    item_id += 1
+                position += counts[index]
+            carts.write(cart_rows)
+            items.write(item_rows)
@@ -0,0 +1,138 @@
+"""
+Structured logging that stays off the request thread.
+
+Records are queued by BackgroundHandler and written as one JSON object per
+line by a listener thread, so a slow stdout (a blocked pipe, a busy log
+driver) no longer stalls requests. The calling thread only evaluates the
+message and attaches the request id; formatting, tracebacks included, and
+the write happen on the listener.
+
+SamplingFilter keeps a fraction of a logger's low-level records, for debug
+events too frequent to keep in full; see LOG_SAMPLE_RATES in settings.
+"""
+
+import atexit
+import datetime
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+# Set per request by RequestIdMiddleware
+request_id = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed with extra=
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "request_id",
+}
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        # django.request logs after the middleware is done; it passes the
+        # request along instead
+        record.request_id = request_id.get() or getattr(
+            getattr(record, "request", None), "request_id", None
+        )
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Let through `rate` of the records at or below max_level, and all others"""
+
+    def __init__(self, rate=1.0, max_level=logging.DEBUG):
+        super().__init__()
+        self.rate = float(rate)
+        if isinstance(max_level, str):
+            max_level = logging.getLevelName(max_level.upper())
+        self.max_level = max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for name, value in vars(record).items():
+            if name not in RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(
+            entry, default=str, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Hands records to a listener thread that writes them to `stream`
+    (stderr by default). The listener starts on first use in each process,
+    so gunicorn workers forked from a preloaded app each get their own.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener, in the target handler
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # The queue never leaves the process, so unlike QueueHandler keep
+        # exc_info for the listener to format; only pin the message now,
+        # before its arguments can change
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        super().enqueue(record)
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            self._listener = QueueListener(self.queue, self.target)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Write out everything queued and stop the listener"""
+        with self._start_lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                self._listener = None
+                self._pid = None
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from server.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    ArchivedPaymentIntent,
+    Order,
+    OrderItem,
+    PaymentIntent,
+)
+from server.partitioning import add_months, ensure_partitions, month_start
+
+
+class Command(BaseCommand):
+    help = (
+        "Move delivered orders older than N months, with their lines and "
+        "payment intents, into the archive tables. Orders with a payment "
+        "still pending or processing stay until the worker settles it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=12,
+            help="Archive delivered orders from before the last N months (default: 12)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Orders moved per transaction (default: 500)",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches (default: until done)",
+        )
+
+    def handle(self, *args, **options):
+        # Archive whole months so each batch lands in complete partitions
+        cutoff = add_months(month_start(timezone.now()), -options["months"])
+        candidates = Order.objects.filter(
+            status="delivered", created_at__lt=cutoff
+        ).exclude(payment_intents__status__in=["pending", "processing"])
+
+        oldest = (
+            candidates.order_by("created_at")
+            .values_list("created_at", flat=True)
+            .first()
+        )
+        if oldest is None:
+            self.stdout.write("No orders to archive")
+            return
+        for name in ensure_partitions(oldest, cutoff - timedelta(microseconds=1)):
+            self.stdout.write(f"Created partition: {name}")
+
+        archived = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            with transaction.atomic():
+                batch = list(
+                    candidates.select_for_update(skip_locked=True).order_by("id")[
+                        : options["batch_size"]
+                    ]
+                )
+                if not batch:
+                    break
+                self.archive(batch)
+            archived += len(batch)
+            batches += 1
+            self.stdout.write(f"Archived {archived} orders")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} orders created before {cutoff:%Y-%m-%d}"
+            )
+        )
+
+    def archive(self, orders):
+        now = timezone.now()
+        created = {order.id: order.created_at for order in orders}
+
+        ArchivedOrder.objects.bulk_create(
+            [
+                ArchivedOrder(
+                    id=order.id,
+                    user_id=order.user_id,
+                    order_number=order.order_number,
+                    status=order.status,
+                    total_amount=order.total_amount,
+                    shipping_address=order.shipping_address,
+                    payment_status=order.payment_status,
+                    payment_method=order.payment_method,
+                    payment_date=order.payment_date,
+                    created_at=order.created_at,
+                    updated_at=order.updated_at,
+                    archived_at=now,
+                )
+                for order in orders
+            ]
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            [
+                ArchivedOrderItem(
+                    id=item["id"],
+                    order_id=item["order_id"],
+                    order_created_at=created[item["order_id"]],
+                    product_id=item["product_id"],
+                    product_name=item["product__name"],
+                    quantity=item["quantity"],
+                    price=item["price"],
+                    created_at=item["created_at"],
+                )
+                for item in OrderItem.objects.filter(order__in=orders).values(
+                    "id",
+                    "order_id",
+                    "product_id",
+                    "product__name",
+                    "quantity",
+                    "price",
+                    "created_at",
+                )
+            ]
+        )
+        ArchivedPaymentIntent.objects.bulk_create(
+            [
+                ArchivedPaymentIntent(
+                    id=intent.id,
+                    order_id=intent.order_id,
+                    order_created_at=created[intent.order_id],
+                    amount=intent.amount,
+                    payment_method=intent.payment_method,
+                    status=intent.status,
+                    gateway=intent.gateway,
+                    gateway_reference=intent.gateway_reference,
+                    attempts=intent.attempts,
+                    last_error=intent.last_error,
+                    created_at=intent.created_at,
+                    updated_at=intent.updated_at,
+                    completed_at=intent.completed_at,
+                )
+                for intent in PaymentIntent.objects.filter(order__in=orders)
+            ]
+        )
+        # Cascades to the order lines and payment intents copied above
+        Order.objects.filter(id__in=created).delete()
@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from server.caching import TieredCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one short-lived key with concurrent readers and count how often "
+        "a plain cache and the two-tier cache recompute it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=32,
+            help="Concurrent readers (default: 32)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=5.0,
+            help="Seconds per scenario (default: 5)",
+        )
+        parser.add_argument(
+            "--ttl",
+            type=int,
+            default=1,
+            help="Seconds the value is cached for (default: 1)",
+        )
+        parser.add_argument(
+            "--compute-ms",
+            type=int,
+            default=200,
+            help="Milliseconds one recomputation takes (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'scenario':<10}{'reads':>9}{'computes':>10}{'p50 ms':>9}{'p99 ms':>9}"
+        )
+        run_id = time.time_ns()
+        key = f"bench:stampede:{run_id}"
+
+        def plain(compute):
+            value = cache.get(key)
+            if value is None:
+                value = compute()
+                cache.set(key, value, options["ttl"])
+            return value
+
+        self.run("plain", plain, options)
+
+        tiered = TieredCache(f"bench{run_id}", options["ttl"])
+        self.run("tiered", lambda compute: tiered.get_or_compute(key, compute), options)
+        self.stdout.write(f"tiered cache counters: {tiered.stats()}")
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def run(self, name, read, options):
+        computes = 0
+        lock = threading.Lock()
+
+        def compute():
+            nonlocal computes
+            with lock:
+                computes += 1
+            time.sleep(options["compute_ms"] / 1000)
+            return "value"
+
+        deadline = time.monotonic() + options["duration"]
+
+        def reader(_):
+            latencies = []
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                read(compute)
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            latencies = sorted(
+                latency
+                for samples in pool.map(reader, range(options["threads"]))
+                for latency in samples
+            )
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        self.stdout.write(
+            f"{name:<10}{len(latencies):>9}{computes:>10}"
+            f"{percentile(0.5) * 1000:>9.1f}{percentile(0.99) * 1000:>9.1f}"
+        )
@@ -0,0 +1,87 @@
+import hashlib
+import time
+import zlib
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from server.middleware.compression import brotli
+
+DEFAULT_PATHS = "/api/products/,/api/products/filters/,/api/categories/"
+
+
+def gzip_compress(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def brotli_compress(data, quality):
+    return brotli.compress(data, quality=quality)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the size saved and the CPU spent compressing API responses at "
+        "several gzip and Brotli levels, against a cached compressed body"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--paths",
+            default=DEFAULT_PATHS,
+            help="Comma-separated GET paths whose responses are measured",
+        )
+        parser.add_argument(
+            "--token",
+            help="Auth token sent with the requests, for staff-only paths",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Compressions timed per measurement (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        headers = {"HTTP_HOST": "localhost", "HTTP_ACCEPT_ENCODING": "identity"}
+        if options["token"]:
+            headers["HTTP_AUTHORIZATION"] = f"Token {options['token']}"
+        client = Client(**headers)
+
+        codecs = [(f"gzip-{level}", gzip_compress, level) for level in (1, 6, 9)]
+        if brotli is not None:
+            codecs += [
+                (f"br-{quality}", brotli_compress, quality) for quality in (1, 5, 11)
+            ]
+        else:
+            self.stdout.write("brotli is not installed; measuring gzip only")
+
+        self.stdout.write(
+            f"{'path':<28}{'codec':<10}{'bytes':>10}{'sent':>10}{'ratio':>8}"
+            f"{'ms':>9}{'MB/s':>8}"
+        )
+        for path in options["paths"].split(","):
+            response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+            body = response.content
+            for name, compress, level in codecs:
+                started = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    compressed = compress(body, level)
+                elapsed = (time.perf_counter() - started) / options["repeat"]
+                self.stdout.write(
+                    f"{path:<28}{name:<10}{len(body):>10}{len(compressed):>10}"
+                    f"{len(body) / len(compressed):>8.1f}{elapsed * 1000:>9.2f}"
+                    f"{len(body) / elapsed / 1e6:>8.1f}"
+                )
+            # What a cached response costs instead: digesting the body
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                hashlib.blake2b(body, digest_size=16).hexdigest()
+            elapsed = (time.perf_counter() - started) / options["repeat"]
+            self.stdout.write(
+                f"{path:<28}{'cached':<10}{len(body):>10}{'':>10}{'':>8}"
+                f"{elapsed * 1000:>9.2f}{len(body) / elapsed / 1e6:>8.1f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from server.loadtest import run_load, start_server, stop_server
+
+# Name -> environment for the gunicorn server under test
+PROFILES = {
+    "per-request": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "true"},
+}
+ENDPOINTS = ["/keepalive/", "/api/products/"]
+
+
+class Command(BaseCommand):
+    help = "Measure connection setup cost and its effect on endpoint latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            default=",".join(PROFILES),
+            help=f"Connection profiles to compare (default: {','.join(PROFILES)})",
+        )
+        parser.add_argument(
+            "--connects",
+            type=int,
+            default=50,
+            help="Fresh connections timed directly (default: 50)",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=20,
+            help="Concurrent HTTP connections (default: 20)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds of load per endpoint (default: 10)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Gunicorn workers (default: 2)",
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8765,
+            help="Local port the server is started on (default: 8765)",
+        )
+
+    def handle(self, *args, **options):
+        self.time_connects(options["connects"])
+        self.stdout.write(
+            f"{'profile':<13}{'endpoint':<17}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+            f"{'errors':>8}"
+        )
+        for name in options["profiles"].split(","):
+            server = start_server(options["port"], options["workers"], PROFILES[name])
+            if server is None:
+                raise CommandError(f"The server did not start with the {name} profile")
+            try:
+                base_url = f"http://127.0.0.1:{options['port']}"
+                asyncio.run(run_load(base_url, ENDPOINTS, 2, 1.0))
+                for path in ENDPOINTS:
+                    result = asyncio.run(
+                        run_load(
+                            base_url,
+                            [path],
+                            options["connections"],
+                            options["duration"],
+                        )
+                    )
+                    self.stdout.write(
+                        f"{name:<13}{path:<17}{result.rps:>9.1f}"
+                        f"{result.percentile(0.5) * 1000:>9.2f}"
+                        f"{result.percentile(0.99) * 1000:>9.2f}"
+                        f"{result.errors:>8}"
+                    )
+            finally:
+                stop_server(server)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def time_connects(self, count):
+        # What every request pays when connections are not reused
+        timings = []
+        for _ in range(count):
+            connection = connections.create_connection("default")
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            timings.append(time.perf_counter() - started)
+            connection.close()
+        timings.sort()
+        self.stdout.write(
+            f"Connect + first query: median {timings[len(timings) // 2] * 1000:.2f}ms, "
+            f"max {timings[-1] * 1000:.2f}ms over {count} connections"
+        )
@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import os
+import platform
+import subprocess
+import sys
+from io import StringIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import orjson
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from server.loadtest import (
+    build_scenarios,
+    encode_request,
+    plan_scenarios,
+    run_load,
+    run_requests,
+    seed,
+    start_server,
+    stop_server,
+    unknown_routes,
+)
+
+# Throttles would turn most of a benchmark into 429s; empty rates turn them off
+UNTHROTTLED = {
+    "RATE_LIMIT_LOGIN": "",
+    "RATE_LIMIT_REGISTER": "",
+    "RATE_LIMIT_PASSWORD_RESET": "",
+    "RATE_LIMIT_CHECKOUT": "",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a deterministic dataset, drive every route in server/urls.py "
+        "through a local gunicorn and write throughput and latency "
+        "percentiles to a JSON results file, optionally compared with an "
+        "earlier one. Runs against the configured database; set "
+        "DB_SQLITE_PATH to use an SQLite file instead of PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--connections",
+            default="1,10",
+            help="Comma-separated concurrent connection counts (default: 1,10)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=3.0,
+            help="Seconds of load per route and connection count (default: 3)",
+        )
+        parser.add_argument(
+            "--routes",
+            help="Comma-separated route names to run (default: all)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=1, help="Dataset seed (default: 1)"
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=200,
+            help="Products in the dataset (default: 200)",
+        )
+        parser.add_argument(
+            "--customers",
+            type=int,
+            default=50,
+            help="Customers, each with a cart and orders (default: 50)",
+        )
+        parser.add_argument(
+            "--orders-per-customer",
+            type=int,
+            default=5,
+            help="Orders per customer (default: 5)",
+        )
+        parser.add_argument(
+            "--mode",
+            default="wsgi",
+            help="SERVER_MODE for gunicorn, wsgi or asgi (default: wsgi)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Gunicorn workers (default: 2)",
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8766,
+            help="Local port the server is started on (default: 8766)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Results file (default: benchmark-results/endpoints-<commit>.json)",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Earlier results file to compare throughput and p95 with",
+        )
+
+    def handle(self, *args, **options):
+        counts = [int(count) for count in options["connections"].split(",")]
+        routes = set(options["routes"].split(",")) if options["routes"] else None
+        unknown = unknown_routes(routes or ())
+        if unknown:
+            raise CommandError(
+                f"Unknown routes: {', '.join(unknown)}. "
+                "Route names are the name= of each path() in server/urls.py"
+            )
+        baseline = None
+        if options["compare"]:
+            baseline = orjson.loads(Path(options["compare"]).read_bytes())
+
+        data = seed(
+            seed=options["seed"],
+            products=options["products"],
+            customers=options["customers"],
+            orders_per_customer=options["orders_per_customer"],
+        )
+        # Orders were inserted directly, so the sales rollups are rebuilt
+        call_command("rebuild_sales_rollup", stdout=StringIO())
+        self.stdout.write(f"Seeded {data.counts}")
+
+        secret = settings.PAYMENT_WEBHOOK_SECRET or "benchmark"
+        scenarios, skipped = plan_scenarios(build_scenarios(data, secret), routes)
+        for name, reason in skipped.items():
+            self.stdout.write(self.style.WARNING(f"Skipping {name}: {reason}"))
+
+        # The server opens its own connections; SQLite wants the file free
+        connections.close_all()
+        server = start_server(
+            options["port"],
+            options["workers"],
+            env={
+                "SERVER_MODE": options["mode"],
+                "PAYMENT_WEBHOOK_SECRET": secret,
+                **UNTHROTTLED,
+            },
+        )
+        if server is None:
+            raise CommandError("The server did not start")
+
+        base_url = f"http://127.0.0.1:{options['port']}"
+        netloc = urlsplit(base_url).netloc
+        # Shared by every run, so no request index repeats within the seeding
+        sequence = itertools.count()
+        results = {}
+        self.stdout.write(
+            f"{'route':<26}{'conns':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'errors':>7}  statuses"
+        )
+        try:
+            # Warm up connections, caches and lazily imported code
+            asyncio.run(
+                run_load(base_url, ["/api/products/", "/api/categories/"], 5, 1)
+            )
+            for name, scenario in scenarios.items():
+                method, path, _, _ = scenario(0)
+                runs = {}
+                for count in counts:
+
+                    def make_request(index, scenario=scenario):
+                        return encode_request(netloc, *scenario(next(sequence)))
+
+                    result = asyncio.run(
+                        run_requests(base_url, make_request, count, options["duration"])
+                    )
+                    runs[str(count)] = summary = result.summary()
+                    self.stdout.write(
+                        f"{name:<26}{count:>6}{summary['rps']:>9.1f}"
+                        f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}"
+                        f"{summary['p99_ms']:>9.1f}{summary['errors']:>7}  "
+                        f"{summary['statuses']}"
+                    )
+                results[name] = {"method": method, "path": path, "runs": runs}
+        finally:
+            stop_server(server)
+
+        report = {
+            "meta": self.meta(options, counts, data),
+            "routes": results,
+            "skipped": skipped,
+        }
+        output = Path(
+            options["output"]
+            or settings.BASE_DIR
+            / "benchmark-results"
+            / f"endpoints-{report['meta']['commit'] or 'unknown'}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(
+            orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        )
+        self.stdout.write(f"Results written to {output}")
+
+        if baseline is not None:
+            self.compare(baseline, report)
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def meta(self, options, counts, data):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "created": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "mode": options["mode"],
+            "workers": options["workers"],
+            "connections": counts,
+            "duration": options["duration"],
+            "seed": data.seed,
+            "dataset": data.counts,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        }
+
+    def compare(self, baseline, report):
+        self.stdout.write(
+            f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:"
+        )
+        self.stdout.write(
+            f"{'route':<26}{'conns':>6}{'req/s':>10}{'change':>9}"
+            f"{'p95 ms':>9}{'change':>9}"
+        )
+        for name, route in report["routes"].items():
+            for count, summary in route["runs"].items():
+                before = baseline["routes"].get(name, {}).get("runs", {}).get(count)
+                if not before:
+                    continue
+                self.stdout.write(
+                    f"{name:<26}{count:>6}{summary['rps']:>10.1f}"
+                    f"{change(before['rps'], summary['rps']):>9}"
+                    f"{summary['p95_ms']:>9.1f}"
+                    f"{change(before['p95_ms'], summary['p95_ms']):>9}"
+                )
+
+
+def change(before, after):
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before:+.1%}"
@@ -0,0 +1,134 @@
+import datetime
+import time
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import RequestFactory
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import force_authenticate
+from server.controller.customer_order_controller import get_user_orders
+from server.models import Product, User
+from server.parsers import ORJSONParser
+from server.renderers import ORJSONRenderer
+from server.serializers import ProductSerializer
+
+UTC = datetime.timezone.utc
+
+# Values whose encoding differs between encoders if anything does
+EDGE_CASES = {
+    "decimals": [Decimal("10.00"), Decimal("0.1"), Decimal("-3"), Decimal("1e-7")],
+    "datetimes": [
+        datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC),
+        datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=UTC),
+        datetime.datetime(2025, 1, 2, 3, 4, 5),
+        datetime.datetime(
+            2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+        ),
+    ],
+    "date": datetime.date(2025, 1, 2),
+    "time": datetime.time(3, 4, 5, 600),
+    "timedelta": datetime.timedelta(days=1, seconds=3, microseconds=5),
+    "uuid": uuid.UUID(int=12345),
+    "lazy": gettext_lazy("Product not found"),
+    "unicode": 'Kopfhörer \u2028\u2029 \U0001f3a7 "quoted" \\ </script>',
+    "int_keys": {1: "one", 2: "two"},
+    "big_int": 2**70,
+    "floats": [0.1, 1e300, -0.0, 3.0],
+    "nested": [{"a": [1, [2, {"b": None}]], "c": True, "d": False}],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the orjson renderer and parser match DRF's byte for byte, then "
+        "time both on the product list and a user's order history"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Username whose orders are rendered (default: most orders)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Renders timed per payload (default: 50)",
+        )
+
+    def handle(self, *args, **options):
+        payloads = {"edge cases": EDGE_CASES}
+        for name, value in EDGE_CASES.items():
+            payloads[f"edge case {name}"] = {name: value}
+        payloads["get_all_products"] = ProductSerializer(
+            Product.objects.all(), many=True
+        ).data
+        payloads["get_user_orders"] = self.user_orders(options["user"])
+
+        mismatches = []
+        for name, data in payloads.items():
+            ours, theirs = ORJSONRenderer().render(data), JSONRenderer().render(data)
+            if ours == theirs:
+                continue
+            # Exponents are written without padding (1e-7, not 1e-07)
+            if JSONParser().parse(BytesIO(ours)) == JSONParser().parse(BytesIO(theirs)):
+                self.stdout.write(f"Same values, different float notation: {name}")
+            else:
+                mismatches.append(name)
+                self.stderr.write(f"Rendered output differs: {name}")
+        for name in ("get_all_products", "get_user_orders", "edge cases"):
+            body = JSONRenderer().render(payloads[name])
+            parsed = ORJSONParser().parse(BytesIO(body))
+            if parsed != JSONParser().parse(BytesIO(body)):
+                mismatches.append(name)
+                self.stderr.write(f"Parsed output differs: {name}")
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} payloads differ")
+        self.stdout.write(f"{len(payloads)} payloads render and parse compatibly")
+
+        self.stdout.write(
+            f"{'payload':<18}{'bytes':>10}{'drf ms':>9}{'orjson ms':>11}"
+            f"{'parse drf':>11}{'parse orjson':>14}"
+        )
+        repeat = options["repeat"]
+        for name in ("get_all_products", "get_user_orders"):
+            data = payloads[name]
+            body = JSONRenderer().render(data)
+            timings = [
+                self.time(lambda: JSONRenderer().render(data), repeat),
+                self.time(lambda: ORJSONRenderer().render(data), repeat),
+                self.time(lambda: JSONParser().parse(BytesIO(body)), repeat),
+                self.time(lambda: ORJSONParser().parse(BytesIO(body)), repeat),
+            ]
+            self.stdout.write(
+                f"{name:<18}{len(body):>10}{timings[0]:>9.2f}{timings[1]:>11.2f}"
+                f"{timings[2]:>11.2f}{timings[3]:>14.2f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def user_orders(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            user = (
+                User.objects.annotate(order_count=Count("orders"))
+                .order_by("-order_count")
+                .first()
+            )
+        if user is None:
+            raise CommandError("No user to render orders for")
+        request = RequestFactory().get("/api/orders/")
+        force_authenticate(request, user=user)
+        return get_user_orders(request).data
+
+    def time(self, fn, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) / repeat * 1000
@@ -0,0 +1,108 @@
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from server.logs import BackgroundHandler, JSONFormatter, RequestIdFilter
+
+
+class SlowStream(io.TextIOBase):
+    """Discards output after a delay, like a stdout pipe whose reader lags"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        # One writer at a time, as with a real pipe
+        with self._lock:
+            time.sleep(self.delay)
+        return len(text)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-call latency of print(), a synchronous JSON log handler "
+        "and the background handler while the output stream is slow"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Concurrent request threads (default: 8)",
+        )
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=200,
+            help="Log calls per thread (default: 200)",
+        )
+        parser.add_argument(
+            "--delay-ms",
+            type=float,
+            default=0.2,
+            help="Milliseconds each write to the stream takes (default: 0.2)",
+        )
+
+    def handle(self, *args, **options):
+        stream = SlowStream(options["delay_ms"] / 1000)
+
+        sync_handler = logging.StreamHandler(stream)
+        sync_handler.setFormatter(JSONFormatter())
+        sync_handler.addFilter(RequestIdFilter())
+        background = BackgroundHandler(stream)
+        background.setFormatter(JSONFormatter())
+        background.addFilter(RequestIdFilter())
+
+        self.stdout.write(f"{'scenario':<12}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        self.run(
+            "print",
+            lambda i: print(f"Added to cart: {i}", file=stream, flush=True),
+            options,
+        )
+        for name, handler in (("sync", sync_handler), ("background", background)):
+            logger = logging.getLogger(f"benchmark.logging.{name}")
+            logger.propagate = False
+            logger.setLevel(logging.DEBUG)
+            logger.addHandler(handler)
+            self.run(
+                name,
+                lambda i: logger.debug("Added to cart", extra={"cart_id": i}),
+                options,
+            )
+            logger.removeHandler(handler)
+
+        started = time.perf_counter()
+        background.stop()
+        self.stdout.write(
+            f"background queue drained in {time.perf_counter() - started:.2f}s"
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def run(self, name, log, options):
+        def request_thread(_):
+            latencies = []
+            for i in range(options["events"]):
+                started = time.perf_counter()
+                log(i)
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            latencies = sorted(
+                latency
+                for samples in pool.map(request_thread, range(options["threads"]))
+                for latency in samples
+            )
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        self.stdout.write(
+            f"{name:<12}{percentile(0.5) * 1000:>9.3f}"
+            f"{percentile(0.99) * 1000:>9.3f}{latencies[-1] * 1000:>9.3f}"
+        )
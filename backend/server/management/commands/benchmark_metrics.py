@@ -0,0 +1,114 @@
+import os
+import tempfile
+import threading
+import time
+
+import orjson
+from django.core.management.base import BaseCommand
+from server.metrics import Counter, Histogram, Registry
+
+ROUTES = ("all-products", "product-detail", "add-to-cart", "create-order")
+
+
+class LockedCounter:
+    """The obvious alternative to per-thread shards, for comparison"""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the metrics registry: the cost of an update from one and "
+        "several threads, and of rendering /metrics merged from many workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--updates",
+            type=int,
+            default=200000,
+            help="Updates per thread (default: 200000)",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Threads updating at once in the contended run (default: 8)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Worker snapshots merged when rendering (default: 8)",
+        )
+
+    def handle(self, *args, **options):
+        updates = options["updates"]
+        self.stdout.write(f"{'update':<26} {'1 thread':>12} {'N threads':>12}")
+        for name, make, update in (
+            ("locked counter", LockedCounter, lambda m, i: m.inc(ROUTES[i & 3])),
+            (
+                "sharded counter",
+                lambda: Counter("c", ""),
+                lambda m, i: m.inc(ROUTES[i & 3]),
+            ),
+            (
+                "histogram observe",
+                lambda: Histogram("h", ""),
+                lambda m, i: m.observe((i % 1000) / 1000, (ROUTES[i & 3],)),
+            ),
+        ):
+            single = self.run(make(), update, 1, updates)
+            contended = self.run(make(), update, options["threads"], updates)
+            self.stdout.write(
+                f"{name:<26} {single * 1e9:>9.0f} ns {contended * 1e9:>9.0f} ns"
+            )
+
+        self.stdout.write(f"\nRendering with {options['workers']} worker snapshots:")
+        registry = Registry()
+        requests = registry.counter("requests_total", "", ("route", "status"))
+        duration = registry.histogram("duration_seconds", "", ("route",))
+        for index in range(1000):
+            route = ROUTES[index & 3]
+            requests.inc((route, "200"))
+            duration.observe((index % 100) / 100, (route,))
+        with tempfile.TemporaryDirectory() as directory:
+            # This process's own values are live, the others come from files
+            content = orjson.dumps(registry.snapshot())
+            for worker in range(1, options["workers"]):
+                path = os.path.join(directory, f"{os.getpid()}-{worker}.json")
+                with open(path, "wb") as file:
+                    file.write(content)
+
+            started = time.perf_counter()
+            for _ in range(100):
+                body = registry.render(directory)
+            elapsed = (time.perf_counter() - started) / 100
+        self.stdout.write(
+            f"render: {elapsed * 1000:.2f} ms per scrape, {len(body)} bytes"
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def run(self, metric, update, threads, count):
+        """Seconds per update, averaged over all threads' updates"""
+        barrier = threading.Barrier(threads + 1)
+
+        def work():
+            barrier.wait()
+            for index in range(count):
+                update(metric, index)
+
+        pool = [threading.Thread(target=work) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        return (time.perf_counter() - started) / (threads * count)
@@ -0,0 +1,58 @@
+import timeit
+
+from django.contrib.auth import password_validation
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from server.passwords import get_policy
+
+# A strong password plus one tripping each rule
+SAMPLES = ["Zebra9Quilt!", "password", "Password1", "12345678", "Sh0rt"]
+
+
+def django_problems(password):
+    # What validate_password and register did before PasswordPolicy
+    problems = []
+    if not any(char.isupper() for char in password):
+        problems.append("Password must contain at least one uppercase letter.")
+    if not any(char.isdigit() for char in password):
+        problems.append("Password must contain at least one number.")
+    try:
+        password_validation.validate_password(password)
+    except ValidationError as e:
+        problems.extend(e.messages)
+    return problems
+
+
+class Command(BaseCommand):
+    help = "Compare PasswordPolicy against Django's password validators"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=20000,
+            help="Checks timed per password (default: 20000)",
+        )
+
+    def handle(self, *args, **options):
+        policy = get_policy()
+        number = options["number"]
+        # Warm both paths so one-off loading is not timed
+        for password in SAMPLES:
+            if sorted(policy.problems(password)) != sorted(django_problems(password)):
+                self.stderr.write(f"Messages differ for {password!r}")
+        self.stdout.write(
+            f"{'password':<16}{'django':>12}{'policy':>12}{'speedup':>10}"
+        )
+
+        for password in SAMPLES:
+            before = timeit.timeit(lambda: django_problems(password), number=number)
+            after = timeit.timeit(lambda: policy.problems(password), number=number)
+            self.stdout.write(
+                f"{password:<16}"
+                f"{before / number * 1e6:>10.2f}us"
+                f"{after / number * 1e6:>10.2f}us"
+                f"{before / after:>9.1f}x"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
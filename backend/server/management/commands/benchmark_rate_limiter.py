@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from server.middleware import RateLimiter
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Measure rate limiter checks per second and latency under concurrency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=16,
+            help="Concurrent callers (default: 16)",
+        )
+        parser.add_argument(
+            "--checks",
+            type=int,
+            default=20000,
+            help="Checks per scenario (default: 20000)",
+        )
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=1000,
+            help="Distinct clients in the mixed scenario (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        checks = options["checks"]
+        # Every check is allowed, so each one also updates the shared cache
+        self.run(
+            "well-behaved clients",
+            lambda i: f"bench:mixed:{i % options['clients']}",
+            limit=checks,
+            threads=options["threads"],
+            checks=checks,
+        )
+        # One client far over its limit: rejected from the in-process state
+        self.run(
+            "single client flood",
+            lambda i: "bench:flood",
+            limit=10,
+            threads=options["threads"],
+            checks=checks,
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def run(self, name, key_for, limit, threads, checks):
+        limiter = RateLimiter()
+        run_id = time.time_ns()
+
+        def check(i):
+            started = time.perf_counter()
+            allowed = not limiter.hit(f"{key_for(i)}:{run_id}", limit, 60)
+            return time.perf_counter() - started, allowed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(check, range(checks)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        allowed = sum(1 for _, ok in results if ok)
+        self.stdout.write(
+            f"{name}: {checks / elapsed:,.0f} checks/s, "
+            f"p50 {percentile(latencies, 0.5) * 1e6:.0f}us, "
+            f"p99 {percentile(latencies, 0.99) * 1e6:.0f}us, "
+            f"allowed {allowed}/{checks}"
+        )
@@ -0,0 +1,116 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from server.middleware.timing import ServerTimingMiddleware
+from server.timing import (
+    RequestTimings,
+    current_timings,
+    install_query_timer,
+    span,
+)
+
+DEFAULT_PATHS = "/api/products/,/api/products/filters/,/api/categories/"
+MIDDLEWARE = "server.middleware.timing.ServerTimingMiddleware"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what ServerTimingMiddleware adds: its fixed cost per request, "
+        "its cost per query and span, and whole requests served with and "
+        "without it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--paths",
+            default=DEFAULT_PATHS,
+            help="Comma-separated GET paths requested in turn",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=2000,
+            help="Requests per run (default: 2000)",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=3,
+            help="Alternating runs with and without the middleware (default: 3)",
+        )
+        parser.add_argument(
+            "--token",
+            help="Staff token, to include building the Server-Timing header",
+        )
+
+    def handle(self, *args, **options):
+        self.micro(options["requests"] * 10)
+        paths = options["paths"].split(",")
+        headers = {"HTTP_HOST": "localhost"}
+        if options["token"]:
+            headers["HTTP_AUTHORIZATION"] = f"Token {options['token']}"
+        without = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+
+        results = {"without": [], "with": []}
+        for _ in range(options["rounds"]):
+            with override_settings(MIDDLEWARE=without):
+                results["without"].append(self.run(paths, headers, options))
+            results["with"].append(self.run(paths, headers, options))
+
+        # Best round of each, to keep scheduler noise out of the comparison
+        base, timed = min(results["without"]), min(results["with"])
+        self.stdout.write("Whole requests, in-process (best round):")
+        self.stdout.write(f"without middleware: {base * 1e6:9.1f} us/request")
+        self.stdout.write(f"with middleware:    {timed * 1e6:9.1f} us/request")
+        self.stdout.write(
+            f"overhead:           {(timed - base) * 1e6:9.1f} us/request "
+            f"({(timed - base) / base:.1%})"
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def micro(self, count):
+        """The instrumentation on its own, free of request-to-request noise"""
+        request = RequestFactory().get("/", HTTP_HOST="localhost")
+        middleware = ServerTimingMiddleware(lambda request: HttpResponse())
+        fixed = self.per_call(lambda: middleware(request), count) - self.per_call(
+            lambda: HttpResponse(), count
+        )
+
+        install_query_timer()
+        with connection.cursor() as cursor:
+            untimed = self.per_call(lambda: cursor.execute("SELECT 1"), count)
+            token = current_timings.set(RequestTimings())
+            try:
+                timed = self.per_call(lambda: cursor.execute("SELECT 1"), count)
+
+                def enter_span():
+                    with span("serialize"):
+                        pass
+
+                per_span = self.per_call(enter_span, count)
+            finally:
+                current_timings.reset(token)
+
+        self.stdout.write("Instrumentation alone:")
+        self.stdout.write(f"per request:        {fixed * 1e6:9.2f} us")
+        self.stdout.write(f"per query:          {(timed - untimed) * 1e6:9.2f} us")
+        self.stdout.write(f"per span:           {per_span * 1e6:9.2f} us")
+
+    def per_call(self, fn, count):
+        started = time.perf_counter()
+        for _ in range(count):
+            fn()
+        return (time.perf_counter() - started) / count
+
+    def run(self, paths, headers, options):
+        client = Client(**headers)
+        for path in paths:
+            client.get(path)
+        started = time.perf_counter()
+        for i in range(options["requests"]):
+            client.get(paths[i % len(paths)])
+        return (time.perf_counter() - started) / options["requests"]
@@ -0,0 +1,78 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+from server.loadtest import run_load, start_server, stop_server
+
+DEFAULT_PATHS = "/api/products/,/api/categories/,/api/products/check-stock/1/"
+
+
+class Command(BaseCommand):
+    help = "Compare the WSGI and ASGI gunicorn profiles under concurrent load"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            default="wsgi,asgi",
+            help="SERVER_MODE values to start and compare (default: wsgi,asgi)",
+        )
+        parser.add_argument(
+            "--connections",
+            default="50,200,500",
+            help="Comma-separated concurrent connection counts (default: 50,200,500)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds of load per run (default: 10)",
+        )
+        parser.add_argument(
+            "--paths",
+            default=DEFAULT_PATHS,
+            help="Comma-separated paths requested in turn",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Gunicorn workers per server (default: 2)",
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8765,
+            help="Local port the servers are started on (default: 8765)",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"].split(",")
+        counts = [int(count) for count in options["connections"].split(",")]
+        self.stdout.write(
+            f"{'mode':<6}{'conns':>7}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+            f"{'errors':>8}  statuses"
+        )
+
+        for mode in options["modes"].split(","):
+            server = start_server(
+                options["port"], options["workers"], env={"SERVER_MODE": mode}
+            )
+            if server is None:
+                raise CommandError(f"The {mode} server did not start")
+            try:
+                base_url = f"http://127.0.0.1:{options['port']}"
+                # Warm up connections, caches and lazily imported code
+                asyncio.run(run_load(base_url, paths, 5, 1.0))
+                for count in counts:
+                    result = asyncio.run(
+                        run_load(base_url, paths, count, options["duration"])
+                    )
+                    self.stdout.write(
+                        f"{mode:<6}{count:>7}{result.rps:>10.1f}"
+                        f"{result.percentile(0.5) * 1000:>9.1f}"
+                        f"{result.percentile(0.99) * 1000:>9.1f}"
+                        f"{result.errors:>8}  {result.statuses}"
+                    )
+            finally:
+                stop_server(server)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
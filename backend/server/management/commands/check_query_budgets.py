@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from server.loadtest import budget_settings, growth, measure_routes, unknown_routes
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every route in server/urls.py against fixtures of growing size "
+        "and fail if a route's query count grows with the data, printing "
+        "the statements that did with the code that ran them. Every fixture "
+        "is written in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1,10,100",
+            help="Comma-separated fixture sizes: products, and orders and "
+            "cart items per customer (default: 1,10,100)",
+        )
+        parser.add_argument(
+            "--routes",
+            help="Comma-separated route names to check (default: all)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=1, help="Dataset seed (default: 1)"
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        routes = set(options["routes"].split(",")) if options["routes"] else None
+        unknown = unknown_routes(routes or ())
+        if unknown:
+            raise CommandError(
+                f"Unknown routes: {', '.join(unknown)}. "
+                "Route names are the name= of each path() in server/urls.py"
+            )
+        runs = {}
+        with budget_settings():
+            for size in sizes:
+                runs[size], skipped = measure_routes(size, routes, options["seed"])
+                if size == sizes[0]:
+                    for name, reason in skipped.items():
+                        self.stdout.write(
+                            self.style.WARNING(f"Skipping {name}: {reason}")
+                        )
+
+        smallest = sizes[0]
+        names = list(runs[smallest])
+        self.stdout.write(
+            f"{'route':<26}" + "".join(f"{f'n={size}':>8}" for size in sizes)
+        )
+        failures = {}
+        for name in names:
+            results = [runs[size][name] for size in sizes]
+            statuses = {status for status, _ in results}
+            problem = ""
+            if len(statuses) > 1:
+                problem = f"  responses differ: {sorted(statuses)}"
+            elif any(len(log) > len(results[0][1]) for _, log in results[1:]):
+                problem = "  GROWS"
+                failures[name] = growth(results[0][1], results[-1][1])
+            self.stdout.write(
+                f"{name:<26}"
+                + "".join(f"{len(log):>8}" for _, log in results)
+                + (self.style.ERROR(problem) if problem else "")
+            )
+
+        for name, grown in failures.items():
+            self.stdout.write(
+                self.style.ERROR(f"\n{name}: over budget at n={sizes[-1]}")
+            )
+            for _, before, after, query in grown:
+                self.stdout.write(
+                    f"\n{after} runs, against {before} at n={smallest}:\n"
+                    f"{query.format()}"
+                )
+        if failures:
+            raise CommandError(
+                f"{len(failures)} routes run more queries as the data grows: "
+                f"{', '.join(failures)}"
+            )
+        self.stdout.write(self.style.SUCCESS("All routes are within budget"))
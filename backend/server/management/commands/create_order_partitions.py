@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from server.partitioning import (
+    add_months,
+    ensure_partitions,
+    month_start,
+    supports_partitioning,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly archive partitions that archive_orders will fill "
+        "next: the months about to leave its window of live orders"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=12,
+            help="Months of orders archive_orders keeps live; pass the value "
+            "it runs with (default: 12)",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=3,
+            help="Months of upcoming archive runs to cover (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        if not supports_partitioning():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Database does not support partitioning; archive tables are plain"
+                )
+            )
+            return
+
+        # archive_orders moves the months before its cutoff, which advances
+        # by one month each month; the month at the cutoff is the next to go
+        cutoff = add_months(month_start(timezone.now()), -options["months"])
+        created = ensure_partitions(
+            cutoff, add_months(cutoff, max(options["ahead"] - 1, 0))
+        )
+        for name in created:
+            self.stdout.write(self.style.SUCCESS(f"Created partition: {name}"))
+        if not created:
+            self.stdout.write("All partitions already exist")
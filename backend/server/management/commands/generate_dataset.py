@@ -0,0 +1,140 @@
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from server.caching.catalog import (
+    CATEGORIES_KEY,
+    FILTERS_KEY,
+    RECOMMENDED_KEY,
+    catalog_cache,
+)
+from server.loadtest import DatasetGenerator
+from server.loadtest.synthetic import PREFIX
+from server.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a large synthetic shop: products, users, "
+        "carts, orders and order lines with Zipfian popularity and seasonal "
+        "order times, reproducible from a seed. Uses COPY on PostgreSQL. "
+        "Meant for a scratch database; set DB_SQLITE_PATH to use an SQLite "
+        "file instead of PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=100_000,
+            help="Products (default: 100000)",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=200_000,
+            help="Customer accounts (default: 200000)",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=1_000_000,
+            help="Orders, with about two lines each (default: 1000000)",
+        )
+        parser.add_argument(
+            "--cart-share",
+            type=float,
+            default=0.2,
+            help="Share of users with a cart (default: 0.2)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Days of order history, ending today (default: 365)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=1, help="Random seed (default: 1)"
+        )
+        parser.add_argument(
+            "--product-skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of product popularity (default: 1.1)",
+        )
+        parser.add_argument(
+            "--user-skew",
+            type=float,
+            default=0.8,
+            help="Zipf exponent of orders per user (default: 0.8)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="Rows generated and written at a time (default: 10000)",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use INSERTs even where COPY is available",
+        )
+        parser.add_argument(
+            "--skip-rollup",
+            action="store_true",
+            help="Leave the daily sales rollups to rebuild_sales_rollup",
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError(
+                "This database already holds generated rows; "
+                "generate into a fresh database"
+            )
+        if min(options["products"], options["users"]) < 1:
+            raise CommandError("At least one product and one user are needed")
+
+        generator = DatasetGenerator(
+            seed=options["seed"],
+            products=options["products"],
+            users=options["users"],
+            orders=options["orders"],
+            cart_share=options["cart_share"],
+            days=options["days"],
+            product_skew=options["product_skew"],
+            user_skew=options["user_skew"],
+            chunk_size=options["chunk_size"],
+            use_copy=False if options["no_copy"] else None,
+        )
+        method = "COPY" if generator.use_copy else "INSERT"
+        self.stdout.write(f"Generating into {connection.vendor} with {method}")
+
+        started = time.perf_counter()
+        # All or nothing, so a failed run can simply be repeated
+        with transaction.atomic():
+            writers = generator.run()
+        elapsed = time.perf_counter() - started
+
+        # Rows went in without save(), so no signal cleared the catalog cache
+        catalog_cache.invalidate(FILTERS_KEY, CATEGORIES_KEY, RECOMMENDED_KEY)
+
+        self.stdout.write(f"{'table':<24}{'rows':>12}{'write s':>10}")
+        for model, writer in writers.items():
+            self.stdout.write(
+                f"{model._meta.db_table:<24}{writer.rows:>12}{writer.seconds:>10.1f}"
+            )
+        total = sum(writer.rows for writer in writers.values())
+        self.stdout.write(
+            f"{'total':<24}{total:>12}{elapsed:>10.1f}  "
+            f"({total / elapsed * 60:,.0f} rows per minute)"
+        )
+
+        if not options["skip_rollup"]:
+            started = time.perf_counter()
+            call_command("rebuild_sales_rollup", stdout=StringIO())
+            self.stdout.write(
+                f"Sales rollups rebuilt in {time.perf_counter() - started:.1f}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Dataset generated"))
@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from server.payments import claim_intents, get_gateway, process_intent
+
+
+class Command(BaseCommand):
+    help = "Work off queued payment intents through the configured gateway"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Intents claimed per batch (default: 50)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Gateway calls in flight at once (default: 8)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty (default: 1)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit instead of polling forever",
+        )
+
+    def handle(self, *args, **options):
+        gateway = get_gateway()
+        totals = Counter()
+        self.stdout.write(f"Processing payments with the {gateway.name} gateway")
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    intents = claim_intents(options["batch_size"])
+                    if not intents:
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll_interval"])
+                        continue
+
+                    started = time.monotonic()
+                    outcomes = Counter(
+                        pool.map(lambda i: self.process(i, gateway), intents)
+                    )
+                    totals.update(outcomes)
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f"Processed {len(intents)} intents in {elapsed:.2f}s "
+                        f"({len(intents) / elapsed:.1f}/s): {dict(outcomes)}"
+                    )
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {dict(totals)}"))
+
+    def process(self, intent, gateway):
+        try:
+            return process_intent(intent, gateway)
+        except Exception as e:
+            self.stderr.write(f"Payment intent {intent.id} failed: {e}")
+            return "error"
+        finally:
+            # Worker threads hold their own connection; recycle it like a request
+            close_old_connections()
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from server.models import PasswordResetToken, Token
+
+
+class Command(BaseCommand):
+    help = "Delete expired auth and password reset tokens in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Tokens deleted per statement (default: 5000)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches to limit load (default: 0)",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        for model, label in [
+            (Token, "auth tokens"),
+            (PasswordResetToken, "password reset tokens"),
+        ]:
+            purged = self.purge(model, now, options["batch_size"], options["pause"])
+            self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired {label}"))
+
+    def purge(self, model, now, batch_size, pause):
+        expired = model.objects.filter(expires_at__lte=now)
+        purged = 0
+
+        while True:
+            # Walks the expires_at index; each DELETE touches one bounded batch
+            ids = list(
+                expired.order_by("expires_at").values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deleted, _ = model.objects.filter(id__in=ids).delete()
+            purged += deleted
+            self.stdout.write(f"Purged {purged} {model._meta.verbose_name_plural}")
+            if pause:
+                time.sleep(pause)
+        return purged
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from server.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    DailyProductSalesRollup,
+    DailySalesRollup,
+    Order,
+    OrderItem,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollups from the live and archived orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Only rebuild the last N days, today included (default: full history)",
+        )
+
+    def handle(self, *args, **options):
+        # Archived orders share the live tables' field names, so both are
+        # aggregated with the same queries
+        sources = [
+            (Order.objects.all(), OrderItem.objects.all()),
+            (ArchivedOrder.objects.all(), ArchivedOrderItem.objects.all()),
+        ]
+        rollups = DailySalesRollup.objects.all()
+        product_rollups = DailyProductSalesRollup.objects.all()
+
+        if options["days"] is not None:
+            if options["days"] < 1:
+                raise CommandError("--days must be at least 1")
+            # The same window as the stats views: the last N days with today
+            start_day = timezone.localdate() - timedelta(days=options["days"] - 1)
+            sources = [
+                (
+                    orders.filter(created_at__date__gte=start_day),
+                    items.filter(order__created_at__date__gte=start_day),
+                )
+                for orders, items in sources
+            ]
+            rollups = rollups.filter(day__gte=start_day)
+            product_rollups = product_rollups.filter(day__gte=start_day)
+
+        with transaction.atomic():
+            deleted, count = self.rebuild(sources, rollups)
+            product_deleted, product_count = self.rebuild_products(
+                [items for _, items in sources], product_rollups
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {count} rollup rows (replaced {deleted})")
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {product_count} product rollup rows "
+                f"(replaced {product_deleted})"
+            )
+        )
+
+    def rebuild(self, sources, rollups):
+        buckets = {}
+        for orders, items in sources:
+            order_rows = (
+                orders.annotate(day=TruncDate("created_at"))
+                .values("day", "status")
+                .annotate(order_count=Count("id"), revenue=Sum("total_amount"))
+                .order_by()
+            )
+            for row in order_rows:
+                rollup = buckets.setdefault(
+                    (row["day"], row["status"]),
+                    DailySalesRollup(day=row["day"], status=row["status"]),
+                )
+                rollup.order_count += row["order_count"]
+                rollup.revenue += row["revenue"] or Decimal("0.00")
+
+            unit_rows = (
+                items.annotate(day=TruncDate("order__created_at"))
+                .values("day", "order__status")
+                .annotate(units=Sum("quantity"))
+                .order_by()
+            )
+            for row in unit_rows:
+                rollup = buckets.get((row["day"], row["order__status"]))
+                if rollup is not None:
+                    rollup.units += row["units"] or 0
+
+        deleted, _ = rollups.delete()
+        DailySalesRollup.objects.bulk_create(buckets.values(), batch_size=1000)
+        return deleted, len(buckets)
+
+    def rebuild_products(self, item_sources, product_rollups):
+        buckets = {}
+        for items in item_sources:
+            rows = (
+                items.exclude(order__status="cancelled")
+                .annotate(day=TruncDate("order__created_at"))
+                .values("day", "product__id", "product__category_id")
+                .annotate(
+                    units=Sum("quantity"),
+                    revenue=Sum(
+                        F("price") * F("quantity"), output_field=DecimalField()
+                    ),
+                )
+                .order_by()
+            )
+            for row in rows:
+                if row["product__id"] is None:
+                    # Archived line whose product has since been deleted
+                    continue
+                rollup = buckets.setdefault(
+                    (row["day"], row["product__id"]),
+                    DailyProductSalesRollup(
+                        day=row["day"],
+                        product_id=row["product__id"],
+                        category_id=row["product__category_id"],
+                    ),
+                )
+                rollup.units += row["units"] or 0
+                rollup.revenue += row["revenue"] or Decimal("0.00")
+
+        deleted, _ = product_rollups.delete()
+        DailyProductSalesRollup.objects.bulk_create(buckets.values(), batch_size=1000)
+        return deleted, len(buckets)
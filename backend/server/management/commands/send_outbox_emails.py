@@ -0,0 +1,76 @@
+import time
+from collections import Counter
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from server.emails import claim_emails, deliver_email
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails over one reused SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Emails claimed per batch (default: 50)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox is empty (default: 2)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox once and exit instead of polling forever",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        totals = Counter()
+        reconnects = 0
+
+        try:
+            while True:
+                close_old_connections()
+                emails = claim_emails(options["batch_size"])
+                if not emails:
+                    if options["once"]:
+                        break
+                    # Let the server drop an idle session rather than time it out
+                    connection.close()
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                started = time.monotonic()
+                outcomes = Counter()
+                for email in emails:
+                    try:
+                        # No-op while the session from earlier batches is open
+                        connection.open()
+                    except OSError as e:
+                        self.stderr.write(f"SMTP connection failed: {e}")
+                    outcome = deliver_email(email, connection)
+                    outcomes[outcome] += 1
+                    if outcome != "sent":
+                        # The session may be broken; start a fresh one
+                        connection.close()
+                        reconnects += 1
+                totals.update(outcomes)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"Delivered {len(emails)} emails in {elapsed:.2f}s "
+                    f"({len(emails) / elapsed:.1f}/s): {dict(outcomes)}"
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Done: {dict(totals)}, reconnects: {reconnects}")
+        )
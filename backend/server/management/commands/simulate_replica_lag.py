@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from server.db_router import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto the replica aliases every --lag "
+        "seconds, to try replica routing locally against lagging replicas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lag",
+            type=float,
+            default=2.0,
+            help="Seconds between copies, i.e. the simulated lag (default: 2)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Copy once and exit",
+        )
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError("No replica aliases are configured")
+        for alias in ["default", *aliases]:
+            if not settings.DATABASES[alias]["ENGINE"].endswith("sqlite3"):
+                raise CommandError(
+                    f"{alias} is not SQLite; use real replication for other databases"
+                )
+
+        try:
+            while True:
+                primary = sqlite3.connect(settings.DATABASES["default"]["NAME"])
+                try:
+                    for alias in aliases:
+                        replica = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+                        try:
+                            primary.backup(replica)
+                        finally:
+                            replica.close()
+                finally:
+                    primary.close()
+                self.stdout.write(f"Replicated to {', '.join(aliases)}")
+                if options["once"]:
+                    break
+                time.sleep(options["lag"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Replication stopped"))
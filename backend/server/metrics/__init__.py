@@ -0,0 +1,10 @@
+from .registry import Counter, Histogram, Registry, registry
+from .collectors import observe_request
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "Registry",
+    "registry",
+    "observe_request",
+]
@@ -0,0 +1,125 @@
+"""
+The application's metrics.
+
+Requests are recorded by MetricsMiddleware under the route's name from
+urls.py, so latency percentiles and error rates can be computed per route
+with histogram_quantile() and the status label. Everything else is read when
+/metrics is scraped: connection pool and log queue figures per process, the
+payment and email queues from the database, and TieredCache counters.
+"""
+
+import logging
+
+from django.db import connections
+from django.db.models import Count
+
+from ..caching.tiered import TieredCache
+from ..logs import BackgroundHandler
+from .registry import registry
+
+# Anything else is counted as "other", to keep the label set bounded
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route, method and status code",
+    ("route", "method", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent serving HTTP requests, by route",
+    ("route",),
+)
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.route or "unmatched"
+
+
+def observe_request(request, status, duration):
+    route = route_name(request)
+    method = request.method if request.method in HTTP_METHODS else "other"
+    http_requests.inc((route, method, str(status)))
+    http_request_duration.observe(duration, (route,))
+
+
+def db_pool_stats():
+    samples = {}
+    for alias in connections:
+        connection = connections[alias]
+        # Only look at pools that are configured, and so already in use
+        if not connection.settings_dict["OPTIONS"].get("pool"):
+            continue
+        stats = connection.pool.get_stats()
+        samples[(alias, "size")] = stats.get("pool_size", 0)
+        samples[(alias, "available")] = stats.get("pool_available", 0)
+        samples[(alias, "waiting")] = stats.get("requests_waiting", 0)
+        samples[(alias, "max")] = stats.get("pool_max", 0)
+    return samples
+
+
+def log_queue_depth():
+    depth = 0
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, BackgroundHandler):
+            depth += handler.queue.qsize()
+    return {(): depth}
+
+
+def job_queue_depths():
+    from ..models import OutboxEmail, PaymentIntent
+
+    samples = {}
+    for queue, model, statuses in (
+        ("payments", PaymentIntent, ("pending", "processing")),
+        ("emails", OutboxEmail, ("pending", "sending")),
+    ):
+        for status in statuses:
+            samples[(queue, status)] = 0
+        rows = (
+            model.objects.filter(status__in=statuses)
+            .values("status")
+            .annotate(count=Count("id"))
+        )
+        for row in rows:
+            samples[(queue, row["status"])] = row["count"]
+    return samples
+
+
+def tiered_cache_events():
+    return {
+        (cache.name, event): count
+        for cache in TieredCache.instances
+        for event, count in cache.stats().items()
+    }
+
+
+registry.callback(
+    "db_pool_connections",
+    "Database connection pool usage per alias; summed over live workers",
+    ("alias", "state"),
+    db_pool_stats,
+)
+registry.callback(
+    "log_queue_depth",
+    "Log records waiting to be written; summed over live workers",
+    (),
+    log_queue_depth,
+)
+registry.callback(
+    "job_queue_depth",
+    "Payment intents and emails waiting for or held by a worker",
+    ("queue", "status"),
+    job_queue_depths,
+    per_process=False,
+)
+registry.callback(
+    "tiered_cache_events_total",
+    "TieredCache hits, misses and rebuilds",
+    ("cache", "event"),
+    tiered_cache_events,
+    type="counter",
+)
@@ -0,0 +1,331 @@
+"""
+A small in-process metrics registry with Prometheus text exposition.
+
+Counters and histograms are updated without locks: each thread writes to
+its own shard, created on the thread's first update, and shards are only
+summed when metrics are collected. Histograms have fixed buckets, so an
+observation is a bisect and two additions.
+
+Gunicorn runs several worker processes and a scrape reaches only one of
+them. With METRICS_DIR set, every process writes a snapshot of its metrics
+to a file in METRICS_DIR every METRICS_FLUSH_INTERVAL seconds, and
+the process answering a scrape merges them with its own live values.
+Counters and histograms of exited processes are kept, so totals never go
+backwards when a worker is recycled; per-process gauges only count live
+processes. Other workers' values can lag by up to one flush interval.
+"""
+
+import atexit
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+
+import orjson
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+
+class ShardedMetric(Metric):
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            # Once per thread; updates themselves never take the lock
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _all_shards(self):
+        with self._shards_lock:
+            return list(self._shards)
+
+
+class Counter(ShardedMetric):
+    """A monotonically increasing count; labels are passed as a tuple"""
+
+    type = "counter"
+
+    def inc(self, labels=(), amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for shard in self._all_shards():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+class Histogram(ShardedMetric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # Per-bucket counts (the last one is +Inf), then the sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def collect(self):
+        totals = {}
+        for shard in self._all_shards():
+            for labels, entry in list(shard.items()):
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(entry)
+                else:
+                    for index, value in enumerate(entry):
+                        total[index] += value
+        return totals
+
+
+class CallbackMetric(Metric):
+    """
+    A metric whose values are read when metrics are collected: `callback`
+    returns {labels tuple: value}. Per-process ones are written to the
+    snapshots and summed across live processes (or all processes, for
+    counters); the rest are only evaluated by the process serving the
+    scrape, for values that are the same from every process, such as queue
+    lengths read from the database.
+    """
+
+    def __init__(self, name, help, labelnames=(), callback=None, type="gauge"):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+        self.type = type
+        self.per_process = True
+
+    def collect(self):
+        return self.callback()
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._flusher_pid = None
+        self._flusher_lock = threading.Lock()
+        self._snapshot_name = None
+
+    def register(self, metric, per_process=True):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        if isinstance(metric, CallbackMetric):
+            metric.per_process = per_process
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, labelnames, callback, type="gauge", **kwargs):
+        return self.register(
+            CallbackMetric(name, help, labelnames, callback, type), **kwargs
+        )
+
+    def snapshot(self):
+        """This process's values, in the form written to METRICS_DIR"""
+        snapshot = {}
+        for name, metric in self.metrics.items():
+            if isinstance(metric, CallbackMetric) and not metric.per_process:
+                continue
+            try:
+                samples = metric.collect()
+            except Exception:
+                # A failing callback must not take the other metrics down
+                continue
+            snapshot[name] = [
+                [list(labels), value] for labels, value in samples.items()
+            ]
+        return snapshot
+
+    # Multi-process support
+
+    def ensure_flusher(self, directory, interval):
+        """Start this process's snapshot writer, once per process"""
+        if not directory or self._flusher_pid == os.getpid():
+            return
+        with self._flusher_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            os.makedirs(directory, exist_ok=True)
+            self._flusher_pid = os.getpid()
+            # The start time keeps a recycled pid from overwriting the
+            # totals of the process that had it before
+            self._snapshot_name = f"{os.getpid()}-{time.time_ns()}.json"
+            thread = threading.Thread(
+                target=self._flush_loop,
+                args=(directory, interval),
+                name="metrics-flusher",
+                daemon=True,
+            )
+            thread.start()
+            # The final flush keeps what was counted since the last one
+            atexit.register(self._flush, directory)
+
+    def _flush_loop(self, directory, interval):
+        while True:
+            time.sleep(interval)
+            self._flush(directory)
+
+    def _flush(self, directory):
+        try:
+            self.write_snapshot(directory)
+        except OSError:
+            pass
+
+    def write_snapshot(self, directory):
+        path = os.path.join(directory, self._snapshot_name)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(orjson.dumps(self.snapshot()))
+        os.replace(temporary, path)
+
+    def read_snapshots(self, directory):
+        """Other processes' snapshots as (pid, alive, snapshot)"""
+        snapshots = []
+        for filename in os.listdir(directory):
+            pid = filename.partition("-")[0]
+            if (
+                not filename.endswith(".json")
+                or not pid.isdigit()
+                or filename == self._snapshot_name
+            ):
+                continue
+            try:
+                with open(os.path.join(directory, filename), "rb") as file:
+                    snapshot = orjson.loads(file.read())
+            except (OSError, orjson.JSONDecodeError):
+                continue
+            snapshots.append((int(pid), process_alive(int(pid)), snapshot))
+        return snapshots
+
+    # Exposition
+
+    def collect(self, directory=None):
+        """{name: {labels: value}} for this process, merged with the others"""
+        merged = {}
+        for name, metric in self.metrics.items():
+            try:
+                merged[name] = metric.collect()
+            except Exception:
+                merged[name] = {}
+
+        if directory and os.path.isdir(directory):
+            for _, alive, snapshot in self.read_snapshots(directory):
+                for name, samples in snapshot.items():
+                    metric = self.metrics.get(name)
+                    if metric is None or (metric.type == "gauge" and not alive):
+                        continue
+                    target = merged.setdefault(name, {})
+                    for labels, value in samples:
+                        add_sample(target, tuple(labels), value)
+        return merged
+
+    def render(self, directory=None):
+        """The Prometheus text exposition format, version 0.0.4"""
+        lines = []
+        for name, samples in self.collect(directory).items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in sorted(samples.items()):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.type == "histogram":
+                    lines.extend(histogram_lines(name, metric.buckets, pairs, value))
+                else:
+                    lines.append(f"{name}{format_labels(pairs)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def add_sample(samples, labels, value):
+    current = samples.get(labels)
+    if current is None:
+        samples[labels] = list(value) if isinstance(value, list) else value
+    elif isinstance(current, list):
+        for index, part in enumerate(value):
+            current[index] += part
+    else:
+        samples[labels] = current + value
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def histogram_lines(name, buckets, pairs, entry):
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), entry[:-1]):
+        cumulative += count
+        le = bound if bound == "+Inf" else format_value(bound)
+        yield f"{name}_bucket{format_labels([*pairs, ('le', le)])} {cumulative}"
+    yield f"{name}_sum{format_labels(pairs)} {format_value(entry[-1])}"
+    yield f"{name}_count{format_labels(pairs)} {cumulative}"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ""
+    return (
+        "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+    )
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return "NaN" if math.isnan(value) else repr(value)
+    return str(value)
+
+
+registry = Registry()
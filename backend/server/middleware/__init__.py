@@ -1,3 +1,38 @@
 from .auth_middleware import TokenAuthentication
+from .token_cache import get_token_user, invalidate_token, invalidate_user_tokens
+from .replica_routing import ReplicaRoutingMiddleware
+from .request_id import RequestIdMiddleware
+from .timing import ServerTimingMiddleware
+from .metrics import MetricsMiddleware
+from .compression import CompressionMiddleware, cache_compressed
+from .throttling import (
+    RateLimiter,
+    TokenBucketThrottle,
+    LoginRateThrottle,
+    LoginUsernameRateThrottle,
+    LoginAccountRateThrottle,
+    RegisterRateThrottle,
+    PasswordResetRateThrottle,
+    CheckoutRateThrottle,
+)
 
-__all__ = ["TokenAuthentication"]
+__all__ = [
+    "TokenAuthentication",
+    "get_token_user",
+    "invalidate_token",
+    "invalidate_user_tokens",
+    "ReplicaRoutingMiddleware",
+    "RequestIdMiddleware",
+    "ServerTimingMiddleware",
+    "MetricsMiddleware",
+    "CompressionMiddleware",
+    "cache_compressed",
+    "RateLimiter",
+    "TokenBucketThrottle",
+    "LoginRateThrottle",
+    "LoginUsernameRateThrottle",
+    "LoginAccountRateThrottle",
+    "RegisterRateThrottle",
+    "PasswordResetRateThrottle",
+    "CheckoutRateThrottle",
+]
@@ -1,6 +1,6 @@
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from ..models.auth_model import Token
+from .token_cache import get_token_user
 
 
 class TokenAuthentication(BaseAuthentication):
@@ -12,8 +12,8 @@ class TokenAuthentication(BaseAuthentication):
 
         token = auth_header.split(" ")[1]
 
-        try:
-            token_obj = Token.objects.get(key=token)
-            return (token_obj.user, token)
-        except Token.DoesNotExist:
+        # Served from the token cache; only a cold token costs a query
+        user = get_token_user(token)
+        if user is None:
             raise AuthenticationFailed("Invalid token")
+        return (user, token)
@@ -0,0 +1,245 @@
+"""
+Response compression negotiated on Accept-Encoding.
+
+Brotli is preferred when the client accepts it and the optional ``brotli``
+package is installed, gzip otherwise. Responses smaller than
+COMPRESSION_MIN_SIZE, already encoded or of a non-text type are left alone.
+Streaming responses are compressed chunk by chunk and flushed after each
+chunk, so clients still receive them progressively.
+
+Views marked with ``@cache_compressed`` return the same bytes to everyone
+until the catalog changes, so their compressed bodies are kept in a
+two-tier cache keyed by a digest of the uncompressed body, and a hit costs
+a hash instead of a compression. Only views whose bodies hold no volatile
+fields, such as stock, may be marked: every change of such a field is a new
+key, so the cache would mostly miss while filling up with dead entries.
+"""
+
+import hashlib
+import zlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from ..caching.tiered import TieredCache
+from ..timing import span
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "text/")
+
+compressed_cache = TieredCache(
+    "compressed",
+    settings.COMPRESSION_CACHE_TTL,
+    local_bytes=settings.COMPRESSION_CACHE_LOCAL_BYTES,
+)
+
+
+def cache_compressed(view):
+    """Keep the compressed form of the view's responses in the cache"""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            response = await view(*args, **kwargs)
+            response.cache_compressed = True
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = view(*args, **kwargs)
+        response.cache_compressed = True
+        return response
+
+    return wrapper
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding):
+    """The preferred encoding the client accepts, or None for identity"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class StreamCompressor:
+    """Incremental compressor whose output can be flushed after each chunk"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(
+                quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+        else:
+            # wbits=31 writes the gzip container rather than raw zlib
+            self._compressor = zlib.compressobj(
+                settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31
+            )
+
+    def compress(self, data):
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def cache_key(content, encoding):
+    return f"{encoding}:{hashlib.blake2b(content, digest_size=16).hexdigest()}"
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_sequence(chunks, encoding):
+    compressor = StreamCompressor(encoding)
+    for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+async def acompress_sequence(chunks, encoding):
+    compressor = StreamCompressor(encoding)
+    async for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding = self.negotiate(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self.compress_stream(response, encoding)
+
+        content = response.content
+        with span("compress"):
+            if getattr(response, "cache_compressed", False):
+                compressed = compressed_cache.get_or_compute(
+                    cache_key(content, encoding), lambda: compress(content, encoding)
+                )
+            else:
+                compressed = compress(content, encoding)
+        return self.replace_content(response, content, compressed, encoding)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.negotiate(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self.compress_stream(response, encoding)
+
+        content = response.content
+
+        async def build():
+            return compress(content, encoding)
+
+        with span("compress"):
+            if getattr(response, "cache_compressed", False):
+                compressed = await compressed_cache.aget_or_compute(
+                    cache_key(content, encoding), build
+                )
+            else:
+                compressed = compress(content, encoding)
+        return self.replace_content(response, content, compressed, encoding)
+
+    def negotiate(self, request, response):
+        """The encoding to use, or None to leave the response as it is"""
+        if not self.is_compressible(response):
+            return None
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+
+    def compress_stream(self, response, encoding):
+        if response.is_async:
+            response.streaming_content = acompress_sequence(
+                response.streaming_content, encoding
+            )
+        else:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, encoding
+            )
+        # The compressed length is only known once streaming is done
+        del response.headers["Content-Length"]
+        return self.mark_encoded(response, encoding)
+
+    def replace_content(self, response, content, compressed, encoding):
+        if len(compressed) >= len(content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        return self.mark_encoded(response, encoding)
+
+    def mark_encoded(self, response, encoding):
+        # The bytes differ from the identity encoding, so a strong ETag
+        # must become weak
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header("Content-Encoding") or response.status_code in (
+            204,
+            206,
+            304,
+        ):
+            return False
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        return response.streaming or len(response.content) >= (
+            settings.COMPRESSION_MIN_SIZE
+        )
@@ -0,0 +1,38 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from ..metrics import observe_request, registry
+
+
+class MetricsMiddleware:
+    """
+    Records each request's route, status and duration for /metrics (see
+    server/metrics). Streaming responses are timed up to their first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        registry.ensure_flusher(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        observe_request(request, response.status_code, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        registry.ensure_flusher(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        observe_request(request, response.status_code, time.perf_counter() - started)
+        return response
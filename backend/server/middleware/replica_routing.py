@@ -0,0 +1,74 @@
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+from ..db_router import primary_pinned, replica_aliases
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+CACHE_PREFIX = "db-primary-pin:"
+
+
+def client_key(request):
+    # Token clients by their token, browsers by session, anyone else by IP
+    identity = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return CACHE_PREFIX + hashlib.sha256(identity.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Keeps clients that just wrote on the primary database for
+    DB_REPLICA_STICKY_SECONDS, so their next reads see their own writes
+    even where the view would otherwise read from a replica
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        key = client_key(request)
+        token = primary_pinned.set(bool(cache.get(key)))
+        try:
+            response = self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+
+        if self.pins(request, response):
+            cache.set(key, True, settings.DB_REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        key = client_key(request)
+        token = primary_pinned.set(bool(await cache.aget(key)))
+        try:
+            response = await self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+
+        if self.pins(request, response):
+            await cache.aset(key, True, settings.DB_REPLICA_STICKY_SECONDS)
+        return response
+
+    def pins(self, request, response):
+        """Whether the request wrote, so its client should stay on the primary"""
+        return request.method not in SAFE_METHODS and response.status_code < 400
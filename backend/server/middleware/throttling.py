@@ -0,0 +1,251 @@
+"""
+Rate limiting for the auth and checkout endpoints.
+
+Each process keeps an exact token bucket per client in memory, and every
+request it lets through is also counted in the shared Django cache, so the
+limit holds across all workers. The shared count is a sliding window over
+two fixed-window counters updated with atomic ``incr``; it behaves like a
+token bucket whose capacity is the whole rate. Once the shared count says
+no, the process remembers the client as blocked until its retry time, so a
+flood is turned away without touching the cache at all. If the shared cache
+fails, requests are judged by the local bucket alone rather than refused.
+
+Login attempts against an account are limited on failures only, so signing
+in never spends from the limit and nobody can lock an account out merely by
+knowing its username.
+
+Rates come from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], keyed by scope.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "throttle:"
+
+
+def parse_rate(rate):
+    """Parse a rate such as 10/m into (10, 60); None disables the limit"""
+    if rate is None:
+        return None, None
+    count, period = rate.split("/")
+    return int(count), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+class RateLimiter:
+    def __init__(self, shared=cache, max_keys=100000):
+        self.shared = shared
+        self.max_keys = max_keys
+        # key -> [tokens, last refill, blocked until], least recent first
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period):
+        """
+        Record a request for key and return 0 if it is allowed, else the
+        seconds until the client may retry
+        """
+        now = time.time()
+        wait = self._take_local(key, limit, period, now)
+        if wait:
+            return wait
+        try:
+            wait = self._count_shared(key, limit, period, now)
+        except Exception:
+            # An outage of the shared cache must not take logins down with it
+            logger.warning("Shared rate limit unavailable", exc_info=True)
+            return 0
+        if wait:
+            with self._lock:
+                state = self._local.get(key)
+                if state is not None:
+                    state[2] = now + wait
+        return wait
+
+    def check(self, key, limit, period):
+        """
+        Return what hit would for key, without recording a request
+        """
+        now = time.time()
+        with self._lock:
+            state = self._local.get(key)
+            wait = self._local_wait(state, limit, period, now)[0] if state else 0
+        if wait:
+            return wait
+        try:
+            return self._peek_shared(key, limit, period, now)
+        except Exception:
+            logger.warning("Shared rate limit unavailable", exc_info=True)
+            return 0
+
+    def _take_local(self, key, limit, period, now):
+        with self._lock:
+            state = self._local.get(key)
+            if state is None:
+                state = self._local[key] = [float(limit), now, 0.0]
+                while len(self._local) > self.max_keys:
+                    self._local.popitem(last=False)
+            else:
+                self._local.move_to_end(key)
+            wait, tokens = self._local_wait(state, limit, period, now)
+            if wait:
+                if tokens is not None:
+                    state[0], state[1] = tokens, now
+                return wait
+            state[0], state[1] = tokens - 1, now
+            return 0
+
+    @staticmethod
+    def _local_wait(state, limit, period, now):
+        """Return the wait for one more request and the refilled tokens"""
+        tokens, last, blocked_until = state
+        if blocked_until > now:
+            return blocked_until - now, None
+        tokens = min(limit, tokens + (now - last) * limit / period)
+        if tokens < 1:
+            return (1 - tokens) * period / limit, tokens
+        return 0, tokens
+
+    def _count_shared(self, key, limit, period, now):
+        window = int(now // period)
+        current_key = f"{CACHE_PREFIX}{key}:{window}"
+        try:
+            count = self.shared.incr(current_key)
+        except ValueError:
+            # First hit of the window; add() loses gracefully to a racing worker
+            if self.shared.add(current_key, 1, timeout=period * 2):
+                count = 1
+            else:
+                count = self.shared.incr(current_key)
+        previous = self.shared.get(f"{CACHE_PREFIX}{key}:{window - 1}", 0)
+        return self._window_wait(count, previous, limit, period, now)
+
+    def _peek_shared(self, key, limit, period, now):
+        window = int(now // period)
+        count = self.shared.get(f"{CACHE_PREFIX}{key}:{window}", 0)
+        previous = self.shared.get(f"{CACHE_PREFIX}{key}:{window - 1}", 0)
+        # As if this request were counted too
+        return self._window_wait(count + 1, previous, limit, period, now)
+
+    @staticmethod
+    def _window_wait(count, previous, limit, period, now):
+        window = int(now // period)
+        # Weight the previous window by how much of it still overlaps
+        remaining = (window + 1) * period - now
+        if previous * remaining / period + count <= limit:
+            return 0
+        if count >= limit or not previous:
+            return remaining
+        # Time until enough of the previous window has slid out
+        return max(remaining - (limit - count) * period / previous, 1)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+
+limiter = RateLimiter()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle backed by the shared RateLimiter. Subclasses set the scope
+    naming their rate, and whether clients are told apart by IP, by user,
+    by the username a request names or by that username and the IP together.
+    """
+
+    scope = None
+    key_by = "ip"
+
+    def __init__(self):
+        self.limit, self.period = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        )
+        self.wait_seconds = None
+
+    def get_ident_key(self, request):
+        ip = f"ip:{self.get_ident(request)}"
+        if self.key_by == "user" and request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        if self.key_by in ("username", "username_ip") and isinstance(
+            request.data, dict
+        ):
+            username = request.data.get("username")
+            if isinstance(username, str) and username:
+                key = f"username:{username.lower()}"
+                return f"{key}:{ip}" if self.key_by == "username_ip" else key
+        return ip
+
+    def get_cache_key(self, request):
+        return f"{self.scope}:{self.get_ident_key(request)}"
+
+    def allow_request(self, request, view):
+        if self.limit is None:
+            return True
+        self.wait_seconds = limiter.hit(
+            self.get_cache_key(request), self.limit, self.period
+        )
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    scope = "login"
+
+
+class FailureRateThrottle(TokenBucketThrottle):
+    """
+    Counts only the requests the view reports with record_failure; the
+    throttle itself just turns clients away once they are over the limit
+    """
+
+    def allow_request(self, request, view):
+        if self.limit is None:
+            return True
+        self.wait_seconds = limiter.check(
+            self.get_cache_key(request), self.limit, self.period
+        )
+        return not self.wait_seconds
+
+    def record_failure(self, request):
+        if self.limit is not None:
+            limiter.hit(self.get_cache_key(request), self.limit, self.period)
+
+
+class LoginUsernameRateThrottle(FailureRateThrottle):
+    """Caps failed logins on one account from one address"""
+
+    scope = "login_username"
+    key_by = "username_ip"
+
+
+class LoginAccountRateThrottle(FailureRateThrottle):
+    """
+    Caps failed logins on one account, however many addresses they come
+    from; set well above login_username, as anyone can spend from it
+    """
+
+    scope = "login_account"
+    key_by = "username"
+
+
+class RegisterRateThrottle(TokenBucketThrottle):
+    scope = "register"
+
+
+class PasswordResetRateThrottle(TokenBucketThrottle):
+    scope = "password_reset"
+
+
+class CheckoutRateThrottle(TokenBucketThrottle):
+    scope = "checkout"
+    key_by = "user"
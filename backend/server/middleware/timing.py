@@ -0,0 +1,115 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from ..timing import RequestTimings, current_timings, install_query_timer
+from .token_cache import get_token_user
+
+logger = logging.getLogger(__name__)
+
+
+def is_staff_request(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # Views that never authenticate leave request.user anonymous; token
+    # lookups are cached, so checking the header costs no query
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    if header.startswith("Token "):
+        user = get_token_user(header.split(" ")[1])
+        return user is not None and user.is_staff
+    return False
+
+
+def has_credentials(request):
+    """Whether is_staff_request() could be true; anonymous requests cannot"""
+    return (
+        "HTTP_AUTHORIZATION" in request.META
+        or settings.SESSION_COOKIE_NAME in request.COOKIES
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Measures every request (see server/timing.py). Staff responses, or all
+    responses with SERVER_TIMING_PUBLIC, carry a Server-Timing header for
+    the browser's network panel, and requests slower than
+    SLOW_REQUEST_THRESHOLD_MS are logged with their costliest statements.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        install_query_timer()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        elapsed = timings.elapsed
+
+        show = settings.SERVER_TIMING_PUBLIC or is_staff_request(request)
+        self.report(request, response, timings, elapsed, show)
+        return response
+
+    async def __acall__(self, request):
+        # Queries run in worker threads here, whose connections get the
+        # timer from add_query_timer() as they connect
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        elapsed = timings.elapsed
+
+        show = settings.SERVER_TIMING_PUBLIC
+        if not show and has_credentials(request):
+            # Resolving the user may query the database
+            show = await sync_to_async(is_staff_request)(request)
+        self.report(request, response, timings, elapsed, show)
+        return response
+
+    def report(self, request, response, timings, elapsed, show):
+        if show:
+            response["Server-Timing"] = self.header(timings, elapsed)
+        if elapsed * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            logger.warning(
+                "Slow request",
+                extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "db_queries": timings.db_queries,
+                    "db_ms": round(timings.db_time * 1000, 2),
+                    "cache_hits": timings.cache_hits,
+                    "cache_misses": timings.cache_misses,
+                    "spans_ms": {
+                        name: round(seconds * 1000, 2)
+                        for name, seconds in timings.spans.items()
+                    },
+                    "top_sql": timings.top_statements(),
+                },
+            )
+
+    def header(self, timings, elapsed):
+        metrics = [
+            f'db;dur={timings.db_time * 1000:.2f};desc="{timings.db_queries} queries"',
+            f'cache;desc="{timings.cache_hits} hits, {timings.cache_misses} misses"',
+        ]
+        for name, seconds in timings.spans.items():
+            metrics.append(f"{name};dur={seconds * 1000:.2f}")
+        metrics.append(f"total;dur={elapsed * 1000:.2f}")
+        return ", ".join(metrics)
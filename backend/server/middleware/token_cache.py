@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..caching.local import LocalTTLCache
+from ..models.auth_model import Token
+from ..models.user_model import User
+from ..timing import record_cache
+
+# Bumped when the snapshot changes, so old entries are never read back
+CACHE_PREFIX = "auth-token:2:"
+
+# Every concrete field but the password hash, which has no business in a
+# shared cache; views that need it get it loaded as a deferred field
+SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields if field.name != "password"
+)
+
+
+local_cache = LocalTTLCache(
+    settings.TOKEN_CACHE_LOCAL_SIZE, settings.TOKEN_CACHE_LOCAL_TTL
+)
+
+
+def snapshot(user):
+    """The user's field values bar the password, safe to share between requests"""
+    return SNAPSHOT_FIELDS, tuple(getattr(user, name) for name in SNAPSHOT_FIELDS)
+
+
+def restore(data):
+    # A fresh instance per request, so views can mutate request.user freely
+    names, values = data
+    return User.from_db("default", names, values)
+
+
+def load_token(key):
+    """Cache entry for a token: its user snapshot, expiry and last-seen time"""
+    try:
+        token = Token.objects.select_related("user").get(key=key)
+    except Token.DoesNotExist:
+        return None
+    return {
+        "user": snapshot(token.user),
+        "expires_at": token.expires_at,
+        "last_seen": token.last_seen,
+    }
+
+
+def get_token_user(key):
+    """
+    Resolve a token key to its user: in-process cache first, then the shared
+    Django cache, then one joined query. Returns None for unknown or expired
+    tokens.
+    """
+    data = local_cache.get(key)
+    if data is None:
+        data = cache.get(CACHE_PREFIX + key)
+        record_cache(hit=data is not None)
+        if data is None:
+            data = load_token(key)
+            if data is None:
+                return None
+            store(key, data)
+        else:
+            local_cache.set(key, data)
+    else:
+        record_cache(hit=True)
+
+    now = timezone.now()
+    if data["expires_at"] <= now:
+        invalidate_token(key)
+        return None
+
+    interval = timedelta(seconds=settings.TOKEN_LAST_SEEN_INTERVAL)
+    if data["last_seen"] is None or now - data["last_seen"] >= interval:
+        # Auth stays read-only apart from this throttled touch
+        Token.objects.filter(key=key).update(last_seen=now)
+        data = {**data, "last_seen": now}
+        store(key, data)
+
+    return restore(data["user"])
+
+
+def store(key, data):
+    # Never cache a token past its expiry
+    remaining = (data["expires_at"] - timezone.now()).total_seconds()
+    timeout = max(1, min(settings.TOKEN_CACHE_TTL, int(remaining)))
+    cache.set(CACHE_PREFIX + key, data, timeout)
+    local_cache.set(key, data)
+
+
+def invalidate_token(key):
+    local_cache.delete(key)
+    cache.delete(CACHE_PREFIX + key)
+
+
+def invalidate_user_tokens(user, keys=None):
+    """
+    Drop every cached token of the user. Pass keys when the tokens are
+    about to be deleted and can no longer be looked up afterwards.
+    Other processes may keep serving their local copy for up to
+    TOKEN_CACHE_LOCAL_TTL seconds.
+    """
+    if keys is None:
+        keys = list(Token.objects.filter(user=user).values_list("key", flat=True))
+    for key in keys:
+        local_cache.delete(key)
+    cache.delete_many([CACHE_PREFIX + key for key in keys])
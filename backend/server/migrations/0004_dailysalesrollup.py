@@ -0,0 +1,91 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:33
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollup(apps, schema_editor):
+    Order = apps.get_model("server", "Order")
+    OrderItem = apps.get_model("server", "OrderItem")
+    DailySalesRollup = apps.get_model("server", "DailySalesRollup")
+
+    units = {
+        (row["day"], row["order__status"]): row["units"]
+        for row in OrderItem.objects.annotate(day=TruncDate("order__created_at"))
+        .values("day", "order__status")
+        .annotate(units=Sum("quantity"))
+        .order_by()
+    }
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(
+                day=row["day"],
+                status=row["status"],
+                order_count=row["order_count"],
+                revenue=row["revenue"] or Decimal("0.00"),
+                units=units.get((row["day"], row["status"])) or 0,
+            )
+            for row in Order.objects.annotate(day=TruncDate("created_at"))
+            .values("day", "status")
+            .annotate(order_count=Count("id"), revenue=Sum("total_amount"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0003_delete_review"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("shipped", "Shipped"),
+                            ("delivered", "Delivered"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("units", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["day", "status"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "status"), name="unique_sales_rollup_day_status"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:34
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_product_rollup(apps, schema_editor):
+    OrderItem = apps.get_model("server", "OrderItem")
+    DailyProductSalesRollup = apps.get_model("server", "DailyProductSalesRollup")
+
+    DailyProductSalesRollup.objects.bulk_create(
+        [
+            DailyProductSalesRollup(
+                day=row["day"],
+                product_id=row["product_id"],
+                category_id=row["product__category_id"],
+                units=row["units"] or 0,
+                revenue=row["revenue"] or Decimal("0.00"),
+            )
+            for row in OrderItem.objects.exclude(order__status="cancelled")
+            .annotate(day=TruncDate("order__created_at"))
+            .values("day", "product_id", "product__category_id")
+            .annotate(
+                units=Sum("quantity"),
+                revenue=Sum(F("price") * F("quantity"), output_field=DecimalField()),
+            )
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0004_dailysalesrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyProductSalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("units", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="daily_sales",
+                        to="server.category",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="server.product",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day", "product"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "product"),
+                        name="unique_product_rollup_day_product",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_product_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,124 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:39
+
+from django.db import migrations, models
+
+ARCHIVE_COLUMNS = {
+    "server_archivedorder": """
+        id bigint NOT NULL,
+        user_id bigint NOT NULL,
+        order_number varchar(20) NOT NULL,
+        status varchar(20) NOT NULL,
+        total_amount numeric(10, 2) NOT NULL,
+        shipping_address text NOT NULL,
+        payment_status boolean NOT NULL,
+        payment_method varchar(50) NULL,
+        payment_date timestamp with time zone NULL,
+        created_at timestamp with time zone NOT NULL,
+        updated_at timestamp with time zone NOT NULL,
+        archived_at timestamp with time zone NOT NULL""",
+    "server_archivedorderitem": """
+        id bigint NOT NULL,
+        order_id bigint NOT NULL,
+        order_created_at timestamp with time zone NOT NULL,
+        product_id bigint NULL,
+        product_name varchar(255) NOT NULL,
+        quantity integer NOT NULL CHECK (quantity >= 0),
+        price numeric(10, 2) NOT NULL,
+        created_at timestamp with time zone NOT NULL""",
+}
+ARCHIVE_INDEXES = [
+    "CREATE INDEX archived_order_user_created_idx "
+    "ON server_archivedorder (user_id, created_at DESC)",
+    "CREATE INDEX archived_order_item_order_idx ON server_archivedorderitem (order_id)",
+]
+
+
+def create_archive_tables(apps, schema_editor):
+    # The archive models are unmanaged: Postgres gets monthly range-partitioned
+    # tables, other databases plain tables with the same columns
+    if schema_editor.connection.vendor == "postgresql":
+        for table, key in (
+            ("server_archivedorder", "created_at"),
+            ("server_archivedorderitem", "order_created_at"),
+        ):
+            schema_editor.execute(
+                f"CREATE TABLE {table} ({ARCHIVE_COLUMNS[table]},"
+                f" PRIMARY KEY (id, {key})) PARTITION BY RANGE ({key})"
+            )
+            schema_editor.execute(
+                f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"
+            )
+    else:
+        for table, columns in ARCHIVE_COLUMNS.items():
+            schema_editor.execute(f"CREATE TABLE {table} ({columns}, PRIMARY KEY (id))")
+    for statement in ARCHIVE_INDEXES:
+        schema_editor.execute(statement)
+
+
+def drop_archive_tables(apps, schema_editor):
+    schema_editor.execute("DROP TABLE IF EXISTS server_archivedorderitem")
+    schema_editor.execute("DROP TABLE IF EXISTS server_archivedorder")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0006_paymentintent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedOrder",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("order_number", models.CharField(max_length=20)),
+                ("status", models.CharField(max_length=20)),
+                ("total_amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("shipping_address", models.TextField()),
+                ("payment_status", models.BooleanField(default=False)),
+                (
+                    "payment_method",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                ("payment_date", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "server_archivedorder",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrderItem",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("order_created_at", models.DateTimeField()),
+                ("product_name", models.CharField(max_length=255)),
+                ("quantity", models.PositiveIntegerField()),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "server_archivedorderitem",
+                "managed": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["-created_at"], name="order_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "-created_at"], name="order_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "created_at"], name="order_status_created_idx"
+            ),
+        ),
+        migrations.RunPython(create_archive_tables, drop_archive_tables),
+    ]
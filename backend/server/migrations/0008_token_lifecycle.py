@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:43
+
+import server.models.auth_model
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0007_order_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="token",
+            name="device",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="token",
+            name="expires_at",
+            field=models.DateTimeField(
+                default=server.models.auth_model.default_token_expiry
+            ),
+        ),
+        migrations.AddField(
+            model_name="token",
+            name="last_seen",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="token",
+            index=models.Index(fields=["expires_at"], name="auth_token_expires_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="token",
+            index=models.Index(
+                fields=["user", "device"], name="auth_token_user_device_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:50
+
+import hashlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def move_reset_tokens(apps, schema_editor):
+    # Outstanding reset links keep working; only their hash is stored now
+    User = apps.get_model("server", "User")
+    PasswordResetToken = apps.get_model("server", "PasswordResetToken")
+    PasswordResetToken.objects.bulk_create(
+        [
+            PasswordResetToken(
+                user_id=user_id,
+                token_hash=hashlib.sha256(token.encode()).hexdigest(),
+                expires_at=expiry,
+            )
+            for user_id, token, expiry in User.objects.filter(
+                reset_token__isnull=False, reset_token_expiry__gt=timezone.now()
+            ).values_list("id", "reset_token", "reset_token_expiry")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0009_email_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PasswordResetToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token_hash", models.CharField(max_length=64, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("expires_at", models.DateTimeField()),
+                ("used_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="password_reset_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["expires_at"], name="reset_token_expires_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(move_reset_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="user",
+            name="reset_token",
+        ),
+        migrations.RemoveField(
+            model_name="user",
+            name="reset_token_expiry",
+        ),
+    ]
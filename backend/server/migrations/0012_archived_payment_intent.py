@@ -0,0 +1,71 @@
+# Generated by Django 5.1.4 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+COLUMNS = """
+        id bigint NOT NULL,
+        order_id bigint NOT NULL,
+        order_created_at timestamp with time zone NOT NULL,
+        amount numeric(10, 2) NOT NULL,
+        payment_method varchar(50) NOT NULL,
+        status varchar(20) NOT NULL,
+        gateway varchar(50) NOT NULL,
+        gateway_reference varchar(255) NOT NULL,
+        attempts integer NOT NULL CHECK (attempts >= 0),
+        last_error text NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        updated_at timestamp with time zone NOT NULL,
+        completed_at timestamp with time zone NULL"""
+
+
+def create_archive_table(apps, schema_editor):
+    # Partitioned like server_archivedorderitem; see migration 0007
+    table = "server_archivedpaymentintent"
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE {table} ({COLUMNS}, PRIMARY KEY (id, order_created_at))"
+            " PARTITION BY RANGE (order_created_at)"
+        )
+        schema_editor.execute(
+            f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"
+        )
+    else:
+        schema_editor.execute(f"CREATE TABLE {table} ({COLUMNS}, PRIMARY KEY (id))")
+    schema_editor.execute(
+        f"CREATE INDEX archived_payment_intent_order_idx ON {table} (order_id)"
+    )
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.execute("DROP TABLE IF EXISTS server_archivedpaymentintent")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("server", "0011_login_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedPaymentIntent",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("order_created_at", models.DateTimeField()),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("payment_method", models.CharField(max_length=50)),
+                ("status", models.CharField(max_length=20)),
+                ("gateway", models.CharField(blank=True, max_length=50)),
+                ("gateway_reference", models.CharField(blank=True, max_length=255)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "server_archivedpaymentintent",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
@@ -1,13 +1,17 @@
 from .product_model import Product
 from .user_model import User, Customer, AdminStaff
 from .category_model import Category
-from .auth_model import Token
+from .auth_model import Token, PasswordResetToken
 from .ecommerce_model import (
     Order,
     OrderItem,
     Cart,
     CartItem,
 )
+from .archive_model import ArchivedOrder, ArchivedOrderItem, ArchivedPaymentIntent
+from .payment_model import PaymentIntent
+from .email_model import OutboxEmail
+from .analytics_model import DailySalesRollup, DailyProductSalesRollup
 
 __all__ = [
     "Product",
@@ -16,8 +20,16 @@ __all__ = [
     "AdminStaff",
     "Category",
     "Token",
+    "PasswordResetToken",
     "Order",
     "OrderItem",
     "Cart",
     "CartItem",
+    "ArchivedOrder",
+    "ArchivedOrderItem",
+    "ArchivedPaymentIntent",
+    "PaymentIntent",
+    "OutboxEmail",
+    "DailySalesRollup",
+    "DailyProductSalesRollup",
 ]
@@ -0,0 +1,215 @@
+from django.db import models
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+from decimal import Decimal
+from .ecommerce_model import Order, OrderItem
+
+
+class DailySalesRollupManager(models.Manager):
+    def record(self, day, status, orders=0, revenue=Decimal("0.00"), units=0):
+        """Add the given deltas to the (day, status) bucket, creating it if needed"""
+        rollup, _ = self.get_or_create(day=day, status=status)
+        self.filter(pk=rollup.pk).update(
+            order_count=F("order_count") + orders,
+            revenue=F("revenue") + revenue,
+            units=F("units") + units,
+            updated_at=timezone.now(),
+        )
+
+    def record_order(self, order, units=None):
+        """Count a newly created order in its creation day's bucket"""
+        if units is None:
+            units = order_units(order)
+        self.record(order_day(order), order.status, 1, order.total_amount, units)
+
+    def move_order(self, order, old_status, units=None):
+        """Move an order from its previous status bucket to its current one"""
+        if old_status == order.status:
+            return
+        if units is None:
+            units = order_units(order)
+        day = order_day(order)
+        self.record(day, old_status, -1, -order.total_amount, -units)
+        self.record(day, order.status, 1, order.total_amount, units)
+
+        # Product sales only count orders that have not been cancelled
+        if "cancelled" in (old_status, order.status):
+            sign = -1 if order.status == "cancelled" else 1
+            DailyProductSalesRollup.objects.record_lines(
+                day, order_lines(order), sign=sign
+            )
+
+    def move_orders(self, orders, new_status):
+        """
+        Move several orders, still carrying their previous status, to
+        new_status with one rollup update per affected (day, status) bucket
+        """
+        orders = [order for order in orders if order.status != new_status]
+        if not orders:
+            return
+        units = dict(
+            OrderItem.objects.filter(order__in=orders)
+            .values("order_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("order_id", "total")
+        )
+
+        deltas = {}
+        for order in orders:
+            day = order_day(order)
+            moved_units = units.get(order.id) or 0
+            for key, sign in (((day, order.status), -1), ((day, new_status), 1)):
+                count, revenue, total_units = deltas.get(key, (0, Decimal("0.00"), 0))
+                deltas[key] = (
+                    count + sign,
+                    revenue + sign * order.total_amount,
+                    total_units + sign * moved_units,
+                )
+        for (day, status), (count, revenue, total_units) in deltas.items():
+            self.record(day, status, count, revenue, total_units)
+
+        # Product sales only count orders that have not been cancelled
+        if new_status == "cancelled":
+            crossing, sign = orders, -1
+        else:
+            crossing = [order for order in orders if order.status == "cancelled"]
+            sign = 1
+        if not crossing:
+            return
+        days = {order.id: order_day(order) for order in crossing}
+        lines_by_day = {}
+        for order_id, *line in OrderItem.objects.filter(order__in=crossing).values_list(
+            "order_id", "product_id", "product__category_id", "quantity", "price"
+        ):
+            lines_by_day.setdefault(days[order_id], []).append(line)
+        for day, lines in lines_by_day.items():
+            DailyProductSalesRollup.objects.record_lines(day, lines, sign=sign)
+
+
+class DailyProductSalesRollupManager(models.Manager):
+    def record_order(self, order, lines=None):
+        """Count a newly created order's lines in its creation day's buckets"""
+        if lines is None:
+            lines = order_lines(order)
+        self.record_lines(order_day(order), lines)
+
+    def record_lines(self, day, lines, sign=1):
+        """
+        Add order lines, given as (product_id, category_id, quantity, price)
+        tuples, to the day's per-product buckets
+        """
+        totals = {}
+        for product_id, category_id, quantity, price in lines:
+            category, units, revenue = totals.get(
+                product_id, (category_id, 0, Decimal("0.00"))
+            )
+            totals[product_id] = (
+                category,
+                units + sign * quantity,
+                revenue + sign * price * quantity,
+            )
+        if not totals:
+            return
+
+        self.bulk_create(
+            [
+                self.model(day=day, product_id=product_id, category_id=category_id)
+                for product_id, (category_id, _, _) in totals.items()
+            ],
+            ignore_conflicts=True,
+        )
+        # One UPDATE for all the products, as bulk_update() would write it
+        self.filter(day=day, product_id__in=totals).update(
+            units=F("units")
+            + Case(
+                *[
+                    When(product_id=product_id, then=Value(units))
+                    for product_id, (_, units, _) in totals.items()
+                ],
+                output_field=models.IntegerField(),
+            ),
+            revenue=F("revenue")
+            + Case(
+                *[
+                    When(product_id=product_id, then=Value(revenue))
+                    for product_id, (_, _, revenue) in totals.items()
+                ],
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
+
+def order_day(order):
+    return timezone.localdate(order.created_at)
+
+
+def order_units(order):
+    return order.items.aggregate(total=Sum("quantity"))["total"] or 0
+
+
+def order_lines(order):
+    return OrderItem.objects.filter(order=order).values_list(
+        "product_id", "product__category_id", "quantity", "price"
+    )
+
+
+class DailySalesRollup(models.Model):
+    """
+    Orders, revenue and units per creation day and current order status.
+    Maintained incrementally by the order controllers and rebuilt from scratch
+    with ``manage.py rebuild_sales_rollup``.
+    """
+
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+    units = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DailySalesRollupManager()
+
+    class Meta:
+        ordering = ["day", "status"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status"], name="unique_sales_rollup_day_status"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.order_count} orders"
+
+
+class DailyProductSalesRollup(models.Model):
+    """
+    Units and revenue per day and product for orders that are not cancelled.
+    Feeds the top products and categories charts.
+    """
+
+    day = models.DateField()
+    product = models.ForeignKey(
+        "Product", on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    category = models.ForeignKey(
+        "Category", on_delete=models.SET_NULL, null=True, related_name="daily_sales"
+    )
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+
+    objects = DailyProductSalesRollupManager()
+
+    class Meta:
+        ordering = ["day", "product"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product"], name="unique_product_rollup_day_product"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} product {self.product_id}: {self.units} units"
@@ -0,0 +1,102 @@
+from django.db import models
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold storage for delivered orders moved out of the orders table by
+    ``manage.py archive_orders``. On Postgres the table is range-partitioned
+    by month on ``created_at`` (see server/partitioning.py), so the primary
+    key there is (id, created_at); ids are unique because they come from
+    the orders table.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        "User",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="archived_orders",
+    )
+    order_number = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    shipping_address = models.TextField()
+    payment_status = models.BooleanField(default=False)
+    payment_method = models.CharField(max_length=50, blank=True, null=True)
+    payment_date = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "server_archivedorder"
+
+    def __str__(self):
+        return f"Archived order {self.order_number} ({self.status})"
+
+
+class ArchivedOrderItem(models.Model):
+    """
+    Cold storage for the lines of archived orders, partitioned like
+    ArchivedOrder on the parent order's creation time so an order and its
+    lines always live in the same month.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="items",
+    )
+    order_created_at = models.DateTimeField()
+    product = models.ForeignKey(
+        "Product", on_delete=models.DO_NOTHING, db_constraint=False, null=True
+    )
+    # Kept so history still reads correctly after the product is deleted
+    product_name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "server_archivedorderitem"
+
+    def __str__(self):
+        return f"{self.quantity}x {self.product_name}"
+
+
+class ArchivedPaymentIntent(models.Model):
+    """
+    Cold storage for the payment intents of archived orders, partitioned
+    like ArchivedOrderItem, so the gateway references of old payments
+    survive archival. The queue bookkeeping is not kept.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="payment_intents",
+    )
+    order_created_at = models.DateTimeField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=50)
+    status = models.CharField(max_length=20)
+    gateway = models.CharField(max_length=50, blank=True)
+    gateway_reference = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "server_archivedpaymentintent"
+
+    def __str__(self):
+        return f"Archived payment intent {self.id} ({self.status})"
@@ -1,6 +1,13 @@
+import hashlib
 import uuid
+from datetime import timedelta
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+
+def default_token_expiry():
+    return timezone.now() + timedelta(days=settings.TOKEN_TTL_DAYS)
 
 
 class Token(models.Model):
@@ -8,7 +15,12 @@ class Token(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tokens"
     )
     key = models.CharField(max_length=64, unique=True)
+    # One token per signed-in device, e.g. "iPhone Safari"
+    device = models.CharField(max_length=255, blank=True)
     created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=default_token_expiry)
+    # Refreshed at most every TOKEN_LAST_SEEN_INTERVAL seconds, not per request
+    last_seen = models.DateTimeField(null=True, blank=True)
 
     def save(self, *args, **kwargs):
         if not self.key:
@@ -19,5 +31,69 @@ class Token(models.Model):
     def generate_key():
         return uuid.uuid4().hex
 
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
     class Meta:
         db_table = "auth_token"
+        indexes = [
+            # Purge scans and per-device login lookups
+            models.Index(fields=["expires_at"], name="auth_token_expires_idx"),
+            models.Index(fields=["user", "device"], name="auth_token_user_device_idx"),
+        ]
+
+
+def hash_reset_token(raw_token):
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+class PasswordResetTokenManager(models.Manager):
+    def issue(self, user, ttl=timedelta(hours=24)):
+        """
+        Create a reset token for the user, replacing any unused one, and
+        return the raw token for the reset link. Only its hash is stored.
+        """
+        raw_token = uuid.uuid4().hex
+        self.filter(user=user, used_at__isnull=True).delete()
+        self.create(
+            user=user,
+            token_hash=hash_reset_token(raw_token),
+            expires_at=timezone.now() + ttl,
+        )
+        return raw_token
+
+    def lookup(self, raw_token):
+        """The unused token for raw_token, expired or not, via the unique index"""
+        return (
+            self.select_related("user")
+            .filter(token_hash=hash_reset_token(raw_token), used_at__isnull=True)
+            .first()
+        )
+
+
+class PasswordResetToken(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="password_reset_tokens",
+    )
+    # SHA-256 of the emailed token, so a leaked table cannot reset passwords
+    token_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    used_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PasswordResetTokenManager()
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["expires_at"], name="reset_token_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"Password reset for user {self.user_id}"
@@ -11,6 +11,14 @@ class Order(models.Model):
         ("delivered", "Delivered"),
         ("cancelled", "Cancelled"),
     ]
+    # Status changes allowed for bulk fulfilment updates
+    STATUS_TRANSITIONS = {
+        "pending": ["processing", "cancelled"],
+        "processing": ["shipped", "cancelled"],
+        "shipped": ["delivered"],
+        "delivered": [],
+        "cancelled": [],
+    }
 
     user = models.ForeignKey("User", on_delete=models.CASCADE, related_name="orders")
     order_number = models.CharField(max_length=20, unique=True)
@@ -26,9 +34,28 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Admin listing, per-user history and the archival scan
+            models.Index(fields=["-created_at"], name="order_created_idx"),
+            models.Index(fields=["user", "-created_at"], name="order_user_created_idx"),
+            models.Index(
+                fields=["status", "created_at"], name="order_status_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Order {self.order_number} ({self.status})"
 
+    @classmethod
+    def allowed_from(cls, status):
+        """Statuses an order may move to ``status`` from"""
+        return [
+            source
+            for source, targets in cls.STATUS_TRANSITIONS.items()
+            if status in targets
+        ]
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
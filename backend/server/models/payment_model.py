@@ -0,0 +1,47 @@
+from django.db import models
+from django.utils import timezone
+
+
+class PaymentIntent(models.Model):
+    """
+    A queued request to charge an order through the configured payment
+    gateway. Created by ``process_payment`` and worked off by
+    ``manage.py process_payments``.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+    # Intents that still count towards paying an order
+    ACTIVE_STATUSES = ["pending", "processing", "succeeded"]
+
+    order = models.ForeignKey(
+        "Order", on_delete=models.CASCADE, related_name="payment_intents"
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    gateway = models.CharField(max_length=50, blank=True)
+    gateway_reference = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Queue bookkeeping: when the intent may next be claimed, and until when
+    # the worker that claimed it holds it
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "available_at"], name="payment_intent_queue_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Payment {self.id} for order {self.order_id} ({self.status})"
@@ -1,8 +1,50 @@
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
-
-
-class CustomerManager(UserManager):
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Lower
+
+
+class AccountManager(UserManager):
+    def get_by_login(self, identifier):
+        """
+        The user whose username, or email if identifier contains "@", matches
+        identifier case-insensitively, in one query on the lower() indexes.
+        An exact username match wins over a case-insensitive one, and both
+        win over an email match. Returns None if nobody matches.
+        """
+        value = identifier.lower()
+        match = Q(username_lower=value)
+        if "@" in identifier:
+            # The email condition repeats the partial index's predicate
+            match |= Q(email_lower=value) & ~Q(email="")
+        return (
+            self.annotate(
+                username_lower=Lower("username"),
+                email_lower=Lower("email"),
+                login_rank=Case(
+                    When(username=identifier, then=Value(0)),
+                    When(username_lower=value, then=Value(1)),
+                    default=Value(2),
+                ),
+            )
+            .filter(match)
+            .order_by("login_rank", "-date_joined")
+            .first()
+        )
+
+    def filter_by_email(self, email):
+        """
+        Users whose email matches case-insensitively, on the partial
+        lower(email) index; at most one, as the index is unique
+        """
+        return (
+            self.annotate(email_lower=Lower("email"))
+            .filter(email_lower=email.lower())
+            .exclude(email="")
+        )
+
+
+class CustomerManager(AccountManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_staff=False, is_superuser=False)
 
@@ -10,7 +52,7 @@ class CustomerManager(UserManager):
         return self.get_queryset().filter(is_active=True)
 
 
-class AdminManager(UserManager):
+class AdminManager(AccountManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_staff=True)
 
@@ -25,14 +67,24 @@ class User(AbstractUser):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    # Password reset
-    reset_token = models.CharField(max_length=64, null=True, blank=True)
-    reset_token_expiry = models.DateTimeField(null=True, blank=True)
+
+    objects = AccountManager()
 
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ["-date_joined"]
+        indexes = [
+            models.Index(Lower("username"), name="user_username_lower_idx"),
+        ]
+        constraints = [
+            # Also serves email logins; blank emails are left out
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=~Q(email=""),
+                name="user_email_lower_unique",
+            ),
+        ]
 
     def __str__(self):
         return self.username
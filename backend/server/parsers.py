@@ -0,0 +1,39 @@
+"""
+JSON request parsing with orjson, falling back to DRF's JSONParser for
+non-UTF-8 bodies and for documents orjson rejects, so error messages stay
+the same, and for bodies that may hold an integer wider than 64 bits, which
+orjson would read as a float.
+"""
+
+from io import BytesIO
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+# Every integer outside orjson's range has 19 digits or more. Folding the
+# digits to "0" turns looking for such a run into a substring search, far
+# quicker than a regex; runs inside strings or fractions only cost a fallback
+DIGITS = bytes.maketrans(b"0123456789", b"0" * 10)
+LONG_NUMBER = b"0" * 19
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS):
+            return super().parse(BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Let DRF word the error, so clients see the same messages
+            return super().parse(BytesIO(body), media_type, parser_context)
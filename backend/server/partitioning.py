@@ -0,0 +1,82 @@
+"""
+Monthly range partitions for the order archive tables.
+
+On Postgres ``server_archivedorder``, ``server_archivedorderitem`` and
+``server_archivedpaymentintent`` are declared ``PARTITION BY RANGE`` (see
+migrations 0007 and 0012) with one partition per calendar month plus a
+default partition as a safety net. Other databases get plain tables and
+every helper here is a no-op.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connections
+
+# Partitioned table -> the column it is partitioned on
+ARCHIVE_TABLES = {
+    "server_archivedorder": "created_at",
+    "server_archivedorderitem": "order_created_at",
+    "server_archivedpaymentintent": "order_created_at",
+}
+
+
+def supports_partitioning(using="default"):
+    return connections[using].vendor == "postgresql"
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def existing_partitions(table, using="default"):
+    if not supports_partitioning(using):
+        return set()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def ensure_partitions(first_month, last_month, using="default"):
+    """
+    Create the monthly partitions covering first_month..last_month (inclusive)
+    for every archive table. Returns the names of the partitions created.
+    """
+    if not supports_partitioning(using):
+        return []
+
+    connection = connections[using]
+    created = []
+    for table in ARCHIVE_TABLES:
+        existing = existing_partitions(table, using)
+        month = month_start(first_month)
+        while month <= month_start(last_month):
+            name = partition_name(table, month)
+            if name not in existing:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(name)} "
+                        f"PARTITION OF {connection.ops.quote_name(table)} "
+                        "FOR VALUES FROM (%s) TO (%s)",
+                        [month, add_months(month, 1)],
+                    )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
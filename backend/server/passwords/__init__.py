@@ -0,0 +1,11 @@
+from .hashing import HashingBusy, make_password, verify_password
+from .policy import PasswordPolicy, get_policy, password_problems
+
+__all__ = [
+    "HashingBusy",
+    "make_password",
+    "verify_password",
+    "PasswordPolicy",
+    "get_policy",
+    "password_problems",
+]
@@ -0,0 +1,86 @@
+"""
+Password hashing off the request threads.
+
+PBKDF2 and Argon2 each burn tens of milliseconds of CPU per call, so a burst
+of logins can keep every request thread busy hashing while catalog requests
+queue behind them. Hashing runs here instead on a small per-process thread
+pool (both hashers release the GIL). A caller still holds its request
+thread while it waits, so the calls running or waiting are capped below the
+request threads, and a caller waits at most a second or so; past the cap or
+the wait callers get HashingBusy, which the auth views turn into a 503 with
+Retry-After.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingBusy(Exception):
+    """The hashing pool is saturated; the client should retry shortly"""
+
+
+class HashingPool:
+    def __init__(self, workers, slots, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        # Running plus queued calls; acquired without blocking so a full pool
+        # rejects immediately instead of tying up the request thread
+        self._slots = threading.BoundedSemaphore(slots)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy()
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    # Built lazily so every forked worker process gets its own threads
+    return HashingPool(
+        settings.PASSWORD_HASHING_WORKERS,
+        settings.PASSWORD_HASHING_SLOTS,
+        settings.PASSWORD_HASHING_TIMEOUT,
+    )
+
+
+def make_password(raw_password):
+    return get_pool().run(hashers.make_password, raw_password)
+
+
+def _check(raw_password, encoded):
+    upgraded = []
+    # Django calls the setter when the hash uses an old hasher or too few
+    # iterations; rehash in the same pool call with the preferred hasher
+    correct = hashers.check_password(
+        raw_password,
+        encoded,
+        setter=lambda raw: upgraded.append(hashers.make_password(raw)),
+    )
+    return correct, upgraded[0] if upgraded else None
+
+
+def verify_password(user, raw_password):
+    """
+    Check raw_password against the user's hash on the hashing pool. A correct
+    password stored with an outdated hasher is transparently rehashed.
+    """
+    correct, upgraded = get_pool().run(_check, raw_password, user.password)
+    if upgraded:
+        user.password = upgraded
+        user.save(update_fields=["password"])
+    return correct
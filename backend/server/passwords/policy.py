@@ -0,0 +1,98 @@
+"""
+Password policy checks cheap enough to run on every keystroke.
+
+Django's validators each raise a ValidationError with a lazily translated
+message, which costs tens of microseconds per failed rule. PasswordPolicy
+compiles AUTH_PASSWORD_VALIDATORS once per process instead: the length,
+common-password and numeric rules become plain checks against precomputed
+values and messages, alongside the shop's own uppercase and digit rules.
+Validators it does not know are still run as-is.
+"""
+
+from functools import lru_cache
+
+from django.contrib.auth import password_validation
+from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+UPPERCASE_MESSAGE = "Password must contain at least one uppercase letter."
+DIGIT_MESSAGE = "Password must contain at least one number."
+
+
+def failure_message(validator, sample):
+    # The validator's own wording, rendered once for a password it rejects
+    try:
+        validator.validate(sample)
+    except ValidationError as e:
+        return " ".join(str(message) for message in e.messages)
+    raise ValueError(f"{type(validator).__name__} accepted {sample!r}")
+
+
+class PasswordPolicy:
+    def __init__(self, validators):
+        self.min_length = 0
+        self.common_passwords = frozenset()
+        self.reject_numeric = False
+        # Validators that only matter with a user, e.g. attribute similarity
+        self.user_validators = []
+        self.other_validators = []
+
+        for validator in validators:
+            if isinstance(validator, password_validation.MinimumLengthValidator):
+                self.min_length = validator.min_length
+                self.too_short_message = failure_message(validator, "")
+            elif isinstance(validator, password_validation.CommonPasswordValidator):
+                self.common_passwords = frozenset(validator.passwords)
+                self.too_common_message = failure_message(
+                    validator, next(iter(validator.passwords))
+                )
+            elif isinstance(validator, password_validation.NumericPasswordValidator):
+                self.reject_numeric = True
+                self.numeric_message = failure_message(validator, "0")
+            elif isinstance(
+                validator, password_validation.UserAttributeSimilarityValidator
+            ):
+                self.user_validators.append(validator)
+            else:
+                self.other_validators.append(validator)
+
+    def problems(self, password, user=None):
+        """Every rule the password breaks, as messages for the client"""
+        problems = []
+        if not any(map(str.isupper, password)):
+            problems.append(UPPERCASE_MESSAGE)
+        if not any(map(str.isdigit, password)):
+            problems.append(DIGIT_MESSAGE)
+
+        validators = self.other_validators
+        if user is not None:
+            validators = self.user_validators + validators
+        for validator in validators:
+            try:
+                validator.validate(password, user)
+            except ValidationError as e:
+                problems.extend(e.messages)
+
+        if len(password) < self.min_length:
+            problems.append(self.too_short_message)
+        if password.lower().strip() in self.common_passwords:
+            problems.append(self.too_common_message)
+        if self.reject_numeric and password.isdigit():
+            problems.append(self.numeric_message)
+        return problems
+
+
+@lru_cache(maxsize=None)
+def get_policy():
+    return PasswordPolicy(password_validation.get_default_password_validators())
+
+
+@receiver(setting_changed)
+def reset_policy(*, setting, **kwargs):
+    if setting == "AUTH_PASSWORD_VALIDATORS":
+        get_policy.cache_clear()
+
+
+def password_problems(password, user=None):
+    return get_policy().problems(password, user)
@@ -0,0 +1,19 @@
+from .gateways import BaseGateway, FakeGateway, ChargeResult, GatewayError, get_gateway
+from .processing import (
+    enqueue_payment,
+    claim_intents,
+    process_intent,
+    complete_intent,
+)
+
+__all__ = [
+    "BaseGateway",
+    "FakeGateway",
+    "ChargeResult",
+    "GatewayError",
+    "get_gateway",
+    "enqueue_payment",
+    "claim_intents",
+    "process_intent",
+    "complete_intent",
+]
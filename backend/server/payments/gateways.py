@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """A transient gateway failure; the charge is retried with backoff"""
+
+
+@dataclass
+class ChargeResult:
+    # "succeeded" and "failed" are final; "pending" means the gateway will
+    # report the outcome later through the payment webhook
+    status: str
+    reference: str = ""
+    error: str = ""
+
+
+class BaseGateway:
+    name = "base"
+
+    def charge(self, intent):
+        """
+        Charge ``intent.amount`` for ``intent.order``. Must be idempotent on
+        ``intent.id`` so a retried charge never bills the customer twice.
+        """
+        raise NotImplementedError
+
+    def sign(self, body):
+        return hmac.new(
+            settings.PAYMENT_WEBHOOK_SECRET.encode(), body, hashlib.sha256
+        ).hexdigest()
+
+    def verify_webhook(self, body, signature):
+        """Check the HMAC-SHA256 signature the gateway sent with a webhook body"""
+        if not settings.PAYMENT_WEBHOOK_SECRET or not signature:
+            return False
+        return hmac.compare_digest(self.sign(body), signature)
+
+
+class FakeGateway(BaseGateway):
+    """
+    Local stand-in for a card processor, for development and load tests.
+    Latency and the declined / transient error rates come from settings.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms=None, failure_rate=None, error_rate=None):
+        self.latency_ms = (
+            settings.PAYMENT_FAKE_LATENCY_MS if latency_ms is None else latency_ms
+        )
+        self.failure_rate = (
+            settings.PAYMENT_FAKE_FAILURE_RATE if failure_rate is None else failure_rate
+        )
+        self.error_rate = (
+            settings.PAYMENT_FAKE_ERROR_RATE if error_rate is None else error_rate
+        )
+
+    def charge(self, intent):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        roll = random.random()
+        if roll < self.error_rate:
+            raise GatewayError("Fake gateway timed out")
+        if roll < self.error_rate + self.failure_rate:
+            return ChargeResult("failed", error="Card declined")
+        return ChargeResult("succeeded", reference=f"fake_{uuid.uuid4().hex}")
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    return import_string(settings.PAYMENT_GATEWAY)()
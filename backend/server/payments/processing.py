@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import DailySalesRollup, Order, PaymentIntent
+from .gateways import GatewayError, get_gateway
+
+
+def enqueue_payment(order, payment_method):
+    """
+    Queue a charge for the order, reusing its active intent if there is one
+    so a double-submitted checkout only charges once
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(pk=order.pk)
+        intent = (
+            order.payment_intents.filter(status__in=PaymentIntent.ACTIVE_STATUSES)
+            .order_by("-created_at")
+            .first()
+        )
+        if intent is None:
+            intent = PaymentIntent.objects.create(
+                order=order,
+                amount=order.total_amount,
+                payment_method=payment_method,
+                gateway=get_gateway().name,
+            )
+    return intent
+
+
+def claim_intents(batch_size):
+    """
+    Lease up to batch_size due intents to this worker. Intents whose lease
+    ran out without a gateway reference (a crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=settings.PAYMENT_LEASE_SECONDS)
+    with transaction.atomic():
+        intents = list(
+            PaymentIntent.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="pending", available_at__lte=now)
+                | Q(status="processing", locked_until__lt=now, gateway_reference="")
+            )
+            .order_by("available_at")[:batch_size]
+        )
+        if intents:
+            PaymentIntent.objects.filter(pk__in=[i.pk for i in intents]).update(
+                status="processing",
+                locked_until=now + lease,
+                attempts=F("attempts") + 1,
+                updated_at=now,
+            )
+    for intent in intents:
+        intent.status = "processing"
+        intent.attempts += 1
+    return intents
+
+
+def process_intent(intent, gateway=None):
+    """Charge one claimed intent and record the outcome"""
+    gateway = gateway or get_gateway()
+    try:
+        result = gateway.charge(intent)
+    except GatewayError as e:
+        return retry_intent(intent, str(e))
+
+    if result.status == "pending":
+        # The gateway reports the outcome through the webhook
+        PaymentIntent.objects.filter(pk=intent.pk).update(
+            gateway_reference=result.reference, updated_at=timezone.now()
+        )
+        return "pending"
+
+    complete_intent(
+        intent.pk,
+        succeeded=result.status == "succeeded",
+        reference=result.reference,
+        error=result.error,
+    )
+    return result.status
+
+
+def retry_intent(intent, error):
+    """Put a transiently failed intent back on the queue with exponential backoff"""
+    if intent.attempts >= settings.PAYMENT_MAX_ATTEMPTS:
+        complete_intent(intent.pk, succeeded=False, error=error)
+        return "failed"
+
+    delay = settings.PAYMENT_RETRY_BASE_SECONDS * 2 ** (intent.attempts - 1)
+    PaymentIntent.objects.filter(pk=intent.pk, status="processing").update(
+        status="pending",
+        last_error=error,
+        available_at=timezone.now() + timedelta(seconds=delay),
+        locked_until=None,
+        updated_at=timezone.now(),
+    )
+    return "retry"
+
+
+def complete_intent(intent_id, succeeded, reference="", error=""):
+    """
+    Record the final outcome of an intent, from the worker or the webhook.
+    A successful payment marks its order paid and moves it to processing.
+    Completing an already completed intent is a no-op.
+    """
+    with transaction.atomic():
+        intent = PaymentIntent.objects.select_for_update().get(pk=intent_id)
+        if intent.status in ("succeeded", "failed"):
+            return intent
+
+        now = timezone.now()
+        intent.status = "succeeded" if succeeded else "failed"
+        intent.gateway_reference = reference or intent.gateway_reference
+        intent.last_error = error
+        intent.locked_until = None
+        intent.completed_at = now
+        intent.save()
+
+        if succeeded:
+            order = Order.objects.select_for_update().get(pk=intent.order_id)
+            old_status = order.status
+            order.payment_status = True
+            order.payment_method = intent.payment_method
+            order.payment_date = now
+            if order.status == "pending":
+                order.status = "processing"
+            order.save()
+            DailySalesRollup.objects.move_order(order, old_status)
+    return intent
@@ -0,0 +1,60 @@
+"""
+JSON rendering with orjson.
+
+The output is byte-for-byte what DRF's JSONRenderer produces with this
+project's settings (compact, UTF-8, \\u2028 and \\u2029 escaped): types orjson
+does not handle natively, such as Decimal, lazy strings and querysets, go
+through DRF's own encoder, and UTC datetimes end in "Z" as DRF writes them.
+Indented output (the browsable API, "; indent=" in Accept), anything
+orjson refuses, such as integers wider than 64 bits, and documents holding
+a float orjson formats differently from Python (1e20 for 1e+20, 0.00001
+for 1e-05) fall back to DRF's renderer. One difference remains: NaN and
+infinities become null where DRF raises.
+"""
+
+import re
+
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from .timing import span
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+# Floats orjson formats differently from Python: an exponent, which Python
+# writes with a sign and two digits at least, and 0.00001 up to 0.0001, which
+# Python writes as 1e-05. Strings that happen to match only cost a fallback
+EXPONENT = re.compile(rb'e-?\d+[,\]}"]')
+SMALL_FLOAT = b"0.0000"
+
+# DRF's fallbacks for types the json module cannot encode, e.g. Decimal
+default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with span("render"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if SMALL_FLOAT in ret or EXPONENT.search(ret) or isinstance(data, float):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict JavaScript subset, as DRF does
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from ..models import Category
+from ..timing import TimedSerializerMixin
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "slug"]
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from django.utils.text import slugify
 from server.models import Product
+from server.timing import TimedSerializerMixin
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = "__all__"
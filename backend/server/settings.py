@@ -1,5 +1,7 @@
 import os
+from ipaddress import ip_network
 from pathlib import Path
+from urllib.parse import urlsplit
 from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
@@ -8,7 +10,6 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 #                        Production     (devs- auto switch if production env isn't found)
 environment = os.getenv("ENVIRONMENT", "development")
-print(environment)
 if environment == "production":
     load_dotenv()
     DATABASES = {
@@ -48,6 +49,78 @@ else:
         if host.strip()
     ]
 
+# Local benchmarking without PostgreSQL: DB_SQLITE_PATH puts the database
+# in that SQLite file instead
+if os.getenv("DB_SQLITE_PATH"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("DB_SQLITE_PATH"),
+        # Writers queue for SQLite's single write lock instead of failing
+        # with "database is locked" when a read upgrades to a write
+        "OPTIONS": {"timeout": 20, "transaction_mode": "IMMEDIATE"},
+    }
+
+# Read replicas: one alias per "host[:port][/name]" entry in
+# DB_REPLICA_HOSTS, sharing the primary's credentials and by default its
+# port and database name. Only views marked @replica_reads use them.
+for index, entry in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    replica = urlsplit(f"//{entry.strip()}")
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "HOST": replica.hostname,
+        "PORT": str(replica.port or DATABASES["default"]["PORT"] or ""),
+        "NAME": replica.path.lstrip("/") or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["server.db_router.ReplicaRouter"]
+# Seconds a client stays on the primary after a write; keep above the
+# replicas' usual lag
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
+
+# Database connection reuse. By default each thread keeps its connection
+# for DB_CONN_MAX_AGE seconds, checked before reuse. Under ASGI
+# (SERVER_MODE=asgi) every request runs its queries in a thread of its own,
+# so kept connections would pile up and the default there is 0. DB_POOL=true
+# instead hands PostgreSQL connections out from a psycopg 3 pool per process
+# (size it to at least GUNICORN_THREADS), which is how to reuse connections
+# under ASGI; Django requires CONN_MAX_AGE=0 with a pool.
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+ASGI = os.getenv("SERVER_MODE", "wsgi").lower() == "asgi"
+for database in DATABASES.values():
+    database["CONN_HEALTH_CHECKS"] = True
+    if DB_POOL and database["ENGINE"] == "django.db.backends.postgresql":
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            # Seconds a request waits for a free connection before erroring
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            # Seconds before idle and long-lived connections are recycled
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        }
+    else:
+        database["CONN_MAX_AGE"] = int(
+            os.getenv("DB_CONN_MAX_AGE", "0" if ASGI else "60")
+        )
+
+# Shared cache: Redis when REDIS_URL is set, otherwise per-process memory
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Default settings
 INSTALLED_APPS = [
     "corsheaders",
@@ -69,14 +142,24 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 # Send Mail
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# Overridable so the outbox worker can be pointed at a local SMTP sink
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "true").lower() == "true"
 EMAIL_HOST_USER = os.getenv("EMAIL_APP_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_APP_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("EMAIL_APP_USER", "noreply.resonancese@gmail.com")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000").rstrip("/")
+# Email outbox worker: delivery attempts, first retry delay (doubled per
+# attempt) and how long a worker holds a claimed email
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(
+    os.getenv("EMAIL_OUTBOX_RETRY_BASE_SECONDS", "30")
+)
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "120"))
 
 CORS_ALLOW_METHODS = [
     "DELETE",
@@ -94,14 +177,19 @@ CORS_ALLOW_HEADERS = [
 
 
 MIDDLEWARE = [
+    "server.middleware.request_id.RequestIdMiddleware",
+    "server.middleware.metrics.MetricsMiddleware",
+    "server.middleware.timing.ServerTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "server.middleware.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "server.middleware.replica_routing.ReplicaRoutingMiddleware",
 ]
 
 
@@ -126,6 +214,42 @@ TEMPLATES = [
 WSGI_APPLICATION = "server.wsgi.application"
 
 IMGBB_API_KEY = os.getenv("API_IMG_KEY")
+# Payments: gateway class, webhook signing secret and worker retry policy
+PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "server.payments.gateways.FakeGateway")
+PAYMENT_WEBHOOK_SECRET = os.getenv("PAYMENT_WEBHOOK_SECRET", "")
+PAYMENT_MAX_ATTEMPTS = int(os.getenv("PAYMENT_MAX_ATTEMPTS", "5"))
+PAYMENT_RETRY_BASE_SECONDS = int(os.getenv("PAYMENT_RETRY_BASE_SECONDS", "5"))
+PAYMENT_LEASE_SECONDS = int(os.getenv("PAYMENT_LEASE_SECONDS", "60"))
+# Fake gateway behaviour for local load tests
+PAYMENT_FAKE_LATENCY_MS = int(os.getenv("PAYMENT_FAKE_LATENCY_MS", "200"))
+PAYMENT_FAKE_FAILURE_RATE = float(os.getenv("PAYMENT_FAKE_FAILURE_RATE", "0.0"))
+PAYMENT_FAKE_ERROR_RATE = float(os.getenv("PAYMENT_FAKE_ERROR_RATE", "0.0"))
+# Seconds catalog-wide results (filters, categories, recommendations) are
+# served from cache before being rebuilt
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "60"))
+# Two-tier cache (server/caching): per-process LRU size and TTL in front of
+# the shared cache, how long values outlive their TTL to be served stale
+# while one worker rebuilds them, and how eagerly they are rebuilt early
+TIERED_CACHE_LOCAL_SIZE = int(os.getenv("TIERED_CACHE_LOCAL_SIZE", "1000"))
+TIERED_CACHE_LOCAL_TTL = int(os.getenv("TIERED_CACHE_LOCAL_TTL", "5"))
+TIERED_CACHE_STALE_TTL = int(os.getenv("TIERED_CACHE_STALE_TTL", "300"))
+TIERED_CACHE_EARLY_BETA = float(os.getenv("TIERED_CACHE_EARLY_BETA", "1.0"))
+# Seconds a rebuild may hold its lock, and a reader with nothing stale to
+# serve waits for it before computing the value itself
+TIERED_CACHE_LOCK_TIMEOUT = int(os.getenv("TIERED_CACHE_LOCK_TIMEOUT", "30"))
+TIERED_CACHE_WAIT_TIMEOUT = float(os.getenv("TIERED_CACHE_WAIT_TIMEOUT", "2"))
+# Response compression: smallest body worth compressing, gzip and Brotli
+# levels, seconds compressed catalog bodies are kept in the cache, and the
+# bytes of them each process keeps in memory
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_TTL = int(os.getenv("COMPRESSION_CACHE_TTL", "300"))
+COMPRESSION_CACHE_LOCAL_BYTES = int(
+    os.getenv("COMPRESSION_CACHE_LOCAL_BYTES", str(16 * 1024 * 1024))
+)
+# Seconds a computed staff stats time series is served from cache
+STATS_TIMESERIES_CACHE_TTL = int(os.getenv("STATS_TIMESERIES_CACHE_TTL", "60"))
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -145,13 +269,125 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: "argon2" puts Argon2 first, and existing PBKDF2 hashes
+# are upgraded the next time their owner logs in
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.getenv("PASSWORD_HASHER", "pbkdf2").lower() == "argon2":
+    PASSWORD_HASHERS.insert(0, "django.contrib.auth.hashers.Argon2PasswordHasher")
+else:
+    PASSWORD_HASHERS.append("django.contrib.auth.hashers.Argon2PasswordHasher")
+# Per-process pool that hashes passwords off the request threads: hashing
+# threads, calls allowed to run or wait at once, and seconds a request waits
+# before giving up with a 503. Each of those calls holds a request thread, so
+# the cap stays below the gunicorn threads (gunicorn.conf.py reads the same
+# variable) and a burst of logins always leaves some for other requests.
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "8"))
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", "2"))
+PASSWORD_HASHING_SLOTS = int(
+    os.getenv("PASSWORD_HASHING_SLOTS") or max(GUNICORN_THREADS - 2, 1)
+)
+PASSWORD_HASHING_TIMEOUT = float(os.getenv("PASSWORD_HASHING_TIMEOUT", "1"))
+
+# Token lifetime, and how often a token's last-seen time is written
+TOKEN_TTL_DAYS = int(os.getenv("TOKEN_TTL_DAYS", "30"))
+TOKEN_LAST_SEEN_INTERVAL = int(os.getenv("TOKEN_LAST_SEEN_INTERVAL", "300"))
+# Token authentication cache: seconds in the shared cache, and seconds and
+# entries in each worker's in-process LRU in front of it
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300"))
+TOKEN_CACHE_LOCAL_TTL = int(os.getenv("TOKEN_CACHE_LOCAL_TTL", "15"))
+TOKEN_CACHE_LOCAL_SIZE = int(os.getenv("TOKEN_CACHE_LOCAL_SIZE", "10000"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "server.middleware.auth_middleware.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # orjson-backed drop-ins for DRF's JSON renderer and parser; same output
+    "DEFAULT_RENDERER_CLASSES": [
+        "server.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "server.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Per-scope limits for the throttles in server/middleware/throttling.py;
+    # an empty value turns a scope's limit off
+    "DEFAULT_THROTTLE_RATES": {
+        "login": os.getenv("RATE_LIMIT_LOGIN", "20/m") or None,
+        # Failed logins only: per account and address, then per account
+        "login_username": os.getenv("RATE_LIMIT_LOGIN_USERNAME", "30/h") or None,
+        "login_account": os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "100/h") or None,
+        "register": os.getenv("RATE_LIMIT_REGISTER", "10/h") or None,
+        "password_reset": os.getenv("RATE_LIMIT_PASSWORD_RESET", "5/h") or None,
+        "checkout": os.getenv("RATE_LIMIT_CHECKOUT", "30/m") or None,
+    },
+    # Proxies in front of the backend whose X-Forwarded-For entries are
+    # trusted. With 0 the client is REMOTE_ADDR and the header is ignored, as
+    # anyone can send one; docker-compose sets 1 for nginx, which appends the
+    # address it saw and is the only way to reach the backend there
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
+# Request instrumentation: Server-Timing headers go to staff only unless
+# SERVER_TIMING_PUBLIC is set; slower requests are logged with their SQL
+SERVER_TIMING_PUBLIC = os.getenv("SERVER_TIMING_PUBLIC", "False").lower() == "true"
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+# Logging: JSON lines on stdout, written by a background thread (server/logs.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "request_id": {"()": "server.logs.RequestIdFilter"},
+    },
+    "formatters": {
+        "json": {"()": "server.logs.JSONFormatter"},
+    },
+    "handlers": {
+        "background": {
+            "class": "server.logs.BackgroundHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "json",
+            "filters": ["request_id"],
+        },
+    },
+    "root": {"handlers": ["background"], "level": LOG_LEVEL},
+    "loggers": {
+        "django": {"handlers": ["background"], "level": "INFO", "propagate": False},
+    },
+}
+# Share of debug records kept per logger, as "logger=rate" pairs, e.g.
+# "server.controller.cart_controller=0.01"; unlisted loggers keep them all
+for entry in filter(None, os.getenv("LOG_SAMPLE_RATES", "").split(",")):
+    name, _, rate = entry.strip().partition("=")
+    LOGGING["filters"][f"sample:{name}"] = {
+        "()": "server.logs.SamplingFilter",
+        "rate": float(rate),
+    }
+    LOGGING["loggers"].setdefault(name, {})["filters"] = [f"sample:{name}"]
+
+# Prometheus metrics (server/metrics): served at /metrics to the networks in
+# METRICS_ALLOWED_NETWORKS only. Under gunicorn set METRICS_DIR to a
+# directory the workers share, and each worker writes its figures there
+# every METRICS_FLUSH_INTERVAL seconds for whichever one is scraped
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_ALLOWED_NETWORKS = [
+    ip_network(network.strip())
+    for network in os.getenv(
+        "METRICS_ALLOWED_NETWORKS",
+        "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7",
+    ).split(",")
+    if network.strip()
+]
+
 # Localization
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
@@ -0,0 +1,125 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from server.models import OutboxEmail, Token, User
+from server.passwords.hashing import get_pool
+
+UNTHROTTLED = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {},
+}
+
+
+class LoginLookupTests(TestCase):
+    def test_exact_username_wins_over_email_matches(self):
+        # Created first, so ordering by date_joined alone would put it last
+        exact = User.objects.create_user("Sam@example.com", password="x")
+        User.objects.create_user("other", email="sam@example.com", password="x")
+        User.objects.create_user("sam@EXAMPLE.com", password="x")
+        User.objects.create_user("SAM@EXAMPLE.COM", password="x")
+        self.assertEqual(User.objects.get_by_login("Sam@example.com"), exact)
+
+    def test_case_insensitive_username_wins_over_email(self):
+        by_name = User.objects.create_user("ALEX@example.com", password="x")
+        User.objects.create_user("alex", email="alex@example.com", password="x")
+        self.assertEqual(User.objects.get_by_login("alex@example.com"), by_name)
+
+    def test_email_match(self):
+        user = User.objects.create_user("kim", email="Kim@Example.com", password="x")
+        self.assertEqual(User.objects.get_by_login("kim@example.COM"), user)
+        self.assertIsNone(User.objects.get_by_login("nobody@example.com"))
+
+    def test_blank_emails_never_match(self):
+        User.objects.create_user("blank", email="", password="x")
+        self.assertFalse(User.objects.filter_by_email("").exists())
+
+
+@override_settings(REST_FRAMEWORK=UNTHROTTLED)
+class ForgotPasswordTests(TestCase):
+    def test_email_is_matched_case_insensitively(self):
+        User.objects.create_user("kim", email="Kim@Example.com", password="x")
+        response = self.client.post(
+            reverse("forgot_password"),
+            {"email": "KIM@example.com"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+
+class StaffUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            "lee", "lee@example.com", password="x", is_staff=True
+        )
+        cls.token = Token.objects.create(user_id=cls.staff.pk)
+        User.objects.create_user("mo", "mo@example.com", password="x")
+
+    def update(self, **data):
+        return self.client.put(
+            reverse("staff-detail", args=[self.staff.pk]),
+            data,
+            content_type="application/json",
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+
+    def test_emails_taken_in_another_case_are_rejected(self):
+        response = self.update(email="MO@example.com")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Email already exists")
+
+    def test_own_email_can_change_case(self):
+        self.assertEqual(self.update(email="LEE@example.com").status_code, 200)
+
+
+@override_settings(REST_FRAMEWORK=UNTHROTTLED, PASSWORD_HASHING_TIMEOUT=30)
+class HashingPoolTests(TransactionTestCase):
+    def setUp(self):
+        get_pool.cache_clear()
+        self.addCleanup(get_pool.cache_clear)
+
+    def request(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs).status_code
+        finally:
+            connections.close_all()
+
+    def test_logins_cannot_take_every_request_thread(self):
+        User.objects.create_user("fay", password="x")
+        hashing = threading.Event()
+        self.addCleanup(hashing.set)
+
+        def stuck(*args, **kwargs):
+            hashing.wait(30)
+            return False
+
+        # As many requests as a worker has threads, all stuck hashing
+        requests = ThreadPoolExecutor(settings.GUNICORN_THREADS)
+        self.addCleanup(requests.shutdown)
+        with mock.patch("django.contrib.auth.hashers.check_password", stuck):
+            logins = [
+                requests.submit(
+                    self.request,
+                    self.client.post,
+                    reverse("login"),
+                    {"username": "fay", "password": "y"},
+                    content_type="application/json",
+                )
+                for _ in range(settings.GUNICORN_THREADS)
+            ]
+            catalog = requests.submit(
+                self.request, self.client.get, reverse("categories")
+            )
+            self.assertEqual(catalog.result(timeout=10), 200)
+            hashing.set()
+            statuses = sorted(login.result() for login in logins)
+        rejected = settings.GUNICORN_THREADS - settings.PASSWORD_HASHING_SLOTS
+        self.assertEqual(statuses.count(503), rejected)
+        self.assertEqual(statuses.count(401), settings.PASSWORD_HASHING_SLOTS)
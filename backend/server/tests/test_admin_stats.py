@@ -0,0 +1,44 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from server.models import DailySalesRollup, Token, User
+
+
+class AdminStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        staff = User.objects.create_user("staff", password="x", is_staff=True)
+        cls.token = Token.objects.create(user_id=staff.pk)
+        today = timezone.localdate()
+        for days_ago in (0, 6, 7):
+            DailySalesRollup.objects.create(
+                day=today - timedelta(days=days_ago),
+                status="delivered",
+                order_count=1,
+                revenue=Decimal("10.00"),
+            )
+
+    def test_window_covers_the_last_days_including_today(self):
+        response = self.client.get(
+            f"{reverse('staff-stats')}?days=7",
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["total_orders"], 2)
+        self.assertEqual(Decimal(str(data["total_sales"])), Decimal("20.00"))
+
+    def test_rebuild_replaces_only_the_last_days_including_today(self):
+        # No orders back these rows, so rebuilt days come back empty
+        call_command("rebuild_sales_rollup", days=7, stdout=StringIO())
+        today = timezone.localdate()
+        self.assertEqual(
+            list(DailySalesRollup.objects.values_list("day", flat=True)),
+            [today - timedelta(days=7)],
+        )
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from server.caching.catalog import catalog_cache
+from server.caching.local import LocalTTLCache
+from server.models import Category, Product
+
+
+class LocalTTLCacheTests(SimpleTestCase):
+    def test_byte_budget_evicts_least_recently_used(self):
+        cache = LocalTTLCache(100, 60, maxbytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.get("a")
+        cache.set("c", b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertEqual(cache.bytes, 8)
+
+    def test_values_over_the_budget_are_not_kept(self):
+        cache = LocalTTLCache(100, 60, maxbytes=10)
+        cache.set("small", b"1")
+        cache.set("large", b"x" * 11)
+        self.assertIsNone(cache.get("large"))
+        self.assertEqual(cache.get("small"), b"1")
+
+    def test_replacing_and_deleting_release_their_bytes(self):
+        cache = LocalTTLCache(100, 60, maxbytes=10)
+        cache.set("a", b"12345678")
+        cache.set("a", b"12")
+        self.assertEqual(cache.bytes, 2)
+        cache.delete("a")
+        self.assertEqual(cache.bytes, 0)
+
+    def test_entry_count_still_applies(self):
+        cache = LocalTTLCache(2, 60, maxbytes=100)
+        for key in "abc":
+            cache.set(key, b"1")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.bytes, 2)
+
+
+class RecommendedProductsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Speakers", slug="speakers")
+        cls.product = Product.objects.create(
+            name="Speaker",
+            slug="speaker",
+            description="A speaker",
+            category=category,
+            brand="JBL",
+            connections="Bluetooth",
+            price="49.99",
+            stock=10,
+            is_featured=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        catalog_cache.local.clear()
+        self.addCleanup(catalog_cache.local.clear)
+
+    def stock(self):
+        response = self.client.get(reverse("recommended-products"))
+        self.assertEqual(response.status_code, 200)
+        return [product["stock"] for product in response.json()]
+
+    def test_stock_is_fresh_while_the_list_is_cached(self):
+        self.assertEqual(self.stock(), [10])
+        # Orders update stock in bulk, which sends no signals
+        self.product.stock = 3
+        Product.objects.bulk_update([self.product], ["stock"])
+        self.assertEqual(self.stock(), [3])
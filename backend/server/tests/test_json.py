@@ -0,0 +1,132 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from server.models import Category, Product
+from server.parsers import ORJSONParser
+from server.renderers import ORJSONRenderer
+
+UTC = datetime.timezone.utc
+
+PAYLOADS = {
+    "empty": {},
+    "scalars": {"a": 1, "b": -2, "c": True, "d": None, "e": "text"},
+    "unicode": {"name": "Café ☕ 東京", "separators": "a b c"},
+    "nested": {"items": [{"id": n, "tags": ["x", "y"]} for n in range(50)]},
+    "decimals": {"price": Decimal("19.99"), "total": Decimal("0.10")},
+    "floats": [0.1, 1.5, 100.0, -2.25, 12345.678, 0.0001, 1e15, 1e16],
+    "exponent floats": [1e20, 1e-7, 0.00001, 1.5e300, -3e-5, 1.2345e17],
+    "datetimes": {
+        "utc": datetime.datetime(2024, 5, 1, 12, 30, 15, tzinfo=UTC),
+        "naive": datetime.datetime(2024, 5, 1, 12, 30, 15),
+        "microseconds": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, UTC),
+        "offset": datetime.datetime(
+            2024, 5, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+        ),
+        "date": datetime.date(2024, 5, 1),
+        "time": datetime.time(9, 15),
+    },
+    "uuid": {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+    "lazy": {"message": gettext_lazy("Not found.")},
+    "int keys": {1: "a", 2: "b"},
+    "wide ints": {"big": 2**64, "small": -(2**63) - 1, "u64": 2**64 - 1},
+    "strings that look like numbers": {"a": ":1e5", "b": ",0.00001"},
+}
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf(self):
+        for name, data in PAYLOADS.items():
+            with self.subTest(payload=name):
+                self.assertEqual(
+                    ORJSONRenderer().render(data), JSONRenderer().render(data)
+                )
+
+    def test_indented_output_matches_drf(self):
+        context = {"indent": 2}
+        data = PAYLOADS["nested"]
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json", context),
+            JSONRenderer().render(data, "application/json", context),
+        )
+
+    def test_non_finite_floats_render_as_null(self):
+        # DRF raises on these, which would turn the response into a 500
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({"x": value})
+                self.assertEqual(ORJSONRenderer().render({"x": value}), b'{"x":null}')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body), "application/json", {})
+
+    def test_output_matches_drf(self):
+        bodies = [
+            b'{"a": 1, "b": [1.5, "x", null, true], "c": {"d": "\\u00e9"}}',
+            b'{"price": 0.1, "big": 1e20, "tiny": 1e-7}',
+            '{"name": "Café ☕"}'.encode(),
+            b"[]",
+            b"1e400",
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                self.assertEqual(
+                    self.parse(ORJSONParser(), body), self.parse(JSONParser(), body)
+                )
+
+    def test_wide_ints_keep_their_precision(self):
+        for value in (2**64, 2**64 - 1, -(2**63) - 1, 10**30, -(10**30)):
+            with self.subTest(value=value):
+                parsed = self.parse(ORJSONParser(), f'{{"n": {value}}}'.encode())
+                self.assertEqual(parsed, {"n": value})
+                self.assertIsInstance(parsed["n"], int)
+
+    def test_errors_match_drf(self):
+        for body in (b"{", b"NaN", b'{"x": Infinity}', b"\xff"):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError) as actual:
+                    self.parse(ORJSONParser(), body)
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+
+class ResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Speakers", slug="speakers")
+        Product.objects.bulk_create(
+            Product(
+                name=f"Speaker {index} ☕",
+                slug=f"speaker-{index}",
+                description="A speaker",
+                category=category,
+                brand="JBL",
+                connections="Bluetooth",
+                price=Decimal("4.50") * (index + 1),
+                stock=index,
+            )
+            for index in range(5)
+        )
+
+    def test_api_responses_match_drf(self):
+        # Cached routes return the rendered bytes, so DRF renders the parsed body
+        for route in ("all-products", "product-filters", "categories"):
+            with self.subTest(route=route):
+                response = self.client.get(reverse(route))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.content,
+                    JSONRenderer().render(json.loads(response.content)),
+                )
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from server.logs import request_id
+from server.middleware.token_cache import CACHE_PREFIX, get_token_user, local_cache
+from server.models import Category, Product, Token, User
+
+
+class AsyncMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Speakers", slug="speakers")
+        Product.objects.bulk_create(
+            Product(
+                name=f"Speaker {index}",
+                slug=f"speaker-{index}",
+                description="A speaker",
+                category=category,
+                brand="JBL",
+                connections="Bluetooth",
+                price="49.99",
+                stock=10,
+            )
+            for index in range(30)
+        )
+
+    @override_settings(DEBUG=True)
+    def test_async_chain_has_no_sync_adapters(self):
+        # With DEBUG, Django logs each middleware it has to adapt
+        with self.assertNoLogs("django.request", level="DEBUG"):
+            ASGIHandler()
+
+    async def test_async_request_passes_every_middleware(self):
+        response = await self.async_client.get(
+            reverse("all-products"),
+            headers={"Accept-Encoding": "gzip", "X-Request-ID": "async-check"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Request-ID"], "async-check")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        # The context variable is reset once the request is done
+        self.assertIsNone(request_id.get(None))
+
+
+class AsyncQueryTimingTests(TransactionTestCase):
+    @override_settings(SERVER_TIMING_PUBLIC=True)
+    def test_async_queries_are_timed(self):
+        # As under an ASGI server: the event loop has a thread of its own and
+        # the ORM runs in worker threads whose connections open later
+        responses = []
+
+        async def request():
+            responses.append(
+                await self.async_client.get(reverse("check-product-stock", args=[1]))
+            )
+            # The worker's connection would otherwise outlive the test
+            await sync_to_async(connections.close_all)()
+
+        thread = threading.Thread(target=asyncio.run, args=(request(),))
+        thread.start()
+        thread.join()
+        self.assertRegex(responses[0]["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_password_hash_is_not_cached(self):
+        user = User.objects.create_user("nia", password="x")
+        token = Token.objects.create(user=user)
+        self.assertEqual(get_token_user(token.key), user)
+
+        names, values = cache.get(CACHE_PREFIX + token.key)["user"]
+        self.assertNotIn("password", names)
+        self.assertNotIn(user.password, values)
+        # Still there for the views that need it, loaded on first access
+        self.assertEqual(get_token_user(token.key).password, user.password)
+
+
+class SyncMiddlewareTests(SimpleTestCase):
+    def test_request_id_is_generated(self):
+        response = self.client.get(reverse("keepalive"))
+        self.assertRegex(response["X-Request-ID"], r"^[0-9a-f]{32}$")
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from server.models import (
+    ArchivedOrder,
+    ArchivedPaymentIntent,
+    Category,
+    Order,
+    OrderItem,
+    PaymentIntent,
+    Product,
+    Token,
+    User,
+)
+
+
+class ArchiveOrdersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("kai", password="x")
+        cls.staff = User.objects.create_user("staff", password="x", is_staff=True)
+        category = Category.objects.create(name="Speakers", slug="speakers")
+        cls.product = Product.objects.create(
+            name="Speaker",
+            slug="speaker",
+            description="A speaker",
+            category=category,
+            brand="JBL",
+            connections="Bluetooth",
+            price="49.99",
+            stock=10,
+        )
+
+    def old_order(self, number, intent_status):
+        order = Order.objects.create(
+            user=self.customer,
+            order_number=f"ORD-{number}",
+            status="delivered",
+            total_amount="49.99",
+            shipping_address="1 Main St",
+            payment_status=True,
+        )
+        OrderItem.objects.create(
+            order=order, product=self.product, quantity=1, price="49.99"
+        )
+        PaymentIntent.objects.create(
+            order=order,
+            amount="49.99",
+            payment_method="card",
+            status=intent_status,
+            gateway_reference=f"ref-{number}",
+        )
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(days=800)
+        )
+        return order
+
+    def archive(self):
+        call_command("archive_orders", stdout=StringIO())
+
+    def test_payment_intents_are_archived_with_the_order(self):
+        order = self.old_order(1, "succeeded")
+        self.archive()
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        intent = ArchivedPaymentIntent.objects.get(order_id=order.pk)
+        self.assertEqual(intent.gateway_reference, "ref-1")
+        self.assertEqual(intent.status, "succeeded")
+
+    def test_orders_with_unsettled_payments_stay_live(self):
+        order = self.old_order(2, "processing")
+        self.archive()
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+        self.assertFalse(ArchivedOrder.objects.filter(pk=order.pk).exists())
+
+    def test_archived_orders_can_still_be_read(self):
+        order = self.old_order(3, "succeeded")
+        self.archive()
+
+        self.client.force_login(self.customer)
+        response = self.client.get(reverse("order-details", args=[order.pk]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertTrue(data["archived"])
+        self.assertEqual(data["items"][0]["product"], "Speaker")
+
+        # Staff sign in with tokens; sessions only load customers
+        token = Token.objects.create(user_id=self.staff.pk)
+        response = self.client.get(
+            reverse("staff-order-detail", args=[order.pk]),
+            headers={"Authorization": f"Token {token.key}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user"], "kai")
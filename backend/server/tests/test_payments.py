@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from server.models import Order, User
+
+
+class CashOnDeliveryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user("kai", password="x")
+
+    def setUp(self):
+        self.client.force_login(self.customer)
+
+    def order(self, status, paid=False):
+        return Order.objects.create(
+            user=self.customer,
+            order_number=f"ORD-{status}",
+            status=status,
+            total_amount="49.99",
+            shipping_address="1 Main St",
+            payment_status=paid,
+        )
+
+    def pay_on_delivery(self, order):
+        return self.client.post(
+            reverse("process-payment", args=[order.pk]),
+            {"payment_method": "cod"},
+            content_type="application/json",
+        )
+
+    def test_pending_order_is_confirmed(self):
+        order = self.order("pending")
+        self.assertEqual(self.pay_on_delivery(order).status_code, 200)
+        order.refresh_from_db()
+        self.assertEqual(order.status, "processing")
+        self.assertEqual(order.payment_method, "cod")
+
+    def test_orders_past_pending_are_left_alone(self):
+        for status, paid in (
+            ("processing", True),
+            ("shipped", True),
+            ("cancelled", False),
+        ):
+            with self.subTest(status=status):
+                order = self.order(status, paid)
+                self.assertEqual(self.pay_on_delivery(order).status_code, 400)
+                order.refresh_from_db()
+                self.assertEqual(order.status, status)
+                self.assertEqual(order.payment_status, paid)
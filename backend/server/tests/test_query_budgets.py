@@ -0,0 +1,34 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+from server.loadtest import budget_settings, growth, measure_routes
+
+# The smallest fixture sets each route's budget; the larger ones have to match it
+SIZES = (1, 10, 100)
+
+
+class QueryBudgetTests(TestCase):
+    def test_query_counts_do_not_grow_with_the_data(self):
+        with budget_settings():
+            runs = [measure_routes(size)[0] for size in SIZES]
+        baseline = runs[0]
+        self.assertTrue(baseline)
+        for size, run in zip(SIZES[1:], runs[1:]):
+            for name, (status, log) in baseline.items():
+                with self.subTest(route=name, size=size):
+                    self.assertEqual(run[name][0], status)
+                    grown = growth(log, run[name][1])
+                    report = "\n\n".join(
+                        f"{after} runs at n={size}, against {before} at "
+                        f"n={SIZES[0]}:\n{query.format()}"
+                        for _, before, after, query in grown
+                    )
+                    self.assertLessEqual(len(run[name][1]), len(log), report)
+
+
+class RouteSelectionTests(SimpleTestCase):
+    def test_unknown_routes_are_rejected_before_anything_runs(self):
+        for command in ("benchmark_endpoints", "check_query_budgets"):
+            with self.subTest(command=command):
+                with self.assertRaisesMessage(CommandError, "Unknown routes: nope"):
+                    call_command(command, routes="all-products,nope")
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from server.middleware.throttling import RateLimiter, limiter
+from server.models import User
+
+
+def rates(**scopes):
+    return {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": scopes,
+        "NUM_PROXIES": 0,
+    }
+
+
+class BrokenCache:
+    def incr(self, key):
+        raise ConnectionError("cache is down")
+
+    add = get = incr
+
+
+class RateLimiterTests(SimpleTestCase):
+    def test_shared_cache_errors_fail_open(self):
+        local = RateLimiter(shared=BrokenCache())
+        with self.assertLogs("server.middleware.throttling", "WARNING"):
+            self.assertEqual(local.hit("login:ip:1", 2, 60), 0)
+
+    def test_local_bucket_still_applies_without_the_shared_cache(self):
+        local = RateLimiter(shared=BrokenCache())
+        with self.assertLogs("server.middleware.throttling", "WARNING"):
+            local.hit("login:ip:1", 2, 60)
+            local.hit("login:ip:1", 2, 60)
+        self.assertGreater(local.hit("login:ip:1", 2, 60), 0)
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        limiter.clear()
+        self.addCleanup(limiter.clear)
+
+    def login(self, username, address, password="wrong", **headers):
+        return self.client.post(
+            reverse("login"),
+            {"username": username, "password": password},
+            content_type="application/json",
+            REMOTE_ADDR=address,
+            headers=headers,
+        )
+
+    @override_settings(REST_FRAMEWORK=rates(login_account="2/m"))
+    def test_account_limit_holds_across_addresses(self):
+        for index, username in enumerate(("alice", "Alice")):
+            self.assertEqual(self.login(username, f"10.0.0.{index}").status_code, 401)
+        self.assertEqual(self.login("ALICE", "10.0.0.9").status_code, 429)
+        self.assertEqual(self.login("bob", "10.0.0.9").status_code, 401)
+
+    @override_settings(REST_FRAMEWORK=rates(login_username="2/m"))
+    def test_failures_from_one_address_do_not_lock_out_others(self):
+        User.objects.create_user("dana", password="secret")
+        for _ in range(2):
+            self.assertEqual(self.login("dana", "10.0.0.1").status_code, 401)
+        self.assertEqual(self.login("dana", "10.0.0.1").status_code, 429)
+        response = self.login("dana", "10.0.0.2", password="secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(REST_FRAMEWORK=rates(login_username="2/m", login_account="2/m"))
+    def test_successful_logins_are_not_counted(self):
+        User.objects.create_user("erin", password="secret")
+        for _ in range(3):
+            response = self.login("erin", "10.0.0.1", password="secret")
+            self.assertEqual(response.status_code, 200)
+
+    @override_settings(REST_FRAMEWORK=rates(login="2/m"))
+    def test_forwarded_for_is_ignored_without_trusted_proxies(self):
+        for index in range(2):
+            response = self.login("carol", "10.0.0.1", x_forwarded_for=f"1.2.3.{index}")
+            self.assertEqual(response.status_code, 401)
+        response = self.login("carol", "10.0.0.1", x_forwarded_for="1.2.3.99")
+        self.assertEqual(response.status_code, 429)
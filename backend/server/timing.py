@@ -0,0 +1,140 @@
+"""
+Per-request performance counters.
+
+ServerTimingMiddleware starts a RequestTimings for each request and keeps it
+in a context variable, so everything the request does on any thread, event
+loop or connection is charged to it:
+
+- every query, through an execute wrapper added to every database
+  connection as it connects, whichever thread it belongs to: under ASGI
+  the ORM runs in sync_to_async worker threads, each with connections of
+  its own;
+- cache hits and misses, reported by the token cache and TieredCache;
+- serializer and renderer time, measured with span().
+
+With no request in progress all of these reduce to a context variable
+lookup, which is what keeps the instrumentation cheap enough to leave on.
+"""
+
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Set for the duration of each request by ServerTimingMiddleware
+current_timings = ContextVar("current_timings", default=None)
+
+# Distinct statements remembered per request for the slow request log
+MAX_STATEMENTS = 50
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.spans = {}
+        # sql -> [count, seconds]
+        self.statements = {}
+        self._active = set()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def record_query(self, sql, duration):
+        self.db_queries += 1
+        self.db_time += duration
+        entry = self.statements.get(sql)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += duration
+        elif len(self.statements) < MAX_STATEMENTS:
+            self.statements[sql] = [1, duration]
+
+    def top_statements(self, count=5):
+        """The statements that took longest in total, slowest first"""
+        ranked = sorted(self.statements.items(), key=lambda item: -item[1][1])
+        return [
+            {"sql": sql[:500], "count": calls, "ms": round(seconds * 1000, 2)}
+            for sql, (calls, seconds) in ranked[:count]
+        ]
+
+
+def record_cache(hit):
+    timings = current_timings.get()
+    if timings is not None:
+        if hit:
+            timings.cache_hits += 1
+        else:
+            timings.cache_misses += 1
+
+
+class span:
+    """
+    Context manager adding the time spent in the block to the request's
+    `name` total. Nested spans of the same name, such as a nested
+    serializer, are only counted once. A class rather than a generator,
+    as serializers enter one per object.
+    """
+
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = None
+
+    def __enter__(self):
+        timings = current_timings.get()
+        if timings is not None and self.name not in timings._active:
+            timings._active.add(self.name)
+            self.timings = timings
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        timings = self.timings
+        if timings is not None:
+            timings.spans[self.name] = (
+                timings.spans.get(self.name, 0.0) + time.perf_counter() - self.started
+            )
+            timings._active.discard(self.name)
+
+
+def query_timer(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.record_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def add_query_timer(sender, connection, **kwargs):
+    # Connection objects outlive reconnects, so only the first adds it
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def install_query_timer():
+    """
+    Make sure this thread's connections report to query_timer, including
+    any opened before this module was imported and so missed by
+    add_query_timer(). A no-op after a thread's first request.
+    """
+    for alias in connections:
+        add_query_timer(None, connections[alias])
+
+
+class TimedSerializerMixin:
+    """Charges a serializer's to_representation() to the "serialize" span"""
+
+    def to_representation(self, instance):
+        with span("serialize"):
+            return super().to_representation(instance)
@@ -3,12 +3,13 @@ URL configuration for server project.
 """
 
 from django.urls import path
-from server.controller.product_controller import (
+from .controller.catalog_controller import (
     get_product_detailed_single_route,
     get_all_products,
-    get_product_filters,
     get_product_by_category,
     get_product_detailed,
+    check_product_stock,
+    get_categories,
 )
 from .controller.auth_controller import (
     register,
@@ -22,7 +23,7 @@ from .controller.auth_controller import (
     forgot_password,
     reset_password,
 )
-from .views import home_view, keep_alive
+from .views import home_view, keep_alive, metrics_view
 from .controller.cart_controller import (
     get_cart,
     add_to_cart,
@@ -37,8 +38,10 @@ from .controller.admin_controller import (
     get_admin_stats,
     manage_products,
     manage_orders,
-    get_categories,
+    bulk_update_order_status,
 )
+from .controller.analytics_controller import get_stats_timeseries
+from .controller.payment_controller import get_payment_status, payment_webhook
 from .controller.customer_order_controller import (
     create_order,
     get_user_orders,
@@ -47,15 +50,16 @@ from .controller.customer_order_controller import (
     get_user_by_id,
 )
 from .controller.product_controller import (
+    get_product_filters,
     upload_product_image,
     delete_product_image,
-    check_product_stock,
     get_recommended_products,
 )
 
 urlpatterns = [
-    path("", home_view),
-    path("keepalive/", keep_alive),
+    path("", home_view, name="home"),
+    path("keepalive/", keep_alive, name="keepalive"),
+    path("metrics", metrics_view, name="metrics"),
     # Product api urls
     path("api/products/", get_all_products, name="all-products"),
     path(
@@ -101,6 +105,11 @@ urlpatterns = [
         name="staff-detail",
     ),
     path("api/staff/stats/", get_admin_stats, name="staff-stats"),
+    path(
+        "api/staff/stats/timeseries/",
+        get_stats_timeseries,
+        name="staff-stats-timeseries",
+    ),
     path("api/staff/products/", manage_products, name="staff-products"),
     path(
         "api/staff/products/<int:product_id>/",
@@ -108,6 +117,11 @@ urlpatterns = [
         name="staff-product-detail",
     ),
     path("api/staff/orders/", manage_orders, name="staff-orders"),
+    path(
+        "api/staff/orders/bulk-status/",
+        bulk_update_order_status,
+        name="staff-orders-bulk-status",
+    ),
     path(
         "api/staff/orders/<int:order_id>/",
         manage_orders,
@@ -133,6 +147,8 @@ urlpatterns = [
     path("api/auth/update-profile/", update_profile, name="update_profile"),
     path("api/auth/update-address/", update_address, name="update_address"),
     path("api/orders/<int:order_id>/payment/", process_payment, name="process-payment"),
+    path("api/payments/<int:intent_id>/", get_payment_status, name="payment-status"),
+    path("api/payments/webhook/", payment_webhook, name="payment-webhook"),
     # cart api
     path("api/cart/", get_cart, name="get-cart"),
     path("api/cart/add/", add_to_cart, name="add-to-cart"),
@@ -1,7 +1,11 @@
-from django.http import JsonResponse
+from ipaddress import ip_address
+
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from rest_framework.decorators import api_view
 from django.conf import settings
 
+from .metrics import registry
+
 
 def home_view(request):
     return JsonResponse(
@@ -14,4 +18,19 @@ def keep_alive(request):
     return JsonResponse({"message": "Ping server!"})
 
 
+def metrics_view(request):
+    # nginx only proxies /api/, so scrapes reach gunicorn directly and
+    # REMOTE_ADDR is the scraper's own address
+    try:
+        client = ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return HttpResponseForbidden()
+    if not any(client in network for network in settings.METRICS_ALLOWED_NETWORKS):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(settings.METRICS_DIR),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 # settings.CORS_ALLOWED_ORIGINS,